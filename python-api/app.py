@@ -4,124 +4,113 @@ ClipsAI API Server
 Handles YouTube downloads and clip generation using ClipsAI
 """
 
-# Import sys first (needed for stderr in PyTorch config)
 import sys
+import time
 
-# IMPORTANT: Configure PyTorch serialization BEFORE any other imports
-# This must be done before importing ClipsAI/WhisperX which use torch.load internally
-# PyTorch 2.6+ changed default weights_only=True, which blocks various types
-try:
-    import torch
-    import typing
-    import collections
-    
-    # Check if we're on PyTorch 2.6+ (has add_safe_globals)
-    if hasattr(torch.serialization, 'add_safe_globals'):
-        safe_globals = []
-        
-        # Add common typing types (needed by Pyannote/Lightning models)
-        safe_globals.extend([
-            typing.Any,
-            typing.Union,
-            typing.Optional,
-            typing.Dict,
-            typing.List,
-            typing.Tuple,
-            typing.Callable,
-            typing.Type,
-            typing.Generic,
-        ])
-        
-        # Add basic Python types (often needed by models)
-        safe_globals.extend([
-            dict,
-            list,
-            tuple,
-            int,
-            float,
-            str,
-            bool,
-            bytes,
-            bytearray,
-            collections.defaultdict,
-            collections.OrderedDict,
-        ])
-        
-        # Add omegaconf types (needed by WhisperX/ClipsAI/Pyannote models)
-        try:
-            from omegaconf import ListConfig, DictConfig, OmegaConf
-            from omegaconf.base import ContainerMetadata, Metadata
-            from omegaconf.nodes import AnyNode
-            safe_globals.extend([
-                ListConfig,
-                DictConfig,
-                OmegaConf,
-                ContainerMetadata,
-                Metadata,
-                AnyNode,
-            ])
-        except ImportError:
-            # Try with available types
-            try:
-                from omegaconf import ListConfig, DictConfig, OmegaConf
-                from omegaconf.base import ContainerMetadata
-                safe_globals.extend([ListConfig, DictConfig, OmegaConf, ContainerMetadata])
-            except ImportError:
-                # Try with just ListConfig if others not available
-                try:
-                    from omegaconf import ListConfig
-                    safe_globals.append(ListConfig)
-                except ImportError:
-                    pass
-        
-        # Add all safe globals at once
-        if safe_globals:
-            torch.serialization.add_safe_globals(safe_globals)
-            globals_list = [g.__name__ if hasattr(g, '__name__') else str(g) for g in safe_globals[:10]]
-            print(f"Configured torch.serialization to allow {len(safe_globals)} types (including: {', '.join(globals_list)}...)", file=sys.stderr)
-        
-        # Monkey patch torch.load to use weights_only=False for trusted models
-        # This is safe for HuggingFace/Pyannote models which are from trusted sources
-        # Some libraries (like Lightning Fabric) call torch.load with weights_only=True explicitly,
-        # so we need to override it
-        original_load = torch.load
-        def patched_load(*args, **kwargs):
-            # Force weights_only=False for trusted model loading
-            # Models from HuggingFace/Pyannote are trusted sources
-            kwargs['weights_only'] = False
-            return original_load(*args, **kwargs)
-        torch.load = patched_load
-        print("Patched torch.load to use weights_only=False (safe for trusted HuggingFace/Pyannote models)", file=sys.stderr)
-except ImportError:
-    # PyTorch not available, will fail later when ClipsAI tries to use it
-    pass
+# Import-time breakdown, logged once the module has loaded. The heavy ML imports (torch, clipsai,
+# yt_dlp) are deferred (see _lazy_import) and show up here when they happen.
+_import_started = time.perf_counter()
+_import_times = {}  # name -> seconds
 
-# Now import other modules
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify
+from werkzeug.http import http_date, parse_date
+from werkzeug.utils import secure_filename
 from flask_cors import CORS
+_import_times['flask'] = time.perf_counter() - _import_started
+
+_import_mark = time.perf_counter()
 import os
+import gc
 import json
+import contextlib
+import collections
+import hashlib
+import subprocess
+import sqlite3
+import multiprocessing
+import multiprocessing.connection
+import signal
+import fcntl
+import concurrent.futures
 import tempfile
 import shutil
+import stat
 import threading
+import queue
+import itertools
+import re
+import array
+import base64
+import bisect
 import uuid
-import time
+import importlib
+import importlib.util
 from pathlib import Path
 from datetime import datetime
+_import_times['stdlib'] = time.perf_counter() - _import_mark
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js frontend
 
+class _ContentionLock:
+    """threading.Lock that counts acquisitions and how often (and how long) callers had to wait."""
+    __slots__ = ('_lock', 'acquisitions', 'contended', 'wait_seconds')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            self.acquisitions += 1
+            return True
+        if not blocking:
+            return False
+        started = time.perf_counter()
+        if not self._lock.acquire(True, timeout):
+            return False
+        # counters are only touched while holding the lock
+        self.acquisitions += 1
+        self.contended += 1
+        self.wait_seconds += time.perf_counter() - started
+        return True
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
 # In-memory job storage (in production, use Redis or database)
 jobs = {}
-jobs_lock = threading.Lock()
+jobs_lock = _ContentionLock()
 
 def _now_ts() -> float:
     return time.time()
 
+def _touch_job(job_id, job: dict):
+    """Stamp a modified job, refresh its index entry and wake progress watchers. Caller holds jobs_lock."""
+    job['updated_at'] = datetime.now().isoformat()
+    job['updated_at_ts'] = _now_ts()
+    job['version'] = int(job.get('version') or 0) + 1
+    _job_write_stats['writes'] += 1
+    _index_job(job_id, job)
+    _job_states[job_id].changed.notify_all()
+
+_WORD_TEXT_KEYS = ('word', 'text', 'token', 'value')
+
 def _get_word_text(word) -> str:
     """Best-effort extraction of word/token text from various WhisperX/ClipsAI word objects."""
-    for k in ('word', 'text', 'token', 'value'):
+    for k in _WORD_TEXT_KEYS:
         try:
             v = getattr(word, k)
         except Exception:
@@ -130,45 +119,88 @@ def _get_word_text(word) -> str:
             return v
     # Some libs store it as dict
     if isinstance(word, dict):
-        for k in ('word', 'text', 'token', 'value'):
+        for k in _WORD_TEXT_KEYS:
             v = word.get(k)
             if isinstance(v, str) and v.strip():
                 return v
     return ''
 
+def _read_word_span(word):
+    """(start_char, end_char, text) of one word of any shape."""
+    try:
+        start = int(getattr(word, 'start_char', 0) if not isinstance(word, dict) else word.get('start_char', 0))
+        end = int(getattr(word, 'end_char', 0) if not isinstance(word, dict) else word.get('end_char', 0))
+    except Exception:
+        start, end = 0, 0
+    return start, end, _get_word_text(word)
+
+def _word_span_reader(sample):
+    """
+    Resolve once, from one word, how this transcription's words expose their char span and text.
+    Returns read(word) -> (start_char, end_char, text); words that don't fit the resolved shape
+    fall back to _read_word_span.
+    """
+    is_dict = isinstance(sample, dict)
+    get = dict.get if is_dict else getattr
+    text_key = None
+    for k in _WORD_TEXT_KEYS:
+        try:
+            v = get(sample, k, None)
+        except Exception:
+            v = None
+        if isinstance(v, str) and v.strip():
+            text_key = k
+            break
+    if text_key is None:
+        return _read_word_span
+    
+    def read(word):
+        if isinstance(word, dict) != is_dict:
+            return _read_word_span(word)
+        try:
+            start = int(get(word, 'start_char', 0))
+            end = int(get(word, 'end_char', 0))
+            token = get(word, text_key, None)
+        except Exception:
+            return _read_word_span(word)
+        if not isinstance(token, str) or not token.strip():
+            token = _get_word_text(word)
+        return start, end, token
+    return read
+
 def _reconstruct_transcription_from_words(words) -> str:
     """
     Reconstruct a transcription string that matches start_char/end_char indices.
-    If we have start_char/end_char for words, we place each token into a char buffer.
+    Spans are laid out in start order with gaps filled by spaces; a token longer than its span is
+    cut to fit, and where spans overlap the earlier-starting word keeps the overlapped characters.
     """
     if not words:
         return ''
 
+    read = _word_span_reader(words[0])
     spans = []
     for w in words:
-        try:
-            start = int(getattr(w, 'start_char', 0) if not isinstance(w, dict) else w.get('start_char', 0))
-            end = int(getattr(w, 'end_char', 0) if not isinstance(w, dict) else w.get('end_char', 0))
-        except Exception:
-            start, end = 0, 0
-        token = _get_word_text(w)
+        start, end, token = read(w)
         if end > start and token:
             spans.append((start, end, token))
 
     if spans:
-        max_end = max(e for _, e, _ in spans)
-        buf = [' '] * max_end
+        # Already sorted for real transcriptions, which timsort handles in linear time
+        spans.sort(key=lambda span: (span[0], span[1]))
+        parts = []
+        cursor = 0
         for start, end, token in spans:
-            width = max(0, end - start)
-            if width == 0:
+            token = token[:end - start]
+            stop = start + len(token)
+            if stop <= cursor:
                 continue
-            # Fit token into span; if shorter, keep remaining as spaces.
-            token_slice = token[:width]
-            for i, ch in enumerate(token_slice):
-                idx = start + i
-                if 0 <= idx < len(buf):
-                    buf[idx] = ch
-        return ''.join(buf).rstrip()
+            if start > cursor:
+                parts.append(' ' * (start - cursor))
+                parts.append(token)
+            else:
+                parts.append(token[cursor - start:])
+            cursor = stop
+        return ''.join(parts).rstrip()
 
     # Fallback: join tokens with spaces (won't match char spans, but better than empty)
     tokens = [_get_word_text(w) for w in words]
@@ -236,318 +268,4395 @@ def _job_eta_seconds(job: dict) -> float | None:
     # Simple linear ETA: elapsed/progress * remaining_progress
     return max(0.0, (elapsed / progress_f) * (100.0 - progress_f))
 
-# Import ClipsAI after ensuring it's available
-try:
-    from clipsai import ClipFinder, Transcriber
-    CLIPSAI_AVAILABLE = True
-except ImportError:
-    CLIPSAI_AVAILABLE = False
+# Heavy imports.
+# torch, clipsai and yt_dlp take seconds to import, so only their presence is checked at startup;
+# the modules are imported on first use (the first job, or the warm-up thread below) through
+# _lazy_import, which records how long each one took in _import_times.
+# With INFERENCE_SOCKET set the web process hands transcription and clip finding to the inference
+# workers (see "Inference workers" below) and never imports torch/clipsai itself.
+INFERENCE_SOCKET = os.environ.get('INFERENCE_SOCKET') or None
+INFERENCE_ROLE = os.environ.get('INFERENCE_ROLE', 'web')  # web | worker (set by inference_worker.py)
+_remote_inference = bool(INFERENCE_SOCKET) and INFERENCE_ROLE == 'web'
+
+CLIPSAI_AVAILABLE = _remote_inference or importlib.util.find_spec('clipsai') is not None
+if not CLIPSAI_AVAILABLE:
     print("Warning: ClipsAI not installed. Install with: pip install clipsai", file=sys.stderr)
 
-try:
-    import yt_dlp
-    YT_DLP_AVAILABLE = True
-except ImportError:
-    YT_DLP_AVAILABLE = False
+YT_DLP_AVAILABLE = importlib.util.find_spec('yt_dlp') is not None
+if not YT_DLP_AVAILABLE:
     print("Warning: yt-dlp not installed. Install with: pip install yt-dlp", file=sys.stderr)
 
+_lazy_modules = {}
+_lazy_import_locks = {'clipsai': threading.Lock(), 'yt_dlp': threading.Lock()}
 
-@app.route('/health', methods=['GET'])
-def health():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'ok',
-        'clipsai_available': CLIPSAI_AVAILABLE,
-        'yt_dlp_available': YT_DLP_AVAILABLE
-    })
+def _configure_torch():
+    """
+    Configure PyTorch serialization. Must run before ClipsAI/WhisperX are imported, since they use
+    torch.load internally and PyTorch 2.6+ changed the default to weights_only=True, which blocks
+    various types.
+    """
+    started = time.perf_counter()
+    try:
+        import torch
+    except ImportError:
+        # PyTorch not available, will fail later when ClipsAI tries to use it
+        return
+    _import_times['torch'] = time.perf_counter() - started
+    import typing
+    
+    # Check if we're on PyTorch 2.6+ (has add_safe_globals)
+    if hasattr(torch.serialization, 'add_safe_globals'):
+        safe_globals = []
+        
+        # Add common typing types (needed by Pyannote/Lightning models)
+        safe_globals.extend([
+            typing.Any,
+            typing.Union,
+            typing.Optional,
+            typing.Dict,
+            typing.List,
+            typing.Tuple,
+            typing.Callable,
+            typing.Type,
+            typing.Generic,
+        ])
+        
+        # Add basic Python types (often needed by models)
+        safe_globals.extend([
+            dict,
+            list,
+            tuple,
+            int,
+            float,
+            str,
+            bool,
+            bytes,
+            bytearray,
+            collections.defaultdict,
+            collections.OrderedDict,
+        ])
+        
+        # Add omegaconf types (needed by WhisperX/ClipsAI/Pyannote models)
+        try:
+            from omegaconf import ListConfig, DictConfig, OmegaConf
+            from omegaconf.base import ContainerMetadata, Metadata
+            from omegaconf.nodes import AnyNode
+            safe_globals.extend([
+                ListConfig,
+                DictConfig,
+                OmegaConf,
+                ContainerMetadata,
+                Metadata,
+                AnyNode,
+            ])
+        except ImportError:
+            # Try with available types
+            try:
+                from omegaconf import ListConfig, DictConfig, OmegaConf
+                from omegaconf.base import ContainerMetadata
+                safe_globals.extend([ListConfig, DictConfig, OmegaConf, ContainerMetadata])
+            except ImportError:
+                # Try with just ListConfig if others not available
+                try:
+                    from omegaconf import ListConfig
+                    safe_globals.append(ListConfig)
+                except ImportError:
+                    pass
+        
+        # Add all safe globals at once
+        if safe_globals:
+            torch.serialization.add_safe_globals(safe_globals)
+            globals_list = [g.__name__ if hasattr(g, '__name__') else str(g) for g in safe_globals[:10]]
+            print(f"Configured torch.serialization to allow {len(safe_globals)} types (including: {', '.join(globals_list)}...)", file=sys.stderr)
+        
+        # Monkey patch torch.load to use weights_only=False for trusted models
+        # This is safe for HuggingFace/Pyannote models which are from trusted sources
+        # Some libraries (like Lightning Fabric) call torch.load with weights_only=True explicitly,
+        # so we need to override it
+        original_load = torch.load
+        def patched_load(*args, **kwargs):
+            # Force weights_only=False for trusted model loading
+            # Models from HuggingFace/Pyannote are trusted sources
+            kwargs['weights_only'] = False
+            return original_load(*args, **kwargs)
+        torch.load = patched_load
+        print("Patched torch.load to use weights_only=False (safe for trusted HuggingFace/Pyannote models)", file=sys.stderr)
 
-@app.route('/jobs', methods=['GET'])
-def list_jobs():
-    """List processing jobs (most recent first)"""
-    limit_raw = request.args.get('limit', '50')
+def _lazy_import(name: str, before=None):
+    """Import a heavy module once (running `before` first) and return it."""
+    module = _lazy_modules.get(name)
+    if module is not None:
+        return module
+    with _lazy_import_locks[name]:
+        if name not in _lazy_modules:
+            started = time.perf_counter()
+            if before is not None:
+                before()
+            _lazy_modules[name] = importlib.import_module(name)
+            _import_times[name] = time.perf_counter() - started
+            print(f"Imported {name} in {_import_times[name]:.2f}s", file=sys.stderr)
+    return _lazy_modules[name]
+
+def _clipsai():
+    """The clipsai module (torch is configured before it is first imported)."""
+    global CLIPSAI_AVAILABLE
     try:
-        limit = max(1, min(200, int(limit_raw)))
+        return _lazy_import('clipsai', before=_configure_torch)
+    except ImportError:
+        CLIPSAI_AVAILABLE = False
+        raise
+
+def _yt_dlp():
+    global YT_DLP_AVAILABLE
+    try:
+        return _lazy_import('yt_dlp')
+    except ImportError:
+        YT_DLP_AVAILABLE = False
+        raise
+
+# Process-wide model registry.
+# Transcriber/ClipFinder load WhisperX/pyannote/embedding weights in their constructors, so we keep
+# a single warm instance per model and hand out leases to the pipeline instead of rebuilding per job.
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', '0') == '1'
+# Max concurrent leases per model (the underlying models are not guaranteed to be thread-safe)
+MODEL_MAX_LEASES = max(1, int(os.environ.get('MODEL_MAX_LEASES', '1')))
+# Evict idle models when process RSS goes above this limit (0 disables eviction)
+MODEL_MEMORY_LIMIT_MB = float(os.environ.get('MODEL_MEMORY_LIMIT_MB', '0'))
+# A model must be idle at least this long before it can be evicted
+MODEL_IDLE_SECONDS = float(os.environ.get('MODEL_IDLE_SECONDS', '300'))
+# How often a background timer re-checks for idle models (leases only check when they end)
+MODEL_EVICTION_INTERVAL_SECONDS = max(1.0, float(os.environ.get('MODEL_EVICTION_INTERVAL_SECONDS', str(min(60.0, MODEL_IDLE_SECONDS)))))
+
+_model_factories = {
+    'transcriber': lambda: _clipsai().Transcriber(**_transcriber_kwargs()),
+    'clipfinder': lambda: _clipsai().ClipFinder(),
+}
+_models = {
+    name: {
+        'instance': None,
+        'state': 'unloaded',  # unloaded | loading | ready | failed
+        'error': None,
+        'loaded_at_ts': None,
+        'last_used_ts': None,
+        'load_seconds': None,
+        'rss_delta_bytes': None,
+        'leases': 0,
+        'load_count': 0,
+        'load_lock': threading.Lock(),
+        'lease_slots': threading.BoundedSemaphore(MODEL_MAX_LEASES),
+    }
+    for name in _model_factories
+}
+_models_lock = threading.Lock()
+_model_eviction_timer = None
+
+def _process_rss_bytes() -> int | None:
+    """Current resident set size of this process (None if it can't be determined)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
     except Exception:
-        limit = 50
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, not the current RSS, but it's the best we have off Linux
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+    except Exception:
+        return None
 
-    with jobs_lock:
-        # Sort by created_at_ts (fallback to created_at string)
-        items = list(jobs.items())
-        items.sort(key=lambda kv: kv[1].get('created_at_ts') or kv[1].get('created_at') or '', reverse=True)
-        items = items[:limit]
-
-        summaries = []
-        for job_id, job in items:
-            elapsed = _job_elapsed_seconds(job)
-            eta = _job_eta_seconds(job)
-            summaries.append({
-                'job_id': job_id,
-                'status': job.get('status'),
-                'progress': job.get('progress', 0),
-                'message': job.get('message', ''),
-                'error': job.get('error'),
-                'created_at': job.get('created_at'),
-                'updated_at': job.get('updated_at'),
-                'elapsed_seconds': elapsed,
-                'eta_seconds': eta,
-                'max_duration': job.get('max_duration'),
-                'url': job.get('url'),
-                'video': job.get('video'),
-            })
+def _load_model(name: str):
+    """Load a model into the registry if needed and return its instance."""
+    entry = _models[name]
+    with entry['load_lock']:
+        if entry['instance'] is not None:
+            return entry['instance']
+        _evict_idle_models()
+        with _models_lock:
+            entry['state'] = 'loading'
+            entry['error'] = None
+        rss_before = _process_rss_bytes()
+        started = _now_ts()
+        try:
+            instance = _model_factories[name]()
+        except Exception as e:
+            with _models_lock:
+                entry['state'] = 'failed'
+                entry['error'] = str(e)
+            raise
+        rss_after = _process_rss_bytes()
+        with _models_lock:
+            entry['instance'] = instance
+            entry['state'] = 'ready'
+            entry['loaded_at_ts'] = _now_ts()
+            entry['load_seconds'] = _now_ts() - started
+            entry['load_count'] += 1
+            if rss_before is not None and rss_after is not None:
+                entry['rss_delta_bytes'] = max(0, rss_after - rss_before)
+        print(f"Loaded model '{name}' in {entry['load_seconds']:.1f}s", file=sys.stderr)
+        _start_model_eviction_timer()
+        return instance
+
+def _start_model_eviction_timer():
+    """Once a model is resident, re-check for idle ones periodically so an idle server still sheds them."""
+    global _model_eviction_timer
+    if MODEL_MEMORY_LIMIT_MB <= 0:
+        return
+    with _models_lock:
+        if _model_eviction_timer is not None:
+            return
+        _model_eviction_timer = threading.Thread(target=_model_eviction_loop, name='model-eviction', daemon=True)
+    _model_eviction_timer.start()
 
-        return jsonify({'jobs': summaries})
+def _model_eviction_loop():
+    while True:
+        time.sleep(MODEL_EVICTION_INTERVAL_SECONDS)
+        try:
+            _evict_idle_models()
+        except Exception as e:
+            print(f"Idle model eviction failed: {e}", file=sys.stderr)
 
+@contextlib.contextmanager
+def _lease_model(name: str):
+    """Lease a warm model instance for the duration of a `with` block."""
+    entry = _models[name]
+    entry['lease_slots'].acquire()
+    try:
+        with _models_lock:
+            entry['leases'] += 1
+        try:
+            instance = _load_model(name)
+            yield instance
+        finally:
+            with _models_lock:
+                entry['leases'] -= 1
+                entry['last_used_ts'] = _now_ts()
+    finally:
+        entry['lease_slots'].release()
+    _evict_idle_models()
 
-@app.route('/jobs/<job_id>/status', methods=['GET'])
-def get_job_status(job_id):
-    """Get status of a processing job"""
-    with jobs_lock:
-        job = jobs.get(job_id)
-        if not job:
-            return jsonify({'error': 'Job not found'}), 404
-        elapsed = _job_elapsed_seconds(job)
-        eta = _job_eta_seconds(job)
-
-        payload = {
-            'job_id': job_id,
-            'status': job.get('status'),
-            'progress': job.get('progress', 0),
-            'message': job.get('message', ''),
-            'error': job.get('error'),
-            'created_at': job.get('created_at'),
-            'updated_at': job.get('updated_at'),
-            'elapsed_seconds': elapsed,
-            'eta_seconds': eta,
-            'max_duration': job.get('max_duration'),
-            'url': job.get('url'),
-            'video': job.get('video'),
+def _evict_idle_models(force: bool = False) -> list:
+    """
+    Drop idle models (least recently used first) while the process is above MODEL_MEMORY_LIMIT_MB.
+    With force=True every idle model is evicted regardless of memory usage.
+    """
+    if not force and MODEL_MEMORY_LIMIT_MB <= 0:
+        return []
+    limit_bytes = MODEL_MEMORY_LIMIT_MB * 1024 * 1024
+    evicted = []
+    while True:
+        rss = _process_rss_bytes()
+        if not force and (rss is None or rss <= limit_bytes):
+            break
+        now = _now_ts()
+        with _models_lock:
+            candidates = [
+                (entry['last_used_ts'] or entry['loaded_at_ts'] or 0, name)
+                for name, entry in _models.items()
+                if entry['instance'] is not None
+                and entry['leases'] == 0
+                and (force or now - (entry['last_used_ts'] or entry['loaded_at_ts'] or 0) >= MODEL_IDLE_SECONDS)
+            ]
+            if not candidates:
+                break
+            candidates.sort()
+            name = candidates[0][1]
+            entry = _models[name]
+            entry['instance'] = None
+            entry['state'] = 'unloaded'
+        evicted.append(name)
+        gc.collect()
+        torch_mod = sys.modules.get('torch')
+        if torch_mod is not None and torch_mod.cuda.is_available():
+            torch_mod.cuda.empty_cache()
+        print(f"Evicted idle model '{name}' (rss={rss})", file=sys.stderr)
+    return evicted
+
+def _models_snapshot() -> dict:
+    """Registry state for /health."""
+    with _models_lock:
+        return {
+            name: {
+                'state': entry['state'],
+                'error': entry['error'],
+                'leases': entry['leases'],
+                'load_count': entry['load_count'],
+                'load_seconds': entry['load_seconds'],
+                'loaded_at_ts': entry['loaded_at_ts'],
+                'last_used_ts': entry['last_used_ts'],
+                'rss_delta_bytes': entry['rss_delta_bytes'],
+            }
+            for name, entry in _models.items()
         }
 
-        # When completed, include result directly in status (requested by frontend)
-        if job.get('status') == 'completed':
-            payload['result'] = job.get('result', {})
+def _preload_models():
+    for name in _model_factories:
+        try:
+            _load_model(name)
+        except Exception as e:
+            print(f"Failed to preload model '{name}': {e}", file=sys.stderr)
 
-        return jsonify(payload)
 
+# Warm-up.
+# Right after startup a background thread imports yt_dlp and torch/clipsai, and preloads the models
+# when PRELOAD_MODELS=1, so the first job doesn't pay for it. /health/live answers as soon as Flask
+# is up; /health/ready returns 503 until the warm-up has finished.
+WARMUP = os.environ.get('WARMUP', '1') == '1' or PRELOAD_MODELS
 
-@app.route('/jobs/<job_id>/result', methods=['GET'])
-def get_job_result(job_id):
-    """Get result of a completed job"""
-    with jobs_lock:
-        job = jobs.get(job_id)
-        if not job:
-            return jsonify({'error': 'Job not found'}), 404
-        
-        if job['status'] != 'completed':
-            return jsonify({
-                'error': 'Job not completed',
-                'status': job['status']
-            }), 400
-        
-        return jsonify(job.get('result', {}))
+_warmup = {
+    'state': 'pending' if WARMUP else 'skipped',  # pending | running | ready | failed | skipped
+    'step': None,
+    'error': None,
+    'started_at_ts': None,
+    'finished_at_ts': None,
+}
+_warmup_lock = threading.Lock()
 
+def _warm_up():
+    steps = []
+    if YT_DLP_AVAILABLE:
+        steps.append(('yt_dlp', _yt_dlp))
+    if CLIPSAI_AVAILABLE and not _remote_inference:
+        steps.append(('clipsai', _clipsai))
+        if PRELOAD_MODELS:
+            steps.append(('models', _preload_models))
+    with _warmup_lock:
+        _warmup.update(state='running', started_at_ts=_now_ts())
+    for step, run in steps:
+        with _warmup_lock:
+            _warmup['step'] = step
+        try:
+            run()
+        except Exception as e:
+            print(f"Warm-up failed at '{step}': {e}", file=sys.stderr)
+            with _warmup_lock:
+                _warmup.update(state='failed', error=f'{step}: {e}', finished_at_ts=_now_ts())
+            return
+    with _warmup_lock:
+        _warmup.update(state='ready', step=None, finished_at_ts=_now_ts())
+    print(f"Warm-up finished in {_warmup['finished_at_ts'] - _warmup['started_at_ts']:.1f}s", file=sys.stderr)
 
-def update_job_status(job_id, status, progress=0, message='', error=None):
-    """Update job status"""
-    with jobs_lock:
-        if job_id in jobs:
-            jobs[job_id]['status'] = status
+def _warmup_snapshot() -> dict:
+    with _warmup_lock:
+        return dict(_warmup)
+
+def _import_times_snapshot() -> dict:
+    return {name: round(seconds, 3) for name, seconds in _import_times.items()}
+
+# Transcription settings (passed through to ClipsAI; also part of the transcription cache key)
+TRANSCRIBER_MODEL_SIZE = os.environ.get('TRANSCRIBER_MODEL_SIZE') or None
+TRANSCRIBE_LANGUAGE = os.environ.get('TRANSCRIBE_LANGUAGE') or None
+
+def _transcriber_kwargs() -> dict:
+    return {'model_size': TRANSCRIBER_MODEL_SIZE} if TRANSCRIBER_MODEL_SIZE else {}
+
+def _transcribe_kwargs() -> dict:
+    return {'iso6391_lang_code': TRANSCRIBE_LANGUAGE} if TRANSCRIBE_LANGUAGE else {}
+
+def _words_payload(transcription) -> list:
+    """Serialize transcription words into the API's dict-per-word shape."""
+    words_data = []
+    if hasattr(transcription, 'words'):
+        for word in transcription.words:
+            words_data.append({
+                'start_char': int(getattr(word, 'start_char', 0)),
+                'end_char': int(getattr(word, 'end_char', 0)),
+                'start_time': float(getattr(word, 'start_time', 0)),
+                'end_time': float(getattr(word, 'end_time', 0)),
+                'text': _get_word_text(word),
+            })
+    return words_data
+
+# Content-addressed transcription cache.
+# Entries are keyed by a hash of the decoded audio (so remuxes/re-uploads of the same media hit)
+# plus the transcription settings. Each entry stores the API payload and ClipsAI's own JSON dump
+# so clip finding can run again on a hit without re-transcribing.
+TRANSCRIPTION_CACHE_DIR = os.environ.get('TRANSCRIPTION_CACHE_DIR') or os.path.join(_downloads_root(), '.cache', 'transcriptions')
+TRANSCRIPTION_CACHE_MAX_MB = float(os.environ.get('TRANSCRIPTION_CACHE_MAX_MB', '512'))  # 0 disables the cache
+TRANSCRIPTION_CACHE_VERSION = 1
+
+_transcription_cache_lock = threading.Lock()
+_transcription_cache_index = None  # OrderedDict key -> size in bytes, least recently used first
+_transcription_cache_stats = {
+    'hits': 0,
+    'misses': 0,
+    'stores': 0,
+    'evictions': 0,
+    'errors': 0,
+}
+# (path, size, mtime) -> audio hash, so retries on the same file don't decode it again
+_audio_hash_memo = {}
+
+def _audio_content_hash(media_path: str) -> str:
+    """sha256 of the decoded mono 16kHz PCM audio (falls back to the raw file bytes without ffmpeg)."""
+    st = os.stat(media_path)
+    memo_key = (os.path.realpath(media_path), st.st_size, st.st_mtime_ns)
+    with _transcription_cache_lock:
+        cached = _audio_hash_memo.get(memo_key)
+    if cached:
+        return cached
+
+    h = hashlib.sha256()
+    digest = None
+    try:
+        proc = subprocess.Popen(
+            ['ffmpeg', '-v', 'error', '-i', media_path, '-vn', '-ac', '1', '-ar', '16000', '-f', 's16le', '-'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        for chunk in iter(lambda: proc.stdout.read(1 << 20), b''):
+            h.update(chunk)
+        if proc.wait() == 0:
+            digest = 'pcm-' + h.hexdigest()
+    except OSError:
+        pass
+    if digest is None:
+        h = hashlib.sha256()
+        with open(media_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = 'file-' + h.hexdigest()
+
+    with _transcription_cache_lock:
+        if len(_audio_hash_memo) > 1024:
+            _audio_hash_memo.clear()
+        _audio_hash_memo[memo_key] = digest
+    return digest
+
+def _transcription_cache_key(media_path: str) -> str | None:
+    if TRANSCRIPTION_CACHE_MAX_MB <= 0:
+        return None
+    try:
+        audio_hash = _audio_content_hash(media_path)
+    except Exception as e:
+        print(f"Could not hash audio for transcription cache: {e}", file=sys.stderr)
+        return None
+    config = json.dumps({
+        'v': TRANSCRIPTION_CACHE_VERSION,
+        'model_size': TRANSCRIBER_MODEL_SIZE,
+        'language': TRANSCRIBE_LANGUAGE,
+    }, sort_keys=True)
+    return hashlib.sha256(f'{audio_hash}|{config}'.encode()).hexdigest()
+
+def _transcription_cache_paths(key: str) -> tuple:
+    base = os.path.join(TRANSCRIPTION_CACHE_DIR, key)
+    return base + '.json', base + '.clipsai.json'
+
+def _load_transcription_cache_index():
+    """Build the LRU index from disk (oldest mtime first). Caller holds _transcription_cache_lock."""
+    global _transcription_cache_index
+    if _transcription_cache_index is not None:
+        return _transcription_cache_index
+    entries = []
+    if os.path.isdir(TRANSCRIPTION_CACHE_DIR):
+        for name in os.listdir(TRANSCRIPTION_CACHE_DIR):
+            if not name.endswith('.json') or name.endswith('.clipsai.json'):
+                continue
+            key = name[:-len('.json')]
+            size = 0
+            mtime = 0
+            for p in _transcription_cache_paths(key):
+                try:
+                    st = os.stat(p)
+                    size += st.st_size
+                    mtime = max(mtime, st.st_mtime)
+                except OSError:
+                    pass
+            entries.append((mtime, key, size))
+    entries.sort()
+    _transcription_cache_index = collections.OrderedDict((key, size) for _, key, size in entries)
+    return _transcription_cache_index
+
+def _evict_transcription_cache():
+    """Drop least recently used entries until under TRANSCRIPTION_CACHE_MAX_MB. Caller holds the lock."""
+    index = _load_transcription_cache_index()
+    limit = TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024
+    total = sum(index.values())
+    while index and total > limit:
+        key, size = index.popitem(last=False)
+        for p in _transcription_cache_paths(key):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        total -= size
+        _transcription_cache_stats['evictions'] += 1
+
+def _restore_transcription(native_path: str):
+    """Rebuild a ClipsAI Transcription object from its JSON dump (None if not possible)."""
+    try:
+        _clipsai()
+        from clipsai import Transcription
+    except ImportError:
+        try:
+            from clipsai.transcribe.transcription import Transcription
+        except ImportError:
+            return None
+    return Transcription(native_path)
+
+def _transcription_cache_get(key: str):
+    """Return (transcription, words_data, transcription_text) for a cached key, or None on a miss."""
+    meta_path, native_path = _transcription_cache_paths(key)
+    with _transcription_cache_lock:
+        index = _load_transcription_cache_index()
+        if key not in index:
+            _transcription_cache_stats['misses'] += 1
+            return None
+    try:
+        with open(meta_path) as f:
+            entry = json.load(f)
+        transcription = _restore_transcription(native_path)
+        if transcription is None:
+            raise ValueError('ClipsAI Transcription could not be restored')
+    except Exception as e:
+        print(f"Discarding unreadable transcription cache entry {key}: {e}", file=sys.stderr)
+        with _transcription_cache_lock:
+            _transcription_cache_stats['misses'] += 1
+            _transcription_cache_stats['errors'] += 1
+            size = _load_transcription_cache_index().pop(key, None)
+        if size is not None:
+            for p in (meta_path, native_path):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+        return None
+
+    with _transcription_cache_lock:
+        index = _load_transcription_cache_index()
+        if key in index:
+            index.move_to_end(key)
+        _transcription_cache_stats['hits'] += 1
+    for p in (meta_path, native_path):
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+    return transcription, entry['words'], entry['transcription']
+
+def _transcription_cache_put(key: str, transcription, words_data: list, transcription_text: str):
+    if not hasattr(transcription, 'store_as_json_file'):
+        return
+    meta_path, native_path = _transcription_cache_paths(key)
+    try:
+        os.makedirs(TRANSCRIPTION_CACHE_DIR, exist_ok=True)
+        tmp_native = f'{native_path}.{uuid.uuid4().hex}.tmp'
+        transcription.store_as_json_file(tmp_native)
+        os.replace(tmp_native, native_path)
+        tmp_meta = f'{meta_path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_meta, 'w') as f:
+            json.dump({
+                'key': key,
+                'created_at_ts': _now_ts(),
+                'words': words_data,
+                'transcription': transcription_text,
+            }, f)
+        os.replace(tmp_meta, meta_path)
+        size = os.path.getsize(meta_path) + os.path.getsize(native_path)
+    except Exception as e:
+        print(f"Failed to store transcription cache entry {key}: {e}", file=sys.stderr)
+        with _transcription_cache_lock:
+            _transcription_cache_stats['errors'] += 1
+        return
+    with _transcription_cache_lock:
+        index = _load_transcription_cache_index()
+        index[key] = size
+        index.move_to_end(key)
+        _transcription_cache_stats['stores'] += 1
+        _evict_transcription_cache()
+
+def _transcription_cache_snapshot() -> dict:
+    with _transcription_cache_lock:
+        index = _load_transcription_cache_index()
+        lookups = _transcription_cache_stats['hits'] + _transcription_cache_stats['misses']
+        return {
+            **_transcription_cache_stats,
+            'hit_rate': (_transcription_cache_stats['hits'] / lookups) if lookups else None,
+            'entries': len(index),
+            'size_bytes': sum(index.values()),
+            'max_bytes': int(TRANSCRIPTION_CACHE_MAX_MB * 1024 * 1024),
+            'enabled': TRANSCRIPTION_CACHE_MAX_MB > 0,
+        }
+
+# Chunked transcription for long media.
+# The audio is split near silences into ~TRANSCRIBE_CHUNK_SECONDS pieces (each padded backwards by
+# TRANSCRIBE_CHUNK_OVERLAP_SECONDS), transcribed in a pool of worker processes and stitched back
+# at the ClipsAI char_info level, so global char offsets and timestamps line up with the full text.
+CHUNKED_TRANSCRIPTION = os.environ.get('CHUNKED_TRANSCRIPTION', '1') == '1'
+# Only media at least this long is split
+CHUNKED_TRANSCRIPTION_MIN_SECONDS = float(os.environ.get('CHUNKED_TRANSCRIPTION_MIN_SECONDS', '1200'))
+TRANSCRIBE_CHUNK_SECONDS = max(30.0, float(os.environ.get('TRANSCRIBE_CHUNK_SECONDS', '300')))
+TRANSCRIBE_CHUNK_OVERLAP_SECONDS = max(0.0, float(os.environ.get('TRANSCRIBE_CHUNK_OVERLAP_SECONDS', '2')))
+# Each worker process holds its own Whisper model, so this is bounded by RAM as much as by cores
+TRANSCRIBE_CHUNK_WORKERS = max(1, int(os.environ.get('TRANSCRIBE_CHUNK_WORKERS') or min(4, max(1, (os.cpu_count() or 1) // 4))))
+
+_chunk_pool = None
+_chunk_pool_lock = threading.Lock()
+_chunk_worker_transcriber = None  # per worker process
+
+def _detect_silences(media_path: str) -> tuple:
+    """Run ffmpeg silencedetect once; returns (duration, [(silence_start, silence_end), ...])."""
+    proc = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-nostats', '-i', media_path, '-vn',
+         '-af', 'silencedetect=noise=-35dB:d=0.4', '-f', 'null', '-'],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f'silencedetect failed: {proc.stderr[-500:]}')
+    duration = None
+    silences = []
+    silence_start = None
+    for line in proc.stderr.splitlines():
+        line = line.strip()
+        if duration is None and line.startswith('Duration:'):
+            hms = line.split(',')[0].split('Duration:')[1].strip()
+            try:
+                h, m, sec = hms.split(':')
+                duration = int(h) * 3600 + int(m) * 60 + float(sec)
+            except ValueError:
+                pass
+        elif 'silence_start:' in line:
+            silence_start = float(line.split('silence_start:')[1].split()[0])
+        elif 'silence_end:' in line and silence_start is not None:
+            silences.append((silence_start, float(line.split('silence_end:')[1].split()[0])))
+            silence_start = None
+    return duration, silences
+
+def _plan_transcription_chunks(media_path: str) -> list | None:
+    """
+    Chunk boundaries [(start, end), ...] for a long file, cut at the silence closest to each
+    TRANSCRIBE_CHUNK_SECONDS mark (hard cut when there's none nearby). None means don't chunk.
+    """
+    if not CHUNKED_TRANSCRIPTION:
+        return None
+    try:
+        duration, silences = _detect_silences(media_path)
+    except Exception as e:
+        print(f"Chunked transcription disabled for {media_path}: {e}", file=sys.stderr)
+        return None
+    if not duration or duration < max(CHUNKED_TRANSCRIPTION_MIN_SECONDS, 2 * TRANSCRIBE_CHUNK_SECONDS):
+        return None
+
+    midpoints = [(s + e) / 2.0 for s, e in silences]
+    window = TRANSCRIBE_CHUNK_SECONDS * 0.2
+    cuts = []
+    last = 0.0
+    while duration - last > TRANSCRIBE_CHUNK_SECONDS * 1.2:
+        target = last + TRANSCRIBE_CHUNK_SECONDS
+        nearby = [m for m in midpoints if abs(m - target) <= window and m > last]
+        cut = min(nearby, key=lambda m: abs(m - target)) if nearby else target
+        cuts.append(cut)
+        last = cut
+    bounds = [0.0] + cuts + [duration]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _chunk_worker_init(threads: int):
+    try:
+        import torch as torch_mod
+        torch_mod.set_num_threads(max(1, threads))
+    except ImportError:
+        pass
+
+def _transcribe_chunk(media_path: str, start: float, end: float, work_dir: str, index: int,
+                      transcriber_kwargs: dict, transcribe_kwargs: dict) -> dict:
+    """Worker process entry point: cut one chunk to wav, transcribe it and return ClipsAI's JSON dump."""
+    global _chunk_worker_transcriber
+    wav_path = os.path.join(work_dir, f'chunk-{index:04d}.wav')
+    subprocess.run(
+        ['ffmpeg', '-v', 'error', '-y', '-ss', f'{start:.3f}', '-t', f'{end - start:.3f}',
+         '-i', media_path, '-vn', '-ac', '1', '-ar', '16000', wav_path],
+        check=True,
+    )
+    if _chunk_worker_transcriber is None:
+        _chunk_worker_transcriber = _clipsai().Transcriber(**transcriber_kwargs)
+    transcription = _chunk_worker_transcriber.transcribe(audio_file_path=wav_path, **transcribe_kwargs)
+    json_path = os.path.join(work_dir, f'chunk-{index:04d}.json')
+    transcription.store_as_json_file(json_path)
+    os.remove(wav_path)
+    with open(json_path) as f:
+        return json.load(f)
+
+def _get_chunk_pool():
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            threads = max(1, (os.cpu_count() or 1) // TRANSCRIBE_CHUNK_WORKERS)
+            # spawn, not fork: forking a threaded Flask/torch process is unsafe
+            _chunk_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=TRANSCRIBE_CHUNK_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_chunk_worker_init,
+                initargs=(threads,),
+            )
+        return _chunk_pool
+
+def _split_char_info_words(char_info: list) -> list:
+    """Group char_info entries into words (lists of chars) separated by spaces."""
+    words = []
+    current = []
+    for ch in char_info:
+        if ch.get('char') == ' ':
+            if current:
+                words.append(current)
+                current = []
+        else:
+            current.append(ch)
+    if current:
+        words.append(current)
+    return words
+
+def _stitch_chunk_transcriptions(chunks: list) -> dict:
+    """
+    Merge per-chunk ClipsAI transcription dumps into one.
+    chunks: [(nominal_start, nominal_end, audio_offset, dump), ...] in order. Each word is shifted by
+    its chunk's audio offset and kept only by the chunk whose nominal range contains its start time,
+    which drops duplicates from the overlap padding.
+    """
+    merged_chars = []
+    last_end = 0.0
+    for i, (nominal_start, nominal_end, offset, dump) in enumerate(chunks):
+        is_first = i == 0
+        is_last = i == len(chunks) - 1
+        for word in _split_char_info_words(dump.get('char_info') or []):
+            times = [c.get('start_time') for c in word if c.get('start_time') is not None]
+            word_start = (min(times) + offset) if times else last_end
+            if not is_first and word_start < nominal_start:
+                continue
+            if not is_last and word_start >= nominal_end:
+                continue
+            if merged_chars:
+                merged_chars.append({
+                    **merged_chars[-1],
+                    'char': ' ',
+                    'start_time': last_end,
+                    'end_time': last_end,
+                })
+            for c in word:
+                shifted = dict(c)
+                for k in ('start_time', 'end_time'):
+                    if shifted.get(k) is not None:
+                        shifted[k] = float(shifted[k]) + offset
+                merged_chars.append(shifted)
+                if shifted.get('end_time') is not None:
+                    last_end = shifted['end_time']
+
+    # The dump's top-level fields are set one by one: Whisper detects the language per chunk and
+    # each chunk counts its own speakers, so copying chunk 0 would misreport both.
+    dumps = [dump for *_, dump in chunks]
+    languages = [d.get('language') for d in dumps if d.get('language')]
+    speakers = [d.get('num_speakers') for d in dumps if isinstance(d.get('num_speakers'), int)]
+    return {
+        'source_software': dumps[0].get('source_software'),
+        'time_created': dumps[0].get('time_created'),
+        'language': max(languages, key=languages.count) if languages else None,
+        'num_speakers': max(speakers) if speakers else None,
+        'char_info': merged_chars,
+    }
+
+def _transcribe_chunked(media_path: str, plan: list, progress=None):
+    """Transcribe `plan` chunks of a media file in the worker pool and return one ClipsAI Transcription."""
+    work_dir = tempfile.mkdtemp(prefix='transcribe-chunks-')
+    try:
+        pool = _get_chunk_pool()
+        futures = {}
+        for index, (start, end) in enumerate(plan):
+            audio_start = max(0.0, start - TRANSCRIBE_CHUNK_OVERLAP_SECONDS)
+            future = pool.submit(
+                _transcribe_chunk, media_path, audio_start, end, work_dir, index,
+                _transcriber_kwargs(), _transcribe_kwargs(),
+            )
+            futures[future] = (index, start, end, audio_start)
+
+        results = [None] * len(plan)
+        done = 0
+        for future in concurrent.futures.as_completed(futures):
+            index, start, end, audio_start = futures[future]
+            results[index] = (start, end, audio_start, future.result())
+            done += 1
+            if progress:
+                progress(done / len(plan), f'Transcribed chunk {done}/{len(plan)}')
+
+        stitched_path = os.path.join(work_dir, 'stitched.json')
+        with open(stitched_path, 'w') as f:
+            json.dump(_stitch_chunk_transcriptions(results), f)
+        transcription = _restore_transcription(stitched_path)
+        if transcription is None:
+            raise RuntimeError('ClipsAI Transcription could not be rebuilt from chunks')
+        return transcription
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def _transcribe_with_cache(media_path: str, progress=None) -> tuple:
+    """
+    Transcribe a media file, reusing a cached transcription of the same audio when available.
+    Long files are transcribed in parallel chunks; progress(fraction, message) is called per chunk.
+    Returns (transcription, words_data, transcription_text).
+    """
+    key = _transcription_cache_key(media_path)
+    if key:
+        cached = _transcription_cache_get(key)
+        if cached is not None:
+            print(f"Transcription cache hit for {media_path}", file=sys.stderr)
+            return cached
+
+    plan = _plan_transcription_chunks(media_path)
+    if plan and len(plan) > 1:
+        print(f"Transcribing {media_path} in {len(plan)} chunks with {TRANSCRIBE_CHUNK_WORKERS} workers", file=sys.stderr)
+        transcription = _transcribe_chunked(media_path, plan, progress)
+    else:
+        with _lease_model('transcriber') as transcriber:
+            transcription = transcriber.transcribe(audio_file_path=media_path, **_transcribe_kwargs())
+    words_data = _words_payload(transcription)
+    transcription_text = _extract_transcription_text(transcription)
+    if key:
+        _transcription_cache_put(key, transcription, words_data, transcription_text)
+    return transcription, words_data, transcription_text
+
+
+def _clip_spans(clips, transcription_text: str) -> list:
+    """ClipsAI clips as plain dicts (what crosses the inference socket)."""
+    return [
+        {
+            'start_time': float(clip.start_time),
+            'end_time': float(clip.end_time),
+            'start_char': int(getattr(clip, 'start_char', 0)),
+            'end_char': int(getattr(clip, 'end_char', len(transcription_text))),
+        }
+        for clip in clips
+    ]
+
+def _analyze_media_local(media_path: str, progress=None, on_stage=None) -> tuple:
+    """Transcribe a media file and find its clips in this process."""
+    _transcription, words_data, transcription_text = _transcribe_with_cache(media_path, progress)
+    if on_stage:
+        on_stage('finding_clips')
+    with _lease_model('clipfinder') as clipfinder:
+        clips = clipfinder.find_clips(transcription=_transcription)
+    return words_data, transcription_text, _clip_spans(clips, transcription_text)
+
+def _analyze_media(media_path: str, progress=None, on_stage=None) -> tuple:
+    """
+    Transcribe a media file and find its clips, in an inference worker when INFERENCE_SOCKET is set.
+    progress(fraction, message) is called per transcription chunk and on_stage('finding_clips') once
+    transcription is done. Returns (words_data, transcription_text, clips as dicts).
+    """
+    if _remote_inference:
+        return tuple(_inference_call('analyze', progress, on_stage, media_path=os.path.abspath(media_path)))
+    return _analyze_media_local(media_path, progress, on_stage)
+
+
+# Inference workers.
+# `python inference_worker.py` runs long-lived worker processes that own the models and serve
+# transcription/clip finding over the INFERENCE_SOCKET Unix socket, so the web tier (any number of
+# web processes) stays thin and never competes with inference for the GIL. The workers share one
+# listening socket: each takes one request at a time, so a request goes to an idle worker and waits
+# in the accept backlog while all are busy. Messages are pickled dicts (multiprocessing.connection);
+# the socket is created mode 0600. A worker that dies is replaced by the supervisor process.
+INFERENCE_WORKERS = max(1, int(os.environ.get('INFERENCE_WORKERS', '1')))
+# How long the web tier keeps retrying to reach a worker (e.g. while workers restart)
+INFERENCE_CONNECT_TIMEOUT = float(os.environ.get('INFERENCE_CONNECT_TIMEOUT', '30'))
+
+def _inference_connect():
+    deadline = time.monotonic() + INFERENCE_CONNECT_TIMEOUT
+    while True:
+        try:
+            return multiprocessing.connection.Client(INFERENCE_SOCKET, family='AF_UNIX')
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f'No inference worker listening on {INFERENCE_SOCKET}: {e}') from e
+            time.sleep(0.5)
+
+def _inference_call(op: str, progress=None, on_stage=None, **params):
+    """Run `op` in an inference worker, relaying its progress messages; returns its result."""
+    with _inference_connect() as conn:
+        conn.send({'op': op, **params})
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                raise RuntimeError('Inference worker exited during the request') from None
+            if 'progress' in message:
+                if progress:
+                    progress(message['progress'], message['message'])
+            elif 'stage' in message:
+                if on_stage:
+                    on_stage(message['stage'])
+            elif 'error' in message:
+                raise RuntimeError(f"Inference worker failed: {message['error']}")
+            else:
+                return message['result']
+
+def _inference_reachable() -> bool:
+    """Whether a worker is listening (connects only; never waits for a busy worker)."""
+    try:
+        multiprocessing.connection.Client(INFERENCE_SOCKET, family='AF_UNIX').close()
+        return True
+    except OSError:
+        return False
+
+def _handle_inference_request(conn):
+    try:
+        message = conn.recv()
+    except EOFError:
+        # _inference_reachable probe
+        return
+    op = message.get('op')
+    try:
+        if op == 'analyze':
+            result = _analyze_media_local(
+                message['media_path'],
+                progress=lambda fraction, text: conn.send({'progress': fraction, 'message': text}),
+                on_stage=lambda stage: conn.send({'stage': stage}),
+            )
+        elif op == 'ping':
+            result = {'pid': os.getpid(), 'models': _models_snapshot(), 'import_seconds': _import_times_snapshot()}
+        else:
+            raise ValueError(f'Unknown inference op {op!r}')
+        conn.send({'result': result})
+    except (BrokenPipeError, ConnectionResetError):
+        print(f"Inference client went away during '{op}'", file=sys.stderr)
+    except Exception as e:
+        try:
+            conn.send({'error': str(e)})
+        except OSError:
+            pass
+
+def _inference_worker_loop(listener):
+    try:
+        _clipsai()
+        _preload_models()
+    except ImportError as e:
+        print(f"Inference worker {os.getpid()}: ClipsAI unavailable ({e})", file=sys.stderr)
+    print(f"Inference worker {os.getpid()} serving {INFERENCE_SOCKET}", file=sys.stderr)
+    while True:
+        conn = listener.accept()
+        with conn:
+            _handle_inference_request(conn)
+
+def serve_inference(workers: int = INFERENCE_WORKERS):
+    """Bind INFERENCE_SOCKET and run `workers` inference worker processes until SIGTERM/SIGINT."""
+    if not INFERENCE_SOCKET:
+        raise SystemExit('INFERENCE_SOCKET is not set')
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(INFERENCE_SOCKET)
+    umask = os.umask(0o177)
+    try:
+        listener = multiprocessing.connection.Listener(INFERENCE_SOCKET, family='AF_UNIX', backlog=128)
+    finally:
+        os.umask(umask)
+
+    children = set()
+    stopping = False
+
+    def _spawn():
+        # fork before any model is loaded; each child loads its own
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                _inference_worker_loop(listener)
+            finally:
+                os._exit(1)
+        children.add(pid)
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for _ in range(workers):
+        _spawn()
+    print(f"Started {workers} inference worker(s) on {INFERENCE_SOCKET}", file=sys.stderr)
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            children.discard(pid)
+            if not stopping:
+                print(f"Inference worker {pid} exited ({status}), restarting", file=sys.stderr)
+                time.sleep(1)
+                _spawn()
+    finally:
+        listener.close()
+
+# Shared YouTube download cache.
+# Downloads are keyed by extractor + video ID + the resolved format, stored under
+# downloads/.cache/youtube/<key>/ and reused across jobs. Concurrent requests for the same key
+# coalesce onto a single in-flight download (single-flight); followers get the leader's progress.
+YOUTUBE_FORMAT = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+YOUTUBE_AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio'
+MEDIA_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.m4a', '.mp3', '.opus', '.ogg')
+
+_inflight_downloads = {}
+_inflight_downloads_lock = threading.Lock()
+_download_cache_stats = {
+    'hits': 0,
+    'misses': 0,
+    'coalesced': 0,
+}
+
+# Download engine settings (yt-dlp does the fetching; see _fetch_into_cache).
+# Fragmented formats (DASH/HLS) fetch this many fragments at once
+DOWNLOAD_CONCURRENT_FRAGMENTS = max(1, int(os.environ.get('DOWNLOAD_CONCURRENT_FRAGMENTS', '4')))
+# yt-dlp's own per-request/per-fragment retries, with exponential backoff between them
+DOWNLOAD_RETRIES = max(0, int(os.environ.get('DOWNLOAD_RETRIES', '10')))
+# Whole-download attempts; each one resumes from the .part files the previous one left
+DOWNLOAD_ATTEMPTS = max(1, int(os.environ.get('DOWNLOAD_ATTEMPTS', '3')))
+DOWNLOAD_BACKOFF_SECONDS = float(os.environ.get('DOWNLOAD_BACKOFF_SECONDS', '1'))
+DOWNLOAD_BACKOFF_MAX_SECONDS = float(os.environ.get('DOWNLOAD_BACKOFF_MAX_SECONDS', '60'))
+# Bandwidth caps in bytes/s (0 = unlimited): per download (a job can ask for less) and node-wide
+DOWNLOAD_RATE_LIMIT = max(0, int(float(os.environ.get('DOWNLOAD_RATE_LIMIT', '0'))))
+DOWNLOAD_GLOBAL_RATE_LIMIT = max(0, int(float(os.environ.get('DOWNLOAD_GLOBAL_RATE_LIMIT', '0'))))
+# Partial downloads nobody resumed within this long are deleted
+DOWNLOAD_PARTIAL_MAX_AGE_HOURS = float(os.environ.get('DOWNLOAD_PARTIAL_MAX_AGE_HOURS', '24'))
+# Errors that no amount of retrying will fix
+_PERMANENT_DOWNLOAD_ERRORS = ('Video unavailable', 'Private video', 'This video has been removed', 'copyright')
+
+class _RateLimiter:
+    """Token bucket shared by every download it throttles (rate in bytes/s; 0 = unlimited)."""
+    __slots__ = ('rate', 'allowance', 'stamp', 'lock')
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.allowance = float(rate)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, nbytes: int):
+        """Account for `nbytes` just received, sleeping long enough to stay under the rate."""
+        if self.rate <= 0 or nbytes <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            # At most one second of burst
+            self.allowance = min(float(self.rate), self.allowance + (now - self.stamp) * self.rate) - nbytes
+            self.stamp = now
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+_global_rate_limiter = _RateLimiter(DOWNLOAD_GLOBAL_RATE_LIMIT)
+
+def _download_backoff(n: int) -> float:
+    """Seconds to wait before retry `n` (0-based); yt-dlp's retry_sleep_functions pass it as n=."""
+    return min(DOWNLOAD_BACKOFF_MAX_SECONDS, DOWNLOAD_BACKOFF_SECONDS * 2 ** n)
+
+def _throttle_hook(rate_limit: int):
+    """
+    yt-dlp progress hook enforcing the per-download and global caps. Hooks run on the threads that
+    receive the data (one per fragment with concurrent fragments), so sleeping here slows the
+    transfer itself; the byte count is the delta of the download's running total.
+    """
+    limiter = _RateLimiter(rate_limit)
+    seen = {'bytes': None}
+    lock = threading.Lock()
+
+    def _hook(d):
+        if d.get('status') != 'downloading':
+            return
+        total = d.get('downloaded_bytes') or 0
+        with lock:
+            # The first report of an attempt includes whatever was resumed from .part files
+            delta = 0 if seen['bytes'] is None else max(0, total - seen['bytes'])
+            seen['bytes'] = max(total, seen['bytes'] or 0)
+        limiter.consume(delta)
+        _global_rate_limiter.consume(delta)
+    return _hook
+
+def _remove_stale_partials(cache_root: str):
+    cutoff = _now_ts() - DOWNLOAD_PARTIAL_MAX_AGE_HOURS * 3600
+    for name in os.listdir(cache_root):
+        if not name.startswith('.partial-'):
+            continue
+        path = os.path.join(cache_root, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+        except OSError:
+            pass
+
+def _youtube_cache_root() -> str:
+    return os.path.join(_downloads_root(), '.cache', 'youtube')
+
+def _safe_filename(title: str) -> str:
+    safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return safe_title[:100]
+
+def _find_media_file(directory: str) -> str | None:
+    for f in os.listdir(directory):
+        if f.endswith(MEDIA_EXTENSIONS):
+            return os.path.join(directory, f)
+    return None
+
+def _download_cache_key(url: str, info: dict, fmt: str = YOUTUBE_FORMAT) -> str:
+    video_id = "".join(c for c in str(info.get('id') or '') if c.isalnum() or c in ('-', '_'))
+    if not video_id:
+        # No stable ID from the extractor: fall back to the URL itself
+        return 'url-' + hashlib.sha1(url.encode()).hexdigest()
+    extractor = "".join(c for c in str(info.get('extractor_key') or 'youtube').lower() if c.isalnum())
+    # info was extracted with YOUTUBE_FORMAT, so its resolved format_id only describes that format
+    format_id = str(info.get('format_id') or fmt) if fmt == YOUTUBE_FORMAT else fmt
+    return f"{extractor}-{video_id}-{hashlib.sha1(format_id.encode()).hexdigest()[:10]}"
+
+def _cached_download_path(key: str) -> str | None:
+    """Path of a completed cached download (None if missing or incomplete)."""
+    entry_dir = os.path.join(_youtube_cache_root(), key)
+    try:
+        with open(os.path.join(entry_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        path = os.path.join(entry_dir, meta['filename'])
+    except Exception:
+        return None
+    if not os.path.isfile(path):
+        return None
+    try:
+        os.utime(os.path.join(entry_dir, 'meta.json'))
+    except OSError:
+        pass
+    return path
+
+def _fetch_into_cache(url: str, info: dict, key: str, flight: dict, fmt: str = YOUTUBE_FORMAT,
+                      rate_limit: int | None = None) -> str:
+    """
+    Download into the key's staging dir, then atomically move the result into the cache entry.
+    The staging dir is per key and survives failures, so a retry (or the same video requested
+    after a restart) resumes from the .part files instead of starting over.
+    """
+    cache_root = _youtube_cache_root()
+    os.makedirs(cache_root, exist_ok=True)
+    _remove_stale_partials(cache_root)
+    staging_dir = os.path.join(cache_root, f'.partial-{key}')
+    os.makedirs(staging_dir, exist_ok=True)
+
+    def _fan_out_progress(d):
+        with _inflight_downloads_lock:
+            hooks = list(flight['hooks'])
+        for hook in hooks:
+            hook(d)
+
+    # Single-flight covers this process; the lock covers other web processes on the same cache
+    with open(f'{staging_dir}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        cached = _cached_download_path(key)
+        if cached:
+            return cached
+
+        # Mark the lock as in use so _remove_stale_partials leaves it alone
+        os.utime(f'{staging_dir}.lock')
+        rate = min((r for r in (rate_limit, DOWNLOAD_RATE_LIMIT) if r), default=0)
+        ydl_opts = {
+            'format': fmt,
+            'outtmpl': os.path.join(staging_dir, f"{_safe_filename(info.get('title') or 'Downloaded Video')}.%(ext)s"),
+            'quiet': False,
+            'progress_hooks': [_throttle_hook(rate), _fan_out_progress],
+            'concurrent_fragment_downloads': DOWNLOAD_CONCURRENT_FRAGMENTS,
+            'continuedl': True,
+            'retries': DOWNLOAD_RETRIES,
+            'fragment_retries': DOWNLOAD_RETRIES,
+            'retry_sleep_functions': {'http': _download_backoff, 'fragment': _download_backoff},
+            'socket_timeout': 30,
+        }
+        for attempt in range(DOWNLOAD_ATTEMPTS):
+            try:
+                with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                    ydl.download([url])
+                break
+            except Exception as e:
+                if attempt + 1 >= DOWNLOAD_ATTEMPTS or any(m in str(e) for m in _PERMANENT_DOWNLOAD_ERRORS):
+                    raise
+                delay = _download_backoff(attempt)
+                print(f"Download of {url} failed ({e}), resuming in {delay:.0f}s "
+                      f"(attempt {attempt + 2}/{DOWNLOAD_ATTEMPTS})", file=sys.stderr)
+                time.sleep(delay)
+
+        downloaded = _find_media_file(staging_dir)
+        if not downloaded:
+            raise RuntimeError('Downloaded media file not found')
+
+        entry_dir = os.path.join(cache_root, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        filename = os.path.basename(downloaded)
+        os.replace(downloaded, os.path.join(entry_dir, filename))
+        meta_tmp = os.path.join(entry_dir, f'meta.json.{uuid.uuid4().hex}.tmp')
+        with open(meta_tmp, 'w') as f:
+            json.dump({
+                'key': key,
+                'url': url,
+                'video_id': info.get('id'),
+                'format': fmt,
+                'title': info.get('title'),
+                'filename': filename,
+                'created_at_ts': _now_ts(),
+            }, f)
+        os.replace(meta_tmp, os.path.join(entry_dir, 'meta.json'))
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        _wake_storage_manager()
+        return os.path.join(entry_dir, filename)
+
+def _download_youtube_cached(url: str, info: dict, progress_hook=None, fmt: str = YOUTUBE_FORMAT,
+                             rate_limit: int | None = None) -> str:
+    """
+    Return the cached media file for an extracted video and format, downloading it at most once.
+    rate_limit (bytes/s) caps this download below DOWNLOAD_RATE_LIMIT; followers share the leader's.
+    """
+    key = _download_cache_key(url, info, fmt)
+    path = _cached_download_path(key)
+    if path:
+        with _inflight_downloads_lock:
+            _download_cache_stats['hits'] += 1
+        return path
+
+    with _inflight_downloads_lock:
+        flight = _inflight_downloads.get(key)
+        leader = flight is None
+        if leader:
+            flight = {'event': threading.Event(), 'hooks': [], 'path': None, 'error': None}
+            _inflight_downloads[key] = flight
+            _download_cache_stats['misses'] += 1
+        else:
+            _download_cache_stats['coalesced'] += 1
+        if progress_hook:
+            flight['hooks'].append(progress_hook)
+
+    if not leader:
+        flight['event'].wait()
+        if flight['error']:
+            raise RuntimeError(f"Shared download failed: {flight['error']}")
+        return flight['path']
+
+    try:
+        # Another leader may have finished between our cache check and registering the flight
+        flight['path'] = _cached_download_path(key) or _fetch_into_cache(url, info, key, flight, fmt, rate_limit)
+        return flight['path']
+    except Exception as e:
+        flight['error'] = str(e)
+        raise
+    finally:
+        with _inflight_downloads_lock:
+            _inflight_downloads.pop(key, None)
+        flight['event'].set()
+
+def _materialize_download(cached_path: str, target_dir: str) -> str:
+    """
+    Expose a cached download inside a per-request dir. Hardlinks keep this free and let
+    clients delete the request dir without touching the cache; copies are the fallback.
+    """
+    target = os.path.join(target_dir, os.path.basename(cached_path))
+    try:
+        os.link(cached_path, target)
+    except OSError:
+        shutil.copy2(cached_path, target)
+    return target
+
+def _download_cache_snapshot() -> dict:
+    with _inflight_downloads_lock:
+        return {
+            **_download_cache_stats,
+            'in_flight': len(_inflight_downloads),
+        }
+
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    """Liveness probe: the process is up and serving requests (no locks, no imports)."""
+    return jsonify({'status': 'ok'})
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """
+    Readiness probe: 503 until the warm-up (heavy imports, model preload) has finished, or while no
+    inference worker is listening when INFERENCE_SOCKET is set.
+    """
+    warmup = _warmup_snapshot()
+    inference = {'socket': INFERENCE_SOCKET, 'reachable': _inference_reachable()} if _remote_inference else None
+    if warmup['state'] in ('pending', 'running'):
+        status = 'warming_up'
+    elif warmup['state'] == 'failed':
+        status = 'failed'
+    elif inference and not inference['reachable']:
+        status = 'no_inference_worker'
+    else:
+        status = 'ready'
+    ready = status == 'ready'
+    return jsonify({
+        'status': status,
+        'warmup': warmup,
+        'inference': inference,
+        'clipsai_available': CLIPSAI_AVAILABLE,
+        'yt_dlp_available': YT_DLP_AVAILABLE,
+        'import_seconds': _import_times_snapshot(),
+    }), 200 if ready else 503
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Health check endpoint"""
+    return jsonify({
+        'status': 'ok',
+        'clipsai_available': CLIPSAI_AVAILABLE,
+        'yt_dlp_available': YT_DLP_AVAILABLE,
+        'warmup': _warmup_snapshot(),
+        'import_seconds': _import_times_snapshot(),
+        'models': _models_snapshot(),
+        'process_rss_bytes': _process_rss_bytes(),
+        'model_memory_limit_mb': MODEL_MEMORY_LIMIT_MB or None,
+        'transcription_cache': _transcription_cache_snapshot(),
+        'download_cache': _download_cache_snapshot(),
+        'probe_cache': _probe_snapshot(),
+        'media': _media_snapshot(),
+        'storage': dict(_storage_stats, enforced=_storage_limits_enabled()),
+        'jobs': _jobs_snapshot(),
+    })
+
+# Job index and snapshots.
+# Every job has a slotted _JobState holding an immutable snapshot of its public fields, republished
+# on every change (_touch_job) by swapping the reference, so readers (/jobs, /jobs/<id>/status, SSE)
+# never need jobs_lock. /jobs pages through a creation-order list of job ids plus per-status sorted
+# lists of their sequence numbers: O(log n + limit) per page instead of copying and sorting every job.
+_job_order = []  # seq -> job_id, in creation order
+_job_order_ts = []  # seq -> created_at_ts, for since= lookups
+_job_seq = {}  # job_id -> seq
+_jobs_by_status = collections.defaultdict(list)  # status -> sorted seqs
+_job_states = {}  # job_id -> _JobState
+_job_write_stats = {'writes': 0, 'since_ts': _now_ts()}
+
+_JOB_SNAPSHOT_KEYS = (
+    'version', 'status', 'progress', 'message', 'error', 'created_at', 'updated_at', 'max_duration', 'url',
+    'video', 'stage', 'priority', 'queue_wait_seconds', 'queued_at_ts', 'created_at_ts', 'updated_at_ts',
+    'started_at_ts', 'export', 'batch_id', 'storage_evicted_at',
+)
+# Fields returned by /jobs
+_JOB_LIST_KEYS = (
+    'job_id', 'status', 'progress', 'message', 'error', 'created_at', 'updated_at', 'max_duration', 'url', 'video',
+)
+# Fields returned by /jobs?view=summary
+_JOB_COMPACT_KEYS = ('job_id', 'status', 'progress', 'message', 'updated_at')
+
+class _JobState:
+    """Per-job hot state: the published read snapshot plus the progress publisher's bookkeeping."""
+    __slots__ = ('seq', 'snapshot', 'changed', 'lock', 'published', 'published_at', 'pending', 'timer')
+
+    def __init__(self, seq: int):
+        self.seq = seq
+        self.snapshot = None
+        # Notified (under jobs_lock) when this job's version is bumped; long-poll and SSE clients wait on it
+        self.changed = threading.Condition(jobs_lock)
+        self.lock = threading.Lock()
+        self.published = {}  # publisher key -> last applied value
+        self.published_at = 0.0
+        self.pending = {}  # publisher key -> (value, apply)
+        self.timer = None
+
+def _index_job(job_id, job: dict):
+    """Register a job in the index and publish a fresh snapshot. Caller holds jobs_lock."""
+    state = _job_states.get(job_id)
+    if state is None:
+        state = _JobState(len(_job_order))
+        _job_seq[job_id] = state.seq
+        _job_order.append(job_id)
+        _job_order_ts.append(float(job.get('created_at_ts') or 0.0))
+        _job_states[job_id] = state
+    seq = state.seq
+    previous = state.snapshot
+    status = job.get('status')
+    if previous is None or previous['status'] != status:
+        if previous is not None:
+            seqs = _jobs_by_status[previous['status']]
+            i = bisect.bisect_left(seqs, seq)
+            if i < len(seqs) and seqs[i] == seq:
+                del seqs[i]
+        bisect.insort(_jobs_by_status[status], seq)
+    snapshot = {k: job.get(k) for k in _JOB_SNAPSHOT_KEYS}
+    branches = job.get('branches')
+    snapshot['branches'] = {name: dict(fields) for name, fields in branches.items()} if branches else None
+    snapshot['job_id'] = job_id
+    snapshot['seq'] = seq
+    state.snapshot = snapshot
+
+def _job_snapshot(job_id):
+    """Latest published snapshot of a job (lock-free)."""
+    state = _job_states.get(job_id)
+    return state.snapshot if state is not None else None
+
+def _parse_since(raw):
+    """`since` as epoch seconds or an ISO timestamp."""
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(raw).timestamp()
+    except ValueError:
+        return None
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """
+    List processing jobs (most recent first).
+    Query: limit, cursor (from the previous page's next_cursor), status (comma-separated),
+    since (created at or after; epoch seconds or ISO), view=summary for a compact projection.
+    """
+    limit_raw = request.args.get('limit', '50')
+    try:
+        limit = max(1, min(200, int(limit_raw)))
+    except Exception:
+        limit = 50
+    try:
+        cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    statuses = [s.strip() for s in (request.args.get('status') or '').split(',') if s.strip()]
+    since = _parse_since(request.args.get('since'))
+    compact = request.args.get('view') == 'summary'
+
+    if JOB_STORE_PATH:
+        # Every web process writes its jobs through to the store, so list from there (cursor = rowid)
+        page = _stored_job_page(limit, cursor, statuses, since)
+        more = len(page) > limit
+        page = page[:limit]
+    else:
+        with jobs_lock:
+            lo = bisect.bisect_left(_job_order_ts, since) if since is not None else 0
+            hi = len(_job_order) if cursor is None else max(0, min(cursor, len(_job_order)))
+            if statuses:
+                seqs = []
+                for status in statuses:
+                    indexed = _jobs_by_status.get(status) or []
+                    end = bisect.bisect_left(indexed, hi)
+                    start = max(bisect.bisect_left(indexed, lo), end - limit - 1)
+                    seqs.extend(indexed[start:end])
+                seqs.sort(reverse=True)
+                seqs = seqs[:limit + 1]
+            else:
+                seqs = list(range(hi - 1, max(lo, hi - limit - 1) - 1, -1))
+            page = [_job_order[seq] for seq in seqs[:limit]]
+        more = len(seqs) > limit
+        page = [_job_snapshot(job_id) for job_id in page]
+    
+    summaries = []
+    for summary in page:
+        if compact:
+            summaries.append({k: summary.get(k) for k in _JOB_COMPACT_KEYS})
+            continue
+        item = {k: summary.get(k) for k in _JOB_LIST_KEYS}
+        item['elapsed_seconds'] = _job_elapsed_seconds(summary)
+        item['eta_seconds'] = _job_eta_seconds(summary)
+        summaries.append(item)
+
+    next_cursor = str(page[-1]['seq']) if more else None
+    return jsonify({'jobs': summaries, 'next_cursor': next_cursor})
+
+
+# Transcript encodings.
+# Results keep the dict-per-word `transcript.words` by default. ?transcript_format=columnar returns
+# parallel arrays instead, and =packed returns the numeric columns as little-endian int32/float32
+# arrays (base64 in JSON, raw bytes in msgpack). `Accept: application/x-msgpack` or ?format=msgpack
+# selects a msgpack body. JSON bodies are encoded with orjson when it's installed.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+TRANSCRIPT_FORMATS = ('words', 'columnar', 'packed')
+MSGPACK_MIMETYPES = ('application/x-msgpack', 'application/msgpack', 'application/vnd.msgpack')
+_PACKED_COLUMNS = (
+    ('start_char', 'i', 'int32'),
+    ('end_char', 'i', 'int32'),
+    ('start_time', 'f', 'float32'),
+    ('end_time', 'f', 'float32'),
+)
+
+def _pack_column(typecode: str, values: list) -> bytes:
+    packed = array.array(typecode, values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+def _columnar_words(words: list, packed=False, binary=False) -> dict:
+    """Dict-per-word list -> parallel arrays (optionally packed)."""
+    columns = {
+        'format': 'packed' if packed else 'columnar',
+        'count': len(words),
+        'text': [w.get('text', '') for w in words],
+    }
+    for key, typecode, dtype in _PACKED_COLUMNS:
+        values = [w.get(key, 0) for w in words]
+        if packed:
+            raw = _pack_column(typecode, values)
+            values = raw if binary else base64.b64encode(raw).decode('ascii')
+        columns[key] = values
+    if packed:
+        columns['dtypes'] = {key: dtype for key, _, dtype in _PACKED_COLUMNS}
+    return columns
+
+def _encode_transcript(payload: dict, transcript_format: str, binary=False) -> dict:
+    """Copy of a result-bearing payload with transcript.words re-encoded (nested `result` too)."""
+    if transcript_format == 'words' or not isinstance(payload, dict):
+        return payload
+    encoded = payload
+    transcript = payload.get('transcript')
+    if isinstance(transcript, dict) and isinstance(transcript.get('words'), list):
+        encoded = dict(payload)
+        encoded['transcript'] = dict(
+            transcript, words=_columnar_words(transcript['words'], transcript_format == 'packed', binary)
+        )
+    if isinstance(payload.get('result'), dict):
+        encoded = dict(encoded)
+        encoded['result'] = _encode_transcript(payload['result'], transcript_format, binary)
+    return encoded
+
+def _dumps_json(payload) -> bytes:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            pass
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def _requested_transcript_format():
+    """?transcript_format= value, or None if it isn't one we support."""
+    transcript_format = (request.args.get('transcript_format') or 'words').lower()
+    return transcript_format if transcript_format in TRANSCRIPT_FORMATS else None
+
+def _result_response(payload: dict, status=200):
+    """Serialize a payload carrying a transcript in the encoding the client negotiated."""
+    transcript_format = _requested_transcript_format()
+    if transcript_format is None:
+        return jsonify({'error': f"transcript_format must be one of: {', '.join(TRANSCRIPT_FORMATS)}"}), 400
+    
+    body_format = (request.args.get('format') or '').lower()
+    if not body_format:
+        offered = ('application/json',) + (MSGPACK_MIMETYPES if MSGPACK_AVAILABLE else ())
+        body_format = 'msgpack' if request.accept_mimetypes.best_match(offered) in MSGPACK_MIMETYPES else 'json'
+    headers = {'Vary': 'Accept'}
+    if body_format == 'msgpack':
+        if not MSGPACK_AVAILABLE:
+            return jsonify({'error': 'msgpack not installed', 'suggestion': 'Install with: pip install msgpack'}), 406
+        body = msgpack.packb(_encode_transcript(payload, transcript_format, binary=True), use_bin_type=True)
+        return Response(body, status=status, mimetype='application/x-msgpack', headers=headers)
+    if body_format != 'json':
+        return jsonify({'error': 'format must be json or msgpack'}), 400
+    body = _dumps_json(_encode_transcript(payload, transcript_format))
+    return Response(body, status=status, mimetype='application/json', headers=headers)
+
+
+# Push-based progress.
+# Every job change bumps the job's monotonic `version` and notifies that job's `changed` condition
+# (only its own watchers wake), so clients can wait for the next change instead of polling:
+# /jobs/<id>/status?since=<version> long-polls, and /jobs/<id>/events streams Server-Sent Events
+# (resumable via Last-Event-ID).
+JOB_LONG_POLL_MAX_SECONDS = float(os.environ.get('JOB_LONG_POLL_MAX_SECONDS', '25'))
+JOB_EVENTS_KEEPALIVE_SECONDS = 15.0
+
+def _job_status_payload(job_id, job: dict) -> dict:
+    """Status fields of a job, from its snapshot."""
+    payload = {
+        'job_id': job_id,
+        'version': int(job.get('version') or 0),
+        'status': job.get('status'),
+        'progress': job.get('progress', 0),
+        'message': job.get('message', ''),
+        'error': job.get('error'),
+        'created_at': job.get('created_at'),
+        'updated_at': job.get('updated_at'),
+        'elapsed_seconds': _job_elapsed_seconds(job),
+        'eta_seconds': _job_eta_seconds(job),
+        'max_duration': job.get('max_duration'),
+        'url': job.get('url'),
+        'video': job.get('video'),
+    }
+    payload.update(_job_queue_fields(job_id, job))
+    payload['branches'] = job.get('branches')
+    # Any web process may export a finished job, so its stored export is the current one
+    export = _stored_export(job_id) if JOB_STORE_PATH and job.get('status') == 'completed' else job.get('export')
+    if export:
+        payload['export'] = export
+    if job.get('batch_id'):
+        payload['batch_id'] = job['batch_id']
+    if job.get('storage_evicted_at'):
+        # Its files were reclaimed by the storage manager; result paths no longer exist
+        payload['storage_evicted_at'] = job['storage_evicted_at']
+    return payload
+
+def _wait_for_job_change(job_id, since: int, timeout: float):
+    """Block until the job's version passes `since`; returns its latest snapshot (None if it's gone)."""
+    state = _job_states.get(job_id)
+    if state is None:
+        return None
+    with state.changed:
+        state.changed.wait_for(lambda: state.snapshot['version'] > since, timeout=timeout)
+    return state.snapshot
+
+def _parse_version(raw):
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+@app.route('/jobs/<job_id>/status', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Get status of a processing job.
+    With ?since=<version> the request is held (up to ?timeout= seconds) until the job changes.
+    """
+    since = _parse_version(request.args.get('since'))
+    try:
+        timeout = max(0.0, min(JOB_LONG_POLL_MAX_SECONDS, float(request.args.get('timeout', JOB_LONG_POLL_MAX_SECONDS))))
+    except ValueError:
+        timeout = JOB_LONG_POLL_MAX_SECONDS
+    
+    snapshot = _job_snapshot(job_id)
+    if snapshot and since is not None and snapshot['status'] not in ('completed', 'failed'):
+        snapshot = _wait_for_job_change(job_id, since, timeout)
+    if not snapshot:
+        # Started by another web process: answer from the store, polling it to honor ?since=
+        snapshot = _wait_for_stored_job(job_id, since, timeout)
+    if not snapshot:
+        return jsonify({'error': 'Job not found'}), 404
+    payload = _job_status_payload(job_id, snapshot)
+
+    # When completed, include result directly in status (requested by frontend)
+    if snapshot['status'] == 'completed':
+        payload['result'] = _job_result(job_id, jobs.get(job_id) or {})
+
+    return _result_response(payload)
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-Sent Events stream of a job's status. Each event carries the job version as its id;
+    the final `done` event includes the result (or the error) and closes the stream.
+    """
+    if _job_snapshot(job_id) is not None:
+        wait = _wait_for_job_change
+    elif _stored_job(job_id) is not None:
+        # Run by another web process: follow its stored row
+        wait = _wait_for_stored_job
+    else:
+        return jsonify({'error': 'Job not found'}), 404
+    transcript_format = _requested_transcript_format()
+    if transcript_format is None:
+        return jsonify({'error': f"transcript_format must be one of: {', '.join(TRANSCRIPT_FORMATS)}"}), 400
+    last_seen = _parse_version(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    
+    def _stream():
+        version = -1 if last_seen is None else last_seen
+        yield 'retry: 2000\n\n'
+        while True:
+            snapshot = wait(job_id, version, JOB_EVENTS_KEEPALIVE_SECONDS)
+            if snapshot is None:
+                yield 'event: error\ndata: {"error": "Job not found"}\n\n'
+                return
+            if snapshot['version'] <= version:
+                yield ': keep-alive\n\n'
+                continue
+            version = snapshot['version']
+            payload = _job_status_payload(job_id, snapshot)
+            done = snapshot['status'] in ('completed', 'failed')
+            if snapshot['status'] == 'completed':
+                payload = _encode_transcript(dict(payload, result=_job_result(job_id, jobs.get(job_id) or {})), transcript_format)
+            yield f"id: {version}\nevent: {'done' if done else 'status'}\ndata: {_dumps_json(payload).decode('utf-8')}\n\n"
+            if done:
+                return
+    
+    return Response(_stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Get result of a completed job"""
+    job = _job_record(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job['status'] != 'completed':
+        return jsonify({
+            'error': 'Job not completed',
+            'status': job['status']
+        }), 400
+    
+    return _result_response(_job_result(job_id, job))
+
+
+# Transcript range queries.
+# /jobs/<id>/transcript returns only the words (and text) inside a time or char window, so the
+# editor can load a window of a long transcript instead of the whole word list. Each job's words
+# get a sorted index (start keys plus running max of end keys, so overlap lookups are two bisects)
+# built on first use and kept in a small LRU. An index remembers the words list it was built from and
+# is rebuilt when the job's analysis or result now holds a different one. Jobs run by another web
+# process are indexed from their stored checkpoints, keyed on the stored row's version instead.
+TRANSCRIPT_INDEX_CACHE_SIZE = max(1, int(os.environ.get('TRANSCRIPT_INDEX_CACHE_SIZE', '32')))
+TRANSCRIPT_PAGE_MAX_WORDS = 5000
+
+_transcript_indexes = collections.OrderedDict()  # job_id -> _TranscriptIndex
+_transcript_indexes_lock = threading.Lock()
+
+class _TranscriptIndex:
+    """Words of one transcript sorted by start, with bisectable time and char keys."""
+    __slots__ = ('source', 'words', 'text', 'start_times', 'max_end_times', 'start_chars', 'max_end_chars')
+
+    def __init__(self, words: list, text: str, source: list | int | None = None):
+        self.source = source
+        self.words = sorted(words, key=lambda w: (w.get('start_time', 0.0), w.get('start_char', 0)))
+        self.text = text or ''
+        self.start_times = [float(w.get('start_time', 0.0)) for w in self.words]
+        self.max_end_times = list(itertools.accumulate((float(w.get('end_time', 0.0)) for w in self.words), max))
+        # char order follows time order for real transcripts; the char keys get the same treatment
+        self.start_chars = list(itertools.accumulate((int(w.get('start_char', 0)) for w in self.words), max))
+        self.max_end_chars = list(itertools.accumulate((int(w.get('end_char', 0)) for w in self.words), max))
+
+    def time_range(self, start: float, end: float):
+        """Index range of words overlapping [start, end)."""
+        return bisect.bisect_right(self.max_end_times, start), bisect.bisect_left(self.start_times, end)
+
+    def char_range(self, start: int, end: int):
+        """Index range of words overlapping chars [start, end)."""
+        return bisect.bisect_right(self.max_end_chars, start), bisect.bisect_left(self.start_chars, end)
+
+def _transcript_source(job: dict) -> list | None:
+    """The words list a job's transcript currently comes from (None if it's only in the store). Caller holds jobs_lock."""
+    if job.get('analysis') is not None:
+        return job['analysis'].get('words')
+    if job.get('result') is not None:
+        return (job['result'].get('transcript') or {}).get('words')
+    return None
+
+def _reuse_transcript_index(job_id, index: _TranscriptIndex) -> _TranscriptIndex:
+    with _transcript_indexes_lock:
+        if job_id in _transcript_indexes:
+            _transcript_indexes.move_to_end(job_id)
+    return index
+
+def _cache_transcript_index(job_id, index: _TranscriptIndex) -> _TranscriptIndex:
+    with _transcript_indexes_lock:
+        _transcript_indexes[job_id] = index
+        while len(_transcript_indexes) > TRANSCRIPT_INDEX_CACHE_SIZE:
+            _transcript_indexes.popitem(last=False)
+    return index
+
+def _stored_transcript_index(job_id, index):
+    """_job_transcript_index for a job run by another web process, from its stored row and checkpoints."""
+    job = _stored_job(job_id)
+    if job is None:
+        return None
+    version = int(job.get('version') or 0)
+    if index is not None and index.source == version:
+        return _reuse_transcript_index(job_id, index)
+    checkpoints = _load_checkpoints(job_id, ('analysis', 'result'))
+    if 'analysis' in checkpoints:
+        words, text = checkpoints['analysis'].get('words') or [], checkpoints['analysis'].get('transcription')
+    elif job.get('status') == 'completed':
+        transcript = (checkpoints.get('result') or {}).get('transcript') or {}
+        words, text = transcript.get('words') or [], transcript.get('transcription')
+    else:
+        return None
+    return _cache_transcript_index(job_id, _TranscriptIndex(words, text, version))
+
+def _job_transcript_index(job_id):
+    """Transcript index for a job whose analysis has finished (None if there's no transcript yet)."""
+    with _transcript_indexes_lock:
+        index = _transcript_indexes.get(job_id)
+    with jobs_lock:
+        job = jobs.get(job_id)
+        source = _transcript_source(job) if job is not None else None
+        analysis = job.get('analysis') if job is not None else None
+        completed = job is not None and job.get('status') == 'completed'
+    if job is None:
+        return _stored_transcript_index(job_id, index)
+    if index is not None and (source is None or index.source is source):
+        return _reuse_transcript_index(job_id, index)
+    if analysis is not None:
+        words, text = analysis.get('words') or [], analysis.get('transcription')
+    elif completed:
+        transcript = _job_result(job_id, job).get('transcript') or {}
+        words, text = transcript.get('words') or [], transcript.get('transcription')
+    else:
+        return None
+    return _cache_transcript_index(job_id, _TranscriptIndex(words, text, source))
+
+@app.route('/jobs/<job_id>/transcript', methods=['GET'])
+def get_job_transcript(job_id):
+    """
+    Words and text of a time window (start_time/end_time, seconds) or char window
+    (start_char/end_char) of a job's transcript. Without a window the whole transcript is paged.
+    Query: limit (words per page), cursor (from next_cursor), transcript_format.
+    """
+    if not _job_known(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+    args = request.args
+    try:
+        limit = max(1, min(TRANSCRIPT_PAGE_MAX_WORDS, int(args.get('limit', 1000))))
+        cursor = int(args['cursor']) if args.get('cursor') else None
+        if args.get('start_time') or args.get('end_time'):
+            window = ('time', float(args.get('start_time') or 0.0), float(args['end_time']) if args.get('end_time') else None)
+        elif args.get('start_char') or args.get('end_char'):
+            window = ('char', int(args.get('start_char') or 0), int(args['end_char']) if args.get('end_char') else None)
+        else:
+            window = None
+    except ValueError:
+        return jsonify({'error': 'Invalid range, limit or cursor'}), 400
+    
+    index = _job_transcript_index(job_id)
+    if index is None:
+        return jsonify({'error': 'Transcript not available yet'}), 409
+    
+    if window is None:
+        lo, hi = 0, len(index.words)
+    elif window[0] == 'time':
+        lo, hi = index.time_range(window[1], float('inf') if window[2] is None else window[2])
+    else:
+        lo, hi = index.char_range(window[1], sys.maxsize if window[2] is None else window[2])
+    if cursor is not None:
+        lo = max(lo, cursor)
+    stop = min(hi, lo + limit)
+    words = index.words[lo:stop]
+    text = index.text[words[0].get('start_char', 0):words[-1].get('end_char', 0)] if words else ''
+    
+    return _result_response({
+        'job_id': job_id,
+        'total_words': len(index.words),
+        'range': {'type': window[0], 'start': window[1], 'end': window[2]} if window else None,
+        'start_index': lo,
+        'next_cursor': str(stop) if stop < hi else None,
+        'transcript': {
+            'words': words,
+            'transcription': text,
+        },
+    })
+
+
+# Durable job store.
+# `jobs` stays the in-memory working set; every change is written through to SQLite (WAL mode) so
+# jobs survive restarts. Large per-stage outputs (downloaded files, analysis, result) are saved as
+# checkpoints in their own table, and unfinished jobs resume from the last completed stage at startup.
+# Set JOB_STORE_PATH to an empty string to keep jobs in memory only.
+JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH', os.path.join(_downloads_root(), 'jobs.sqlite3'))
+# Kept out of the jobs row (stored as checkpoints instead) so progress writes stay small
+_JOB_CHECKPOINT_KEYS = ('result', 'analysis')
+
+_job_store = None
+_job_store_lock = threading.Lock()
+_restore_lock_file = None  # held by the process that resumes stored jobs (see _restore_jobs)
+# How often a long-poll for a job owned by another process re-reads its row
+JOB_STORE_POLL_SECONDS = 0.5
+
+def _job_store_conn():
+    """Lazily open the SQLite store. Caller holds _job_store_lock."""
+    global _job_store
+    if _job_store is None:
+        os.makedirs(os.path.dirname(os.path.abspath(JOB_STORE_PATH)), exist_ok=True)
+        conn = sqlite3.connect(JOB_STORE_PATH, check_same_thread=False, isolation_level=None, timeout=5.0)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                created_at_ts REAL,
+                updated_at_ts REAL,
+                data TEXT NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id TEXT PRIMARY KEY,
+                created_at_ts REAL,
+                data TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS job_checkpoints (
+                job_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                created_at_ts REAL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, stage)
+            )
+        ''')
+        _job_store = conn
+    return _job_store
+
+def _persist_job(job_id):
+    """Write the job's current row to the store. Must not be called while holding jobs_lock."""
+    if not JOB_STORE_PATH:
+        return
+    with _job_store_lock:
+        # Snapshot inside the store lock so rows are written in the same order as the snapshots
+        with jobs_lock:
+            job = jobs.get(job_id)
+            if job is None:
+                return
+            row = {k: v for k, v in job.items() if k not in _JOB_CHECKPOINT_KEYS}
+            data = json.dumps(row)
+            status = job.get('status')
+            created = job.get('created_at_ts')
+            updated = job.get('updated_at_ts')
+        try:
+            _job_store_conn().execute(
+                '''
+                INSERT INTO jobs (job_id, status, created_at_ts, updated_at_ts, data) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    status = excluded.status,
+                    updated_at_ts = excluded.updated_at_ts,
+                    -- The export is only written by _write_stored_export (any web process may run it), and
+                    -- its version bumps mean this process's copy can be behind
+                    data = json_set(
+                        excluded.data,
+                        '$.export', json(json_extract(jobs.data, '$.export')),
+                        '$.version', max(
+                            coalesce(json_extract(excluded.data, '$.version'), 0),
+                            coalesce(json_extract(jobs.data, '$.version'), 0)
+                        )
+                    )
+                ''',
+                (job_id, status, created, updated, data),
+            )
+        except sqlite3.Error as e:
+            print(f"Failed to persist job {job_id}: {e}", file=sys.stderr)
+
+def _checkpoint_job(job_id, stage: str, data: dict):
+    """Record a completed pipeline stage's output."""
+    if not JOB_STORE_PATH:
+        return
+    with _job_store_lock:
+        try:
+            _job_store_conn().execute(
+                'INSERT OR REPLACE INTO job_checkpoints (job_id, stage, created_at_ts, data) VALUES (?, ?, ?, ?)',
+                (job_id, stage, _now_ts(), json.dumps(data)),
+            )
+        except sqlite3.Error as e:
+            print(f"Failed to checkpoint job {job_id} stage {stage}: {e}", file=sys.stderr)
+
+def _load_checkpoints(job_id, stages=None) -> dict:
+    if not JOB_STORE_PATH:
+        return {}
+    with _job_store_lock:
+        rows = _job_store_conn().execute(
+            'SELECT stage, data FROM job_checkpoints WHERE job_id = ?', (job_id,)
+        ).fetchall()
+    return {stage: json.loads(data) for stage, data in rows if stages is None or stage in stages}
+
+def _stored_job(job_id):
+    """A job's last persisted row, for jobs run by another web process (None if unknown)."""
+    if not JOB_STORE_PATH:
+        return None
+    with _job_store_lock:
+        try:
+            row = _job_store_conn().execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        except sqlite3.Error:
+            return None
+    return json.loads(row[0]) if row else None
+
+def _stored_jobs(job_ids) -> dict:
+    """_stored_job for many jobs in one query per 500 ids: job_id -> row (unknown ids are left out)."""
+    job_ids = list(job_ids)
+    if not JOB_STORE_PATH or not job_ids:
+        return {}
+    rows = []
+    with _job_store_lock:
+        try:
+            conn = _job_store_conn()
+            for i in range(0, len(job_ids), 500):
+                chunk = job_ids[i:i + 500]
+                rows += conn.execute(
+                    f"SELECT job_id, data FROM jobs WHERE job_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        except sqlite3.Error:
+            return {}
+    return {job_id: json.loads(data) for job_id, data in rows}
+
+def _job_record(job_id):
+    """A job's fields: this process's copy, or the stored row of a job run by another web process (None if unknown)."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+    return job if job is not None else _stored_job(job_id)
+
+def _job_known(job_id) -> bool:
+    return _job_snapshot(job_id) is not None or _stored_job(job_id) is not None
+
+def _stored_job_page(limit: int, cursor, statuses: list, since):
+    """Up to limit + 1 stored rows for /jobs, newest first, each with its rowid as `seq` (the page cursor)."""
+    where, params = [], []
+    if cursor is not None:
+        where.append('rowid < ?')
+        params.append(cursor)
+    if statuses:
+        where.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params += statuses
+    if since is not None:
+        where.append('created_at_ts >= ?')
+        params.append(since)
+    sql = 'SELECT rowid, job_id, data FROM jobs'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    with _job_store_lock:
+        try:
+            rows = _job_store_conn().execute(sql + ' ORDER BY rowid DESC LIMIT ?', params + [limit + 1]).fetchall()
+        except sqlite3.Error as e:
+            print(f"Failed to list jobs from {JOB_STORE_PATH}: {e}", file=sys.stderr)
+            return []
+    return [dict(json.loads(data), job_id=job_id, seq=rowid) for rowid, job_id, data in rows]
+
+def _stored_job_dirs() -> list:
+    """(job_id, download dir, holds its artifacts) of every stored job with a download dir."""
+    if not JOB_STORE_PATH:
+        return []
+    with _job_store_lock:
+        try:
+            rows = _job_store_conn().execute(
+                '''
+                SELECT job_id, status, json_extract(data, '$.download_dir'), json_extract(data, '$.export.status')
+                FROM jobs WHERE json_extract(data, '$.download_dir') IS NOT NULL
+                '''
+            ).fetchall()
+        except sqlite3.Error:
+            return []
+    return [
+        (job_id, path, _job_holds_artifacts({'status': status, 'export': {'status': export_status}}))
+        for job_id, status, path, export_status in rows
+    ]
+
+def _stored_export(job_id):
+    """The export state in a job's stored row."""
+    with _job_store_lock:
+        try:
+            row = _job_store_conn().execute(
+                "SELECT json_extract(data, '$.export') FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    return json.loads(row[0]) if row and row[0] else None
+
+def _write_stored_export(job_id, update):
+    """
+    Replace a stored job's export with update(current export) in one write transaction, so web processes
+    sharing the store can't interleave; update returns None to leave it as is. This process's copy of the
+    job (if it has one) is refreshed too. Returns (export now stored, whether it was replaced).
+    """
+    with _job_store_lock:
+        conn = _job_store_conn()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    "SELECT json_extract(data, '$.export') FROM jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                current = json.loads(row[0]) if row and row[0] else None
+                export = update(current) if row else None
+                if export is not None:
+                    conn.execute(
+                        '''
+                        UPDATE jobs SET data = json_set(data, '$.export', json(?),
+                                                        '$.version', coalesce(json_extract(data, '$.version'), 0) + 1)
+                        WHERE job_id = ?
+                        ''',
+                        (json.dumps(export), job_id),
+                    )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            print(f"Failed to update export of job {job_id}: {e}", file=sys.stderr)
+            return None, False
+        if export is None:
+            return current, False
+        # Still under the store lock, so concurrent updates reach this process's copy in commit order
+        with jobs_lock:
+            job = jobs.get(job_id)
+            if job is not None:
+                job['export'] = export
+                _touch_job(job_id, job)
+    return export, True
+
+def _wait_for_stored_job(job_id, since, timeout: float):
+    """_stored_job, held (up to `timeout`) until the stored version passes `since`."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = _stored_job(job_id)
+        if (job is None or since is None or int(job.get('version') or 0) > since
+                or job.get('status') in ('completed', 'failed') or time.monotonic() >= deadline):
+            return job
+        time.sleep(JOB_STORE_POLL_SECONDS)
+
+def _job_result(job_id, job: dict) -> dict:
+    """A completed job's result; restored jobs load it from the store on first access."""
+    result = job.get('result')
+    if result is None:
+        result = _load_checkpoints(job_id, ('result',)).get('result', {})
+    return result
+
+
+def update_job_status(job_id, status, progress=0, message='', error=None):
+    """Update job status"""
+    _discard_progress(job_id, 'status')
+    _write_job_status(job_id, status, progress, message, error)
+
+def _update_live_job_status(job_id, status, progress=0, message=''):
+    """update_job_status for pipeline stages: a no-op once the job has finished (e.g. another branch failed it)."""
+    _discard_progress(job_id, 'status')
+    _write_job_status(job_id, status, progress, message, live_only=True)
+
+def _write_job_status(job_id, status, progress=0, message='', error=None, live_only=False):
+    batch_id = None
+    with jobs_lock:
+        if job_id in jobs and not (live_only and jobs[job_id].get('status') in ('completed', 'failed')):
+            jobs[job_id]['status'] = status
             jobs[job_id]['progress'] = progress
             jobs[job_id]['message'] = message
-            jobs[job_id]['updated_at'] = datetime.now().isoformat()
-            jobs[job_id]['updated_at_ts'] = _now_ts()
             if error:
                 jobs[job_id]['error'] = error
+            _touch_job(job_id, jobs[job_id])
+            if status in ('completed', 'failed'):
+                batch_id = jobs[job_id].get('batch_id')
+    _persist_job(job_id)
+    if batch_id:
+        # A batch slot freed up
+        _fill_batch(batch_id)
+
+def update_job_fields(job_id, fields: dict):
+    """Patch job with extra fields without overwriting status/progress/message."""
+    with jobs_lock:
+        if job_id in jobs:
+            jobs[job_id].update(fields)
+            _touch_job(job_id, jobs[job_id])
+    _persist_job(job_id)
+
+
+# Progress publisher.
+# Download/transcription hooks fire far more often than anything changes visibly. They go through
+# _publish_progress, which drops values equal to the last one written and writes each job at most
+# every JOB_PROGRESS_MIN_INTERVAL seconds; the latest value in between is flushed by a timer. Direct
+# writes (update_job_status/_update_branch) discard pending values for the same key so a late flush
+# can't overwrite them.
+JOB_PROGRESS_MIN_INTERVAL = max(0.0, float(os.environ.get('JOB_PROGRESS_MIN_INTERVAL', '0.25')))
+
+_progress_stats = {'submitted': 0, 'dropped_unchanged': 0, 'coalesced': 0, 'published': 0}
+_progress_stats_lock = threading.Lock()
+
+def _count_progress(key: str):
+    with _progress_stats_lock:
+        _progress_stats[key] += 1
+
+def _publish_progress(job_id, key: str, value, apply):
+    """Submit `value` for `key` (e.g. 'status', 'branch:video'); `apply(value)` performs the write."""
+    state = _job_states.get(job_id)
+    if state is None:
+        return
+    _count_progress('submitted')
+    with state.lock:
+        if state.published.get(key) == value:
+            state.pending.pop(key, None)
+            _count_progress('dropped_unchanged')
+            return
+        now = time.monotonic()
+        wait = JOB_PROGRESS_MIN_INTERVAL - (now - state.published_at)
+        if wait > 0 or state.pending:
+            state.pending[key] = (value, apply)
+            _count_progress('coalesced')
+            if state.timer is None:
+                state.timer = threading.Timer(max(0.0, wait), _flush_progress, args=(job_id,))
+                state.timer.daemon = True
+                state.timer.start()
+            return
+        # Applied under the per-job lock so a concurrent direct write is ordered after it
+        state.published[key] = value
+        state.published_at = now
+        _count_progress('published')
+        apply(value)
+
+def _flush_progress(job_id):
+    state = _job_states.get(job_id)
+    if state is None:
+        return
+    with state.lock:
+        pending, state.pending, state.timer = state.pending, {}, None
+        state.published_at = time.monotonic()
+        for key, (value, apply) in pending.items():
+            state.published[key] = value
+            _count_progress('published')
+            apply(value)
+
+def _discard_progress(job_id, key: str):
+    """Drop a pending value for `key` ahead of a direct write."""
+    state = _job_states.get(job_id)
+    if state is None:
+        return
+    with state.lock:
+        state.pending.pop(key, None)
+        state.published.pop(key, None)
+
+def _publish_job_status(job_id, status, progress, message):
+    """Coalesced update_job_status for progress hooks; never overrides a finished job."""
+    def _apply(value):
+        _write_job_status(job_id, *value, live_only=True)
+    _publish_progress(job_id, 'status', (status, progress, message), _apply)
+
+def _publish_branch(job_id, branch: str, **fields):
+    """Coalesced _update_branch for progress hooks."""
+    _publish_progress(job_id, f'branch:{branch}', tuple(sorted(fields.items())),
+                      lambda value: _write_branch(job_id, branch, dict(value)))
+
+def _jobs_snapshot() -> dict:
+    now = _now_ts()
+    uptime = max(1e-6, now - _job_write_stats['since_ts'])
+    with _progress_stats_lock:
+        progress = dict(_progress_stats)
+    return {
+        'count': len(_job_states),
+        'writes': _job_write_stats['writes'],
+        'writes_per_second': round(_job_write_stats['writes'] / uptime, 3),
+        'progress_publisher': progress,
+        'jobs_lock': {
+            'acquisitions': jobs_lock.acquisitions,
+            'contended': jobs_lock.contended,
+            'wait_seconds': round(jobs_lock.wait_seconds, 6),
+        },
+    }
+
+
+# Job scheduler.
+# /youtube/process jobs flow through two stages, each with its own priority queue and bounded worker
+# pool: 'download' is network-bound, 'transcribe' is CPU/RAM-bound. Higher priority runs first,
+# FIFO within the same priority.
+DOWNLOAD_WORKERS = max(1, int(os.environ.get('DOWNLOAD_WORKERS', '2')))
+TRANSCRIBE_WORKERS = max(1, int(os.environ.get('TRANSCRIBE_WORKERS', '1')))
+# Max jobs waiting across all stage queues before /youtube/process answers 429
+MAX_QUEUE_DEPTH = max(1, int(os.environ.get('MAX_QUEUE_DEPTH', '20')))
+# Fetch the audio stream first and start transcribing while the video downloads
+AUDIO_FIRST_PIPELINE = os.environ.get('AUDIO_FIRST_PIPELINE', '1') == '1'
+
+class _StageQueue(queue.PriorityQueue):
+    """PriorityQueue that also knows each waiting job's position, re-sorted only after the queue changes."""
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self._positions = None  # job_id -> 1-based position; None when stale
+
+    def _put(self, item):
+        super()._put(item)
+        self._positions = None
+
+    def _get(self):
+        self._positions = None
+        return super()._get()
+
+    def position(self, job_id: str) -> int | None:
+        with self.mutex:
+            if self._positions is None:
+                self._positions = {}
+                for i, (_, _, queued_job_id) in enumerate(sorted(self.queue)):
+                    self._positions.setdefault(queued_job_id, i + 1)
+            return self._positions.get(job_id)
+
+_stage_queues = {
+    'download': _StageQueue(),
+    'transcribe': _StageQueue(),
+}
+_stage_worker_counts = {
+    'download': DOWNLOAD_WORKERS,
+    'transcribe': TRANSCRIBE_WORKERS,
+}
+_stage_workers = []
+_stage_workers_lock = threading.Lock()
+# Serializes the queue-depth check with the enqueue in /youtube/process
+_admission_lock = threading.Lock()
+_stage_seq = itertools.count()
+# Moving average of how long each stage takes, used for Retry-After and queue ETAs
+_stage_avg_seconds = {
+    'download': 30.0,
+    'transcribe': 120.0,
+}
+
+def _ensure_stage_workers():
+    """Start the stage worker threads on first use."""
+    with _stage_workers_lock:
+        if _stage_workers:
+            return
+        runners = {
+            'download': _run_download_stage,
+            'transcribe': _run_transcribe_stage,
+        }
+        for stage, count in _stage_worker_counts.items():
+            for i in range(count):
+                t = threading.Thread(
+                    target=_stage_worker_loop,
+                    args=(stage, runners[stage]),
+                    name=f'{stage}-worker-{i}',
+                    daemon=True,
+                )
+                t.start()
+                _stage_workers.append(t)
+
+def _enqueue_stage(stage: str, job_id: str, priority: int = 0):
+    _ensure_stage_workers()
+    update_job_fields(job_id, {'stage': stage, 'queued_at_ts': _now_ts()})
+    _stage_queues[stage].put((-priority, next(_stage_seq), job_id))
+
+def _queued_job_count() -> int:
+    return sum(q.qsize() for q in _stage_queues.values())
+
+def _queue_position(job_id: str, stage: str | None) -> int | None:
+    """1-based position of a job in its stage queue (None if it's not waiting)."""
+    q = _stage_queues.get(stage)
+    if q is None:
+        return None
+    return q.position(job_id)
+
+def _retry_after_seconds() -> int:
+    """Rough time until the download queue has room again."""
+    estimate = _stage_avg_seconds['download'] * _queued_job_count() / DOWNLOAD_WORKERS
+    return int(max(1, min(600, estimate)))
+
+def _job_queue_fields(job_id: str, job: dict) -> dict:
+    """Queue-related fields for status payloads."""
+    stage = job.get('stage')
+    wait = float(job.get('queue_wait_seconds') or 0.0)
+    position = None
+    queue_eta = None
+    if job.get('queued_at_ts'):
+        wait += max(0.0, _now_ts() - job['queued_at_ts'])
+        position = _queue_position(job_id, stage)
+        if position is not None:
+            queue_eta = _stage_avg_seconds[stage] * (position - 1) / _stage_worker_counts[stage]
+    return {
+        'stage': stage,
+        'priority': job.get('priority', 0),
+        'queue_position': position,
+        'queue_wait_seconds': wait,
+        'queue_eta_seconds': queue_eta,
+    }
+
+def _stage_worker_loop(stage: str, run):
+    q = _stage_queues[stage]
+    while True:
+        _, _, job_id = q.get()
+        try:
+            now = _now_ts()
+            with jobs_lock:
+                job = jobs.get(job_id)
+                if job is None:
+                    continue
+                if job.get('queued_at_ts'):
+                    job['queue_wait_seconds'] = float(job.get('queue_wait_seconds') or 0.0) + (now - job['queued_at_ts'])
+                job['queued_at_ts'] = None
+                job.setdefault('started_at_ts', now)
+                _touch_job(job_id, job)
+            _persist_job(job_id)
+            run(job_id)
+            _stage_avg_seconds[stage] = 0.8 * _stage_avg_seconds[stage] + 0.2 * (_now_ts() - now)
+        except Exception:
+            import traceback
+            print(f"Unhandled error in {stage} worker: {traceback.format_exc()}", file=sys.stderr)
+        finally:
+            q.task_done()
+
+def _fail_job(job_id, e, download_dir=None):
+    """Log, clean up the job's download dir and mark it failed."""
+    import traceback
+    error_trace = traceback.format_exc()
+    print(f"Error processing YouTube video: {error_trace}", file=sys.stderr)
+    
+    # Cleanup on error
+    if download_dir and os.path.exists(download_dir):
+        shutil.rmtree(download_dir, ignore_errors=True)
+    
+    # With audio-first pipelining both branches can fail; the first one ends the job and keeps its error
+    with jobs_lock:
+        job = jobs.get(job_id)
+        already_failed = job is None or job.get('status') == 'failed'
+        if not already_failed:
+            job['status'] = 'failed'
+            # Nothing left can finalize it: the other branch's _finish_branch sees the failure and stops
+            job['pending_branches'] = []
+            job.pop('finalizing', None)
+    if not already_failed:
+        update_job_status(job_id, 'failed', 0, f'Error: {str(e)}', str(e))
+
+def _update_branch(job_id, branch: str, **fields):
+    """Patch the progress record of one pipeline branch (audio/video/analysis)."""
+    _discard_progress(job_id, f'branch:{branch}')
+    _write_branch(job_id, branch, fields)
+
+def _write_branch(job_id, branch: str, fields: dict):
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None:
+            return
+        job.setdefault('branches', {}).setdefault(branch, {}).update(fields)
+        _touch_job(job_id, job)
+    _persist_job(job_id)
+
+def _finish_branch(job_id, branch: str):
+    """Mark a branch done; whoever finishes the last pending branch finalizes the job."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None or job.get('status') == 'failed':
+            return
+        pending = job.setdefault('pending_branches', [])
+        if branch in pending:
+            pending.remove(branch)
+        ready = not pending and not job.get('finalizing')
+        if ready:
+            job['finalizing'] = True
+    _persist_job(job_id)
+    if ready:
+        _finalize_youtube_job(job_id)
+
+def _download_hook(job_id, branch: str, start: int, end: int, message: str, report_status=True):
+    """yt-dlp progress hook mapping a branch's download progress to start..end."""
+    def _hook(d):
+        try:
+            status = d.get('status')
+            if status != 'downloading':
+                return
+            downloaded = d.get('downloaded_bytes') or 0
+            total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            if total:
+                pct = float(downloaded) / float(total)
+                _publish_branch(job_id, branch, status='downloading', progress=int(pct * 100))
+                if report_status():
+                    prog = int(start + pct * (end - start))
+                    _publish_job_status(job_id, 'processing', max(start, min(end, prog)), message)
+        except Exception:
+            # Never break the download due to hook issues
+            return
+    return _hook
+
+
+def _run_download_stage(job_id):
+    """
+    Stage 1: download the YouTube media and hand the job over to the transcribe stage.
+    In audio-first mode the audio stream is fetched and queued for transcription first, and the
+    full video keeps downloading here in parallel with transcription.
+    """
+    with jobs_lock:
+        job = jobs[job_id]
+        url = job['url']
+        priority = job.get('priority', 0)
+        audio_first = job.get('audio_first', AUDIO_FIRST_PIPELINE)
+        preview_proxy = job.get('preview_proxy', PREVIEW_PROXIES)
+        rate_limit = job.get('rate_limit')
+        pending = list(job.get('pending_branches') or [])
+        # Set when resuming after a restart; files from completed stages are reused
+        download_dir = job.get('download_dir')
+        audio_file = job.get('audio_path')
+        video_file = (job.get('video') or {}).get('path')
+    if not download_dir or not os.path.isdir(download_dir):
+        downloads_root = _downloads_root()
+        os.makedirs(downloads_root, exist_ok=True)
+        download_dir = tempfile.mkdtemp(prefix='yt-process-', dir=downloads_root)
+        update_job_fields(job_id, {'download_dir': download_dir})
+    if audio_file and not os.path.exists(audio_file):
+        audio_file = None
+    if video_file and not os.path.exists(video_file):
+        video_file = None
+    try:
+        _update_live_job_status(job_id, 'processing', 10, 'Downloading video from YouTube...')
+        
+        ydl_opts_info = {
+            'quiet': True,
+            'no_warnings': True,
+            'format': YOUTUBE_FORMAT,
+        }
+        
+        with _yt_dlp().YoutubeDL(ydl_opts_info) as ydl:
+            info = ydl.extract_info(url, download=False)
+            video_title = info.get('title', 'Downloaded Video')
+            duration = info.get('duration', 0)
+            thumbnail = info.get('thumbnail')
+
+        update_job_fields(job_id, {
+            'video': {
+                'title': video_title,
+                'duration': duration,
+                'thumbnail': thumbnail,
+                'path': video_file,
+            }
+        })
+        
+        if audio_first and 'analysis' in pending:
+            if audio_file is None:
+                _update_live_job_status(job_id, 'processing', 10, 'Downloading audio from YouTube...')
+                hook = _download_hook(job_id, 'audio', 10, 20, 'Downloading audio from YouTube...', lambda: True)
+                cached_audio = _download_youtube_cached(url, info, hook, YOUTUBE_AUDIO_FORMAT, rate_limit)
+                audio_file = _materialize_download(cached_audio, download_dir)
+                _update_branch(job_id, 'audio', status='done', progress=100)
+                update_job_fields(job_id, {'audio_path': audio_file})
+                _checkpoint_job(job_id, 'audio', {'path': audio_file})
+            _update_live_job_status(job_id, 'queued', 20, 'Waiting for a transcription worker (video still downloading)...')
+            _enqueue_stage('transcribe', job_id, priority)
+        
+        def _analysis_done():
+            with jobs_lock:
+                return 'analysis' not in (jobs.get(job_id, {}).get('pending_branches') or [])
+        
+        # Without audio-first the video download *is* the job's progress (10..35); with it, the
+        # video only drives the status once analysis has finished and we're waiting on it.
+        hook = (
+            _download_hook(job_id, 'video', 90, 99, 'Waiting for video download to finish...', _analysis_done)
+            if audio_first else
+            _download_hook(job_id, 'video', 10, 35, 'Downloading video from YouTube...', lambda: True)
+        )
+        if video_file is None:
+            cached_file = _download_youtube_cached(url, info, hook, rate_limit=rate_limit)
+            with jobs_lock:
+                if jobs.get(job_id, {}).get('status') == 'failed':
+                    return
+            video_file = _materialize_download(cached_file, download_dir)
+            _update_branch(job_id, 'video', status='done', progress=100)
+            
+            update_job_fields(job_id, {
+                'video': {
+                    'title': video_title,
+                    'duration': duration,
+                    'thumbnail': thumbnail,
+                    'path': video_file,
+                }
+            })
+            _checkpoint_job(job_id, 'video', {'path': video_file})
+            if preview_proxy:
+                _schedule_preview_proxy(job_id, video_file)
+    except Exception as e:
+        _fail_job(job_id, e, download_dir)
+        return
+
+    if 'video' in pending:
+        _finish_branch(job_id, 'video')
+    else:
+        _update_live_job_status(job_id, 'queued', 38, 'Waiting for a transcription worker...')
+        _enqueue_stage('transcribe', job_id, priority)
+
+
+def _run_transcribe_stage(job_id):
+    """Stage 2: transcribe the downloaded audio/video and find clips"""
+    with jobs_lock:
+        job = jobs[job_id]
+        download_dir = job.get('download_dir')
+        media_file = job.get('audio_path') or (job.get('video') or {}).get('path')
+        max_clip_duration = job.get('max_duration', 30.0)
+        if job.get('status') == 'failed':
+            # The video branch failed while this job waited for a transcription worker
+            return
+    try:
+        video_id = f'youtube-{os.urandom(8).hex()}'
+        
+        _update_live_job_status(job_id, 'processing', 40, 'Transcribing video with ClipsAI...')
+        _update_branch(job_id, 'analysis', status='transcribing')
+        
+        def _chunk_progress(fraction, message):
+            # map chunked transcription progress to 40..70
+            _publish_job_status(job_id, 'processing', int(40 + fraction * 30), f'Transcribing video with ClipsAI ({message})...')
+            _publish_branch(job_id, 'analysis', status='transcribing', progress=int(fraction * 100))
+        
+        def _finding_clips(_stage):
+            _update_live_job_status(job_id, 'processing', 70, 'Finding clips with ClipsAI...')
+            _update_branch(job_id, 'analysis', status='finding_clips')
+        
+        words_data, transcription_text, clips = _analyze_media(media_file, _chunk_progress, _finding_clips)
+        
+        # Convert clips to JSON format and filter by duration
+        clips_data = []
+        
+        clip_index = 0
+        for clip in clips:
+            clip_duration = clip['end_time'] - clip['start_time']
+            
+            # Only include clips that are less than 30 seconds
+            if clip_duration <= max_clip_duration:
+                start_char = clip['start_char']
+                end_char = clip['end_char']
+                
+                clip_text = transcription_text[start_char:end_char] if transcription_text else f"Clip {clip_index + 1}"
+                clip_title = clip_text.strip()[:100] if clip_text.strip() else f"Clip {clip_index + 1}"
+                
+                clips_data.append({
+                    'id': f'{video_id}-clip-{clip_index}',
+                    'object': 'clip',
+                    'created': None,  # set from the video file in _finalize_youtube_job
+                    'start_time': clip['start_time'],
+                    'end_time': clip['end_time'],
+                    'start_char': start_char,
+                    'end_char': end_char,
+                    'video_id': video_id,
+                    'favorited': False,
+                    'deleted': False,
+                    'scores': {'embedding_norm': 0},
+                    'title': clip_title,
+                })
+                clip_index += 1
+        
+        analysis = {
+            'video_id': video_id,
+            'clips': clips_data,
+            'words': words_data,
+            'transcription': transcription_text,
+        }
+        update_job_fields(job_id, {'analysis': analysis})
+        _checkpoint_job(job_id, 'analysis', analysis)
+        _update_branch(job_id, 'analysis', status='done')
+        with jobs_lock:
+            video_pending = 'video' in (jobs.get(job_id, {}).get('pending_branches') or [])
+        if video_pending:
+            _update_live_job_status(job_id, 'processing', 90, 'Waiting for video download to finish...')
+    except Exception as e:
+        _fail_job(job_id, e, download_dir)
+        return
+
+    _finish_branch(job_id, 'analysis')
+
+
+def _finalize_youtube_job(job_id):
+    """Build the job result once both the analysis and the video file are available"""
+    with jobs_lock:
+        job = jobs[job_id]
+        download_dir = job.get('download_dir')
+        video = dict(job.get('video') or {})
+        analysis = job.get('analysis')
+    if analysis is None:
+        # Resumed after a restart: the analysis only lives in its checkpoint
+        analysis = _load_checkpoints(job_id, ('analysis',)).get('analysis', {})
+    video_file = video.get('path')
+    video_title = video.get('title', 'Downloaded Video')
+    duration = video.get('duration', 0)
+    try:
+        update_job_status(job_id, 'processing', 95, 'Finalizing...')
+        
+        video_id = analysis['video_id']
+        file_size = os.path.getsize(video_file)
+        created = int(os.path.getmtime(video_file))
+        clips_data = analysis['clips']
+        for clip in clips_data:
+            clip['created'] = created
+        
+        result = {
+            'video': {
+                'id': video_id,
+                'object': 'video',
+                'clips': clips_data,
+                'created': created,
+                'metadata': {
+                    'duration': duration or 0,
+                    'file_size': file_size,
+                    'mime_type': f'video/{os.path.splitext(video_file)[1][1:]}',
+                },
+                'source': video_file,
+                'status': 'complete',
+                'title': video_title,
+            },
+            'transcript': {
+                'id': f'{video_id}-transcript',
+                'object': 'transcript',
+                'created': created,
+                'words': analysis['words'],
+                'transcription': analysis['transcription']
+            },
+            'temp_video_path': video_file,
+            'proxy_video_path': None,
+            'temp_dir': download_dir,
+        }
+        
+        with jobs_lock:
+            # The proxy may have finished while the result was being built
+            result['proxy_video_path'] = (jobs[job_id].get('video') or {}).get('proxy_path')
+        _checkpoint_job(job_id, 'result', result)
+        with jobs_lock:
+            jobs[job_id]['result'] = result
+            jobs[job_id].pop('analysis', None)
+            jobs[job_id].pop('finalizing', None)
+        update_job_status(job_id, 'completed', 100, 'Processing complete!')
+        _wake_storage_manager()
+        if SCRUB_ASSETS_AUTO:
+            _schedule_scrub_assets(video_file)
+        
+    except Exception as e:
+        _fail_job(job_id, e, download_dir)
 
-def update_job_fields(job_id, fields: dict):
-    """Patch job with extra fields without overwriting status/progress/message."""
+
+# Media probe.
+# One ffprobe per file reads the container, every stream and the first video stream's keyframe index
+# (packet flags only, no decoding). Results are kept in a small in-memory LRU and on disk under
+# PROBE_CACHE_DIR, keyed by the file's content fingerprint and mtime, so a download shared by several
+# jobs (hardlinks) or a restart doesn't probe again. Concurrent probes of one file run ffprobe once.
+PROBE_CACHE_DIR = os.environ.get('PROBE_CACHE_DIR') or os.path.join(_downloads_root(), '.cache', 'probes')
+PROBE_MEMORY_ENTRIES = 64
+PROBE_VERSION = 1
+_PROBE_FORMAT_FIELDS = ('format_name', 'duration', 'size', 'bit_rate', 'nb_streams')
+_PROBE_STREAM_FIELDS = ('index', 'codec_type', 'codec_name', 'profile', 'width', 'height', 'pix_fmt',
+                        'r_frame_rate', 'avg_frame_rate', 'sample_rate', 'channels', 'bit_rate', 'duration')
+
+_probe_memo = collections.OrderedDict()  # cache key -> probe, most recently used last
+_probe_inflight = {}  # cache key -> {'event', 'probe'} of the thread running ffprobe for it
+_probe_lock = threading.Lock()
+_probe_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+
+def _probe_value(raw: str):
+    """ffprobe's text values as int/float where they are numbers; N/A -> None."""
+    if raw in ('', 'N/A'):
+        return None
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            continue
+    return raw
+
+def _run_ffprobe(path: str) -> dict | None:
+    """Container, streams and video keyframe times in one ffprobe pass (compact output, one line per entry)."""
+    entries = (f"format={','.join(_PROBE_FORMAT_FIELDS)}:stream={','.join(_PROBE_STREAM_FIELDS)}"
+               ':packet=stream_index,pts_time,flags')
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', entries, '-of', 'compact', path],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    if proc.returncode != 0:
+        return None
+
+    fmt = {}
+    streams = []
+    packets = []  # (stream_index, pts_time) of keyframe packets; filtered once the video stream is known
+    for line in proc.stdout.splitlines():
+        section, _, rest = line.partition('|')
+        if section == 'packet':
+            fields = dict(field.partition('=')[::2] for field in rest.split('|'))
+            if 'K' in fields.get('flags', '') and fields.get('pts_time') not in (None, 'N/A'):
+                packets.append((fields.get('stream_index'), fields['pts_time']))
+        elif section == 'stream':
+            streams.append({k: _probe_value(v) for k, v in (f.partition('=')[::2] for f in rest.split('|'))})
+        elif section == 'format':
+            fmt = {k: _probe_value(v) for k, v in (f.partition('=')[::2] for f in rest.split('|'))}
+
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    keyframes = []
+    if video is not None:
+        video_index = str(video.get('index'))
+        for stream_index, pts in packets:
+            if stream_index == video_index:
+                try:
+                    keyframes.append(float(pts))
+                except ValueError:
+                    continue
+    keyframes.sort()
+    return {
+        'duration': fmt.get('duration') or (video or {}).get('duration') or 0,
+        'format': fmt,
+        'streams': streams,
+        'video_codec': (video or {}).get('codec_name'),
+        'audio_codec': next((s.get('codec_name') for s in streams if s.get('codec_type') == 'audio'), None),
+        'keyframes': keyframes,
+        'probe_seconds': round(time.perf_counter() - started, 3),
+    }
+
+def _probe_cache_path(key: str) -> str:
+    return os.path.join(PROBE_CACHE_DIR, key[:2], f'{key}.json')
+
+def _probe_media(path: str) -> dict | None:
+    """Cached probe of a media file (see _run_ffprobe); None if ffprobe can't read it."""
+    st = os.stat(path)
+    key = hashlib.sha256(f'{_media_fingerprint(path)}|{st.st_mtime_ns}|{PROBE_VERSION}'.encode()).hexdigest()
+    with _probe_lock:
+        probe = _probe_memo.get(key)
+        if probe is not None:
+            _probe_memo.move_to_end(key)
+            _probe_stats['hits'] += 1
+            return probe
+        flight = _probe_inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _probe_inflight[key] = {'event': threading.Event(), 'probe': None}
+        else:
+            _probe_stats['coalesced'] += 1
+    if not leader:
+        flight['event'].wait()
+        return flight['probe']
+
+    try:
+        cache_path = _probe_cache_path(key)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                probe = json.load(f)
+            stat_key = 'disk_hits'
+        except (OSError, ValueError):
+            probe = _run_ffprobe(path)
+            stat_key = 'misses' if probe is not None else 'errors'
+            if probe is not None:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                tmp = f'{cache_path}.{uuid.uuid4().hex}.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(probe, f)
+                os.replace(tmp, cache_path)
+        with _probe_lock:
+            _probe_stats[stat_key] += 1
+            if probe is not None:
+                _probe_memo[key] = probe
+                while len(_probe_memo) > PROBE_MEMORY_ENTRIES:
+                    _probe_memo.popitem(last=False)
+        flight['probe'] = probe
+        return probe
+    finally:
+        with _probe_lock:
+            _probe_inflight.pop(key, None)
+        flight['event'].set()
+
+def _probe_snapshot() -> dict:
+    with _probe_lock:
+        return {**_probe_stats, 'cached': len(_probe_memo)}
+
+def _probe_summary(probe: dict, keyframes: bool = False) -> dict:
+    """API shape of a probe; the keyframe index is only included on request (it can be large)."""
+    times = probe['keyframes']
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    summary = {k: v for k, v in probe.items() if k != 'keyframes'}
+    summary['keyframe_count'] = len(times)
+    summary['max_keyframe_interval'] = round(max(gaps), 3) if gaps else None
+    if keyframes:
+        summary['keyframes'] = times
+    return summary
+
+@app.route('/jobs/<job_id>/probe', methods=['GET'])
+def get_job_probe(job_id):
+    """Streams, codecs, duration and keyframe stats of a job's video (?keyframes=1 adds the index)."""
+    if not _job_known(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+    video_path = _job_video_path(job_id)
+    if video_path is None:
+        return jsonify({'error': 'Video not available yet'}), 409
+    probe = _probe_media(video_path)
+    if probe is None:
+        return jsonify({'error': 'Could not probe video (is ffprobe installed?)'}), 500
+    return jsonify(_probe_summary(probe, keyframes=request.args.get('keyframes') in ('1', 'true')))
+
+
+# Clip export.
+# POST /jobs/<id>/export cuts a finished job's clips to files in a bounded pool of ffmpeg processes.
+# A clip whose start lands on a video keyframe is stream-copied (no decode, I/O bound); otherwise it
+# is re-encoded, with each ffmpeg limited to its share of the cores. With `snap` (a fast cut) clip
+# boundaries are first moved to the nearest keyframes from the probe's index, so nearly every clip
+# can be copied. Per-clip state and progress live in the job's `export` field, which is replaced
+# (never mutated) on every change.
+EXPORT_WORKERS = max(1, int(os.environ.get('EXPORT_WORKERS', str(os.cpu_count() or 2))))
+# How far a clip start may be from a keyframe and still be stream-copied
+EXPORT_KEYFRAME_TOLERANCE = float(os.environ.get('EXPORT_KEYFRAME_TOLERANCE', '0.05'))
+# How far snapping may move a clip boundary; farther keyframes leave the boundary where it was
+EXPORT_SNAP_MAX_SECONDS = float(os.environ.get('EXPORT_SNAP_MAX_SECONDS', '2'))
+EXPORT_MODES = ('auto', 'copy', 'reencode')
+
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+def _get_export_pool():
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = concurrent.futures.ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='clip-export')
+        return _export_pool
+
+def _video_keyframes(path: str) -> list:
+    """Sorted keyframe timestamps of the first video stream ([] if it can't be probed)."""
+    probe = _probe_media(path)
+    return probe['keyframes'] if probe else []
+
+def _nearest_keyframe(keyframes: list, t: float):
+    i = bisect.bisect_left(keyframes, t)
+    candidates = keyframes[max(0, i - 1):i + 1]
+    return min(candidates, key=lambda k: abs(k - t)) if candidates else None
+
+def _snap_to_keyframes(keyframes: list, start: float, end: float) -> tuple:
+    """Clip bounds moved onto the nearest keyframes, each by at most EXPORT_SNAP_MAX_SECONDS (never past the other bound)."""
+    keyframe = _nearest_keyframe(keyframes, start)
+    if keyframe is not None and keyframe < end and abs(keyframe - start) <= EXPORT_SNAP_MAX_SECONDS:
+        start = keyframe
+    keyframe = _nearest_keyframe(keyframes, end)
+    if keyframe is not None and keyframe > start and abs(keyframe - end) <= EXPORT_SNAP_MAX_SECONDS:
+        end = keyframe
+    return start, end
+
+def _export_with(export: dict, clip_id, fields: dict) -> dict | None:
+    """Copy of an export state with one clip (or the export itself) updated."""
+    export = dict(export)
+    if clip_id is None:
+        export.update(fields)
+        return export
+    clips = dict(export['clips'])
+    if clip_id not in clips:
+        # A newer export replaced the one this clip belonged to
+        return None
+    clips[clip_id] = dict(clips[clip_id], **fields)
+    export['clips'] = clips
+    states = [c['status'] for c in clips.values()]
+    export['done'] = states.count('done')
+    export['failed'] = states.count('failed')
+    if export['done'] + export['failed'] == export['total']:
+        export['status'] = 'failed' if export['failed'] == export['total'] else 'completed'
+        export['finished_at'] = datetime.now().isoformat()
+    return export
+
+def _update_export(job_id, clip_id=None, **fields):
+    """Copy-on-write update of the job's export state (one clip, or the export itself)."""
+    if JOB_STORE_PATH:
+        _write_stored_export(job_id, lambda export: _export_with(export, clip_id, fields) if export else None)
+        return
     with jobs_lock:
-        if job_id in jobs:
-            jobs[job_id].update(fields)
-            jobs[job_id]['updated_at'] = datetime.now().isoformat()
-            jobs[job_id]['updated_at_ts'] = _now_ts()
+        job = jobs.get(job_id)
+        if job is None or not job.get('export'):
+            return
+        export = _export_with(job['export'], clip_id, fields)
+        if export is None:
+            return
+        job['export'] = export
+        _touch_job(job_id, job)
+    _persist_job(job_id)
 
+def _claim_export(job_id, export: dict):
+    """
+    Start `export` unless the job already has one running: (claimed, the job's export now). With a store the
+    check and the write are one transaction, so concurrent POSTs to different web processes can't both start.
+    """
+    if JOB_STORE_PATH:
+        current, claimed = _write_stored_export(
+            job_id, lambda running: None if (running or {}).get('status') == 'running' else export
+        )
+        return claimed, current
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None:
+            return False, None
+        if (job.get('export') or {}).get('status') == 'running':
+            return False, job['export']
+        job['export'] = export
+        _touch_job(job_id, job)
+    _persist_job(job_id)
+    return True, export
 
-def process_youtube_async(job_id, url, max_duration=30.0):
-    """Process YouTube video asynchronously"""
-    downloads_root = _downloads_root()
-    os.makedirs(downloads_root, exist_ok=True)
-    download_dir = tempfile.mkdtemp(prefix='yt-process-', dir=downloads_root)
+def _export_clip(job_id, source: str, clip: dict, out_path: str, mode: str, keyframes: list, snap: bool = False):
+    """Cut one clip with ffmpeg, stream-copying when the start is keyframe-aligned."""
+    clip_id = clip['id']
+    start = max(0.0, float(clip['start_time']))
+    end = max(start, float(clip['end_time']))
+    if snap and mode != 'reencode':
+        start, end = _snap_to_keyframes(keyframes, start, end)
+    duration = end - start
+    keyframe = _nearest_keyframe(keyframes, start) if mode != 'reencode' else None
+    copy = mode == 'copy' or (keyframe is not None and abs(keyframe - start) <= EXPORT_KEYFRAME_TOLERANCE)
+    if copy and keyframe is not None:
+        start = keyframe
+    _update_export(job_id, clip_id, status='running', method='copy' if copy else 'reencode',
+                   cut_start=round(start, 3), cut_end=round(start + duration, 3))
+    started = time.monotonic()
     try:
-        update_job_status(job_id, 'processing', 10, 'Downloading video from YouTube...')
-        
-        # Step 1: Download video
-        ydl_opts_info = {
-            'quiet': True,
-            'no_warnings': True,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts_info) as ydl:
-            info = ydl.extract_info(url, download=False)
-            video_title = info.get('title', 'Downloaded Video')
-            duration = info.get('duration', 0)
-            thumbnail = info.get('thumbnail')
+        if copy:
+            codec_args = ['-c', 'copy', '-avoid_negative_ts', 'make_zero']
+        else:
+            threads = max(1, (os.cpu_count() or 1) // EXPORT_WORKERS)
+            codec_args = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-threads', str(threads),
+                          '-c:a', 'aac', '-b:a', '160k']
+        proc = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-y', '-ss', f'{start:.3f}', '-i', source, '-t', f'{duration:.3f}',
+             '-map', '0:v:0?', '-map', '0:a:0?', *codec_args, '-movflags', '+faststart', out_path],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip()[-500:] or f'ffmpeg exited with {proc.returncode}')
+        _update_export(job_id, clip_id, status='done', path=out_path, size=os.path.getsize(out_path),
+                       seconds=round(time.monotonic() - started, 3))
+    except Exception as e:
+        print(f"Clip export failed for {clip_id}: {e}", file=sys.stderr)
+        _update_export(job_id, clip_id, status='failed', error=str(e))
 
-        update_job_fields(job_id, {
-            'video': {
-                'title': video_title,
-                'duration': duration,
-                'thumbnail': thumbnail,
-                'path': None,
-            }
+def _interrupted_export(export: dict) -> dict:
+    """A restored export that was running when the process stopped: its ffmpeg processes are gone."""
+    clips = {
+        clip_id: clip if clip.get('status') in ('done', 'failed') else dict(clip, status='failed', error='interrupted')
+        for clip_id, clip in (export.get('clips') or {}).items()
+    }
+    states = [c['status'] for c in clips.values()]
+    return dict(export, status='interrupted', clips=clips, done=states.count('done'), failed=states.count('failed'),
+                finished_at=datetime.now().isoformat())
+
+def _clip_filename(index: int, clip: dict) -> str:
+    title = _safe_filename(clip.get('title') or '')[:60].strip(' .-_')
+    return f"{index:03d}-{title or clip['id']}.mp4"
+
+@app.route('/jobs/<job_id>/export', methods=['POST'])
+def export_job_clips(job_id):
+    """
+    Export a completed job's clips to MP4 files in the background.
+    Body: {"clip_ids": [...] (default: all clips), "mode": "auto" | "copy" | "reencode",
+    "snap": true to move clip boundaries to the nearest keyframes for a fast cut}.
+    Progress is reported in the job status under `export`.
+    """
+    data = request.get_json(silent=True) or {}
+    mode = data.get('mode', 'auto')
+    if mode not in EXPORT_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(EXPORT_MODES)}"}), 400
+    snap = bool(data.get('snap', False)) and mode != 'reencode'
+    
+    job = _job_record(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.get('status') != 'completed':
+        return jsonify({'error': 'Job not completed', 'status': job.get('status')}), 400
+    
+    result = _job_result(job_id, job)
+    source = result.get('temp_video_path')
+    if not source or not os.path.exists(source):
+        return jsonify({'error': 'Video file no longer available'}), 410
+    clips = (result.get('video') or {}).get('clips') or []
+    wanted = data.get('clip_ids')
+    if wanted is not None:
+        wanted = set(wanted)
+        clips = [c for c in clips if c['id'] in wanted]
+    if not clips:
+        return jsonify({'error': 'No clips to export'}), 400
+    
+    out_dir = os.path.join(result.get('temp_dir') or os.path.dirname(source), 'clips')
+    os.makedirs(out_dir, exist_ok=True)
+    export = {
+        'status': 'running',
+        'mode': mode,
+        'snap': snap,
+        'total': len(clips),
+        'done': 0,
+        'failed': 0,
+        'started_at': datetime.now().isoformat(),
+        'clips': {
+            c['id']: {'status': 'queued', 'start_time': c['start_time'], 'end_time': c['end_time']}
+            for c in clips
+        },
+    }
+    claimed, current = _claim_export(job_id, export)
+    if not claimed:
+        if current is None or current.get('status') != 'running':
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'error': 'Export already running', 'export': current}), 409
+    
+    keyframes = _video_keyframes(source) if mode != 'reencode' else []
+    pool = _get_export_pool()
+    for i, clip in enumerate(clips):
+        pool.submit(_export_clip, job_id, source, clip, os.path.join(out_dir, _clip_filename(i, clip)), mode, keyframes, snap)
+    
+    return jsonify({'job_id': job_id, 'export': export}), 202
+
+
+# Crop tracks.
+# /jobs/<id>/crops and /crops compute vertical (or any aspect) reframing in the `Crops` shape the
+# editor uses (src/data/crops.ts). A spawned worker decodes one downscaled, low-fps grayscale pass,
+# splits it into shots on histogram jumps, and places the crop window where motion and edge energy
+# are highest, giving one segment per stable position within each shot. There is no face or speaker
+# detection, so segments carry no `speakers`. Results are cached on disk per video fingerprint,
+# aspect ratio and analysis settings.
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+CROP_CACHE_DIR = os.environ.get('CROP_CACHE_DIR') or os.path.join(_downloads_root(), '.cache', 'crops')
+CROP_WORKERS = max(1, int(os.environ.get('CROP_WORKERS', str(max(1, (os.cpu_count() or 2) // 2)))))
+CROP_SAMPLE_FPS = float(os.environ.get('CROP_SAMPLE_FPS', '2'))
+CROP_ANALYSIS_SIZE = (160, 90)  # frames are squashed to this size; positions are kept as fractions
+CROP_SCENE_THRESHOLD = 0.5  # L1 distance between normalized 32-bin histograms
+CROP_WINDOW_SECONDS = 4.0  # subject position is estimated per window within a shot...
+CROP_MOVE_THRESHOLD = 0.08  # ...and windows closer than this (fraction of the frame) are merged
+CROP_TRACK_VERSION = 2
+
+_crop_pool = None
+_crop_pool_lock = threading.Lock()
+_crop_inflight = {}  # cache path -> Future
+_crop_failures = {}  # cache path -> error of a failed run; reported to the next request, which then retries
+_crop_inflight_lock = threading.Lock()
+FINGERPRINT_MEMO_ENTRIES = 1024
+_fingerprint_memo = collections.OrderedDict()  # (realpath, size, mtime_ns) -> fingerprint, most recent last
+_fingerprint_lock = threading.Lock()
+
+def _media_fingerprint(path: str) -> str:
+    """Cheap content fingerprint: size plus sha256 of 1 MiB samples at the start, middle and end."""
+    st = os.stat(path)
+    memo_key = (os.path.realpath(path), st.st_size, st.st_mtime_ns)
+    with _fingerprint_lock:
+        cached = _fingerprint_memo.get(memo_key)
+        if cached:
+            _fingerprint_memo.move_to_end(memo_key)
+            return cached
+    h = hashlib.sha256(str(st.st_size).encode())
+    sample = 1 << 20
+    with open(path, 'rb') as f:
+        for offset in sorted({0, max(0, st.st_size // 2 - sample // 2), max(0, st.st_size - sample)}):
+            f.seek(offset)
+            h.update(f.read(sample))
+    fingerprint = h.hexdigest()
+    with _fingerprint_lock:
+        _fingerprint_memo[memo_key] = fingerprint
+        while len(_fingerprint_memo) > FINGERPRINT_MEMO_ENTRIES:
+            _fingerprint_memo.popitem(last=False)
+    return fingerprint
+
+def _parse_aspect(raw: str):
+    """'9:16' -> (9, 16); None if invalid."""
+    try:
+        w, h = (int(p) for p in (raw or '9:16').split(':'))
+    except ValueError:
+        return None
+    return (w, h) if w > 0 and h > 0 else None
+
+def _best_window(profile, width: int) -> int:
+    """Start index of the `width`-wide window holding the most energy."""
+    if width >= len(profile):
+        return 0
+    sums = np.convolve(profile, np.ones(width), mode='valid')
+    return int(np.argmax(sums))
+
+def _compute_crop_track(path: str, aspect: tuple) -> dict:
+    """Crop-pool worker: analyze `path` and return a Crops dict for the `aspect` (w, h) ratio."""
+    aw, ah = CROP_ANALYSIS_SIZE
+    proc = subprocess.Popen(
+        ['ffmpeg', '-hide_banner', '-nostats', '-i', path, '-an',
+         '-vf', f'fps={CROP_SAMPLE_FPS},scale={aw}:{ah},format=gray', '-f', 'rawvideo', '-'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    # Drain stderr concurrently so ffmpeg never blocks on a full pipe
+    stderr_chunks = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    drain.start()
+    frame_size = aw * ah
+    frames = []
+    while True:
+        buf = proc.stdout.read(frame_size)
+        if len(buf) < frame_size:
+            break
+        frames.append(np.frombuffer(buf, dtype=np.uint8).reshape(ah, aw))
+    proc.wait()
+    drain.join()
+    stderr = b''.join(stderr_chunks).decode('utf-8', 'replace')
+    if proc.returncode != 0 or not frames:
+        raise RuntimeError(f'frame sampling failed: {stderr[-500:]}')
+    
+    dims = re.search(r'Stream #.*Video: .*?\b(\d{2,5})x(\d{2,5})\b', stderr)
+    if not dims:
+        raise RuntimeError('could not determine video dimensions')
+    width, height = int(dims.group(1)), int(dims.group(2))
+    # Crop along whichever axis is too long for the target aspect ratio
+    if width * aspect[1] >= height * aspect[0]:
+        crop_w, crop_h = min(width, round(height * aspect[0] / aspect[1])), height
+    else:
+        crop_w, crop_h = width, min(height, round(width * aspect[1] / aspect[0]))
+    crop_w -= crop_w % 2
+    crop_h -= crop_h % 2
+    win_w = max(1, round(aw * crop_w / width))
+    win_h = max(1, round(ah * crop_h / height))
+    
+    # Per frame: shot-cut flag and the best crop window center (fractions of the frame)
+    centers = []
+    cuts = [0]
+    prev = None
+    prev_hist = None
+    for i, frame in enumerate(frames):
+        f = frame.astype(np.int16)
+        hist = np.bincount(frame.ravel() >> 3, minlength=32) / frame_size
+        cut = prev_hist is not None and float(np.abs(hist - prev_hist).sum()) > CROP_SCENE_THRESHOLD
+        if cut:
+            cuts.append(i)
+        edges = np.abs(np.diff(f, axis=1, prepend=f[:, :1])) + np.abs(np.diff(f, axis=0, prepend=f[:1]))
+        energy = edges.astype(np.float32)
+        if prev is not None and not cut:
+            energy += 4.0 * np.abs(f - prev)
+        cx = (_best_window(energy.sum(axis=0), win_w) + win_w / 2) / aw
+        cy = (_best_window(energy.sum(axis=1), win_h) + win_h / 2) / ah
+        centers.append((cx, cy))
+        prev, prev_hist = f, hist
+    cuts.append(len(frames))
+    
+    # Median position per window within each shot; merge neighbouring windows that barely move
+    window = max(1, round(CROP_WINDOW_SECONDS * CROP_SAMPLE_FPS))
+    spans = []  # (first_frame, cx, cy)
+    for shot_start, shot_end in zip(cuts, cuts[1:]):
+        for w_start in range(shot_start, shot_end, window):
+            block = np.array(centers[w_start:min(shot_end, w_start + window)])
+            cx, cy = float(np.median(block[:, 0])), float(np.median(block[:, 1]))
+            if spans and w_start != shot_start and abs(spans[-1][1] - cx) < CROP_MOVE_THRESHOLD and abs(spans[-1][2] - cy) < CROP_MOVE_THRESHOLD:
+                continue
+            spans.append((w_start, cx, cy))
+    
+    duration = len(frames) / CROP_SAMPLE_FPS
+    segments = []
+    for i, (first, cx, cy) in enumerate(spans):
+        end_time = spans[i + 1][0] / CROP_SAMPLE_FPS if i + 1 < len(spans) else duration
+        segments.append({
+            'start_time': round(first / CROP_SAMPLE_FPS, 3),
+            'end_time': round(end_time, 3),
+            'x': int(min(max(0, round(cx * width - crop_w / 2)), width - crop_w)),
+            'y': int(min(max(0, round(cy * height - crop_h / 2)), height - crop_h)),
         })
-        
-        safe_title = "".join(c for c in video_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title[:100]
-        
-        def _download_progress_hook(d):
+    return {
+        'original_width': width,
+        'original_height': height,
+        'crop_width': crop_w,
+        'crop_height': crop_h,
+        'segments': segments,
+    }
+
+def _get_crop_pool():
+    global _crop_pool
+    with _crop_pool_lock:
+        if _crop_pool is None:
+            _crop_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=CROP_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _crop_pool
+
+def _reset_crop_pool():
+    global _crop_pool
+    with _crop_pool_lock:
+        if _crop_pool is not None:
+            _crop_pool.shutdown(wait=False, cancel_futures=True)
+        _crop_pool = None
+
+def _crop_cache_path(path: str, aspect: tuple) -> str:
+    key = hashlib.sha256(
+        f'{_media_fingerprint(path)}|{aspect[0]}:{aspect[1]}|{CROP_SAMPLE_FPS}|{CROP_TRACK_VERSION}'.encode()
+    ).hexdigest()
+    return os.path.join(CROP_CACHE_DIR, key[:2], f'{key}.json')
+
+def _store_crop_track(cache_path: str, path: str, future):
+    """Done callback: cache the track (whether or not anyone polls again) and retire the in-flight entry."""
+    error = None
+    try:
+        crops = future.result()
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f'{cache_path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(crops, f)
+        os.replace(tmp, cache_path)
+    except Exception as e:
+        print(f"Crop track failed for {path}: {e}", file=sys.stderr)
+        error = str(e)
+    with _crop_inflight_lock:
+        _crop_inflight.pop(cache_path, None)
+        if error is not None:
+            _crop_failures[cache_path] = error
+    _release_artifact(path)
+
+def _read_crop_track(cache_path: str):
+    """A cached crop track, or None. A corrupt file (e.g. a truncated write) is removed so it gets recomputed."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:
+        return None
+    except ValueError:
+        print(f"Discarding corrupt crop track {cache_path}", file=sys.stderr)
+        with contextlib.suppress(OSError):
+            os.remove(cache_path)
+        return None
+
+def _crop_track_response(path: str, raw_aspect: str):
+    """Cached crop track for `path`, or start computing it (202) on a miss."""
+    if not NUMPY_AVAILABLE:
+        return jsonify({'error': 'numpy not installed'}), 500
+    aspect = _parse_aspect(raw_aspect)
+    if aspect is None:
+        return jsonify({'error': 'aspect must look like 9:16'}), 400
+    cache_path = _crop_cache_path(path, aspect)
+    crops = _read_crop_track(cache_path)
+    if crops is not None:
+        return jsonify({'status': 'completed', 'cached': True, 'crops': crops})
+    
+    with _crop_inflight_lock:
+        error = _crop_failures.pop(cache_path, None)
+        future = _crop_inflight.get(cache_path)
+        start = error is None and future is None
+        if start:
+            # A run may have finished between the cache read above and taking the lock (the done
+            # callback writes the file before retiring the in-flight entry)
+            crops = _read_crop_track(cache_path)
+            start = crops is None
+        if start:
             try:
-                status = d.get('status')
-                if status != 'downloading':
-                    return
-                downloaded = d.get('downloaded_bytes') or 0
-                total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
-                if total:
-                    pct = float(downloaded) / float(total)
-                    # map download progress to 10..35
-                    prog = int(10 + pct * 25)
-                    update_job_status(job_id, 'processing', max(10, min(35, prog)), 'Downloading video from YouTube...')
-            except Exception:
-                # Never break the download due to hook issues
-                return
+                future = _get_crop_pool().submit(_compute_crop_track, path, aspect)
+            except concurrent.futures.process.BrokenProcessPool:
+                # A worker died (e.g. OOM); start a fresh pool
+                _reset_crop_pool()
+                future = _get_crop_pool().submit(_compute_crop_track, path, aspect)
+            _crop_inflight[cache_path] = future
+    if error is not None:
+        return jsonify({'status': 'failed', 'error': error}), 500
+    if crops is not None:
+        return jsonify({'status': 'completed', 'cached': True, 'crops': crops})
+    if start:
+        _acquire_artifact(path)
+        # Outside the lock: the callback takes it, and runs right here if the future is already done
+        future.add_done_callback(lambda f: _store_crop_track(cache_path, path, f))
+    return jsonify({'status': 'running', 'aspect': f'{aspect[0]}:{aspect[1]}'}), 202
 
-        ydl_opts = {
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-            'outtmpl': os.path.join(download_dir, f'{safe_title}.%(ext)s'),
-            'quiet': False,
-            'progress_hooks': [_download_progress_hook],
-        }
+@app.route('/jobs/<job_id>/crops', methods=['GET'])
+def get_job_crops(job_id):
+    """Crop track (?aspect=9:16) for a job's video; 202 while it's being computed."""
+    if not _job_known(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+    video_path = _job_video_path(job_id)
+    if video_path is None:
+        return jsonify({'error': 'Video not available yet'}), 409
+    return _crop_track_response(video_path, request.args.get('aspect', '9:16'))
+
+@app.route('/crops', methods=['GET'])
+def get_crops():
+    """Crop track (?path=<video>&aspect=9:16) for a downloaded or uploaded video."""
+    path = request.args.get('path', '')
+    if not path or not _is_allowed_video_path(path) or not os.path.isfile(path):
+        return jsonify({'error': 'Video not found'}), 404
+    return _crop_track_response(os.path.realpath(path), request.args.get('aspect', '9:16'))
+
+
+# Scrub assets.
+# For timeline scrubbing, one ffmpeg decode pass per video produces tiled JPEG thumbnail sprite
+# sheets (one thumbnail every SPRITE_INTERVAL_SECONDS) and, from the same pass, mono 8 kHz PCM
+# that is reduced to WAVEFORM_PEAKS_PER_SECOND peak values. Both are written next to the video in
+# `<video>.scrub/` (built in a temp dir and renamed into place) and are served by /jobs/<id>/sprites
+# and /jobs/<id>/waveform. Finished jobs get them in the background; otherwise the first request
+# starts the pass and gets 202.
+SCRUB_ASSETS_AUTO = os.environ.get('SCRUB_ASSETS_AUTO', '1') == '1'
+SCRUB_WORKERS = max(1, int(os.environ.get('SCRUB_WORKERS', '1')))
+SPRITE_INTERVAL_SECONDS = max(0.1, float(os.environ.get('SPRITE_INTERVAL_SECONDS', '2')))
+SPRITE_THUMB_WIDTH = 160
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+WAVEFORM_SAMPLE_RATE = 8000
+WAVEFORM_PEAKS_PER_SECOND = max(1, int(os.environ.get('WAVEFORM_PEAKS_PER_SECOND', '50')))
+
+_scrub_pool = None
+_scrub_inflight = {}  # video realpath -> Future
+_scrub_failures = {}  # video realpath -> failed Future, handed to the next caller once; the one after retries
+_scrub_lock = threading.Lock()
+
+def _scrub_dir(video_path: str) -> str:
+    return os.path.realpath(video_path) + '.scrub'
+
+def _load_scrub_manifest(video_path: str) -> dict | None:
+    """Manifest of the video's scrub assets, if they exist and match the current file."""
+    try:
+        with open(os.path.join(_scrub_dir(video_path), 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        st = os.stat(video_path)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('source_size') != st.st_size or manifest.get('source_mtime_ns') != st.st_mtime_ns:
+        return None
+    return manifest
+
+def _pcm_peaks(pcm: bytes, step: int) -> list:
+    """Peak of each `step`-sample bucket of s16le PCM, scaled to 0-100 (len(pcm) is a multiple of 2 * step)."""
+    if NUMPY_AVAILABLE:
+        buckets = np.frombuffer(pcm, dtype='<i2').astype(np.int32).reshape(-1, step)
+        return (np.abs(buckets).max(axis=1) * 100 // 32768).tolist()
+    samples = array.array('h', pcm)
+    if sys.byteorder != 'little':
+        samples.byteswap()
+    peaks = []
+    for i in range(0, len(samples), step):
+        bucket = samples[i:i + step]
+        peaks.append(max(max(bucket), -min(bucket)) * 100 // 32768)
+    return peaks
+
+def _generate_scrub_assets(video_path: str) -> dict:
+    """Single ffmpeg pass: sprite sheets to files, audio PCM to stdout for waveform peaks."""
+    video_path = os.path.realpath(video_path)
+    st = os.stat(video_path)
+    final_dir = _scrub_dir(video_path)
+    work_dir = f'{final_dir}.tmp-{uuid.uuid4().hex[:8]}'
+    os.makedirs(work_dir)
+    try:
+        # An output with no streams aborts the whole command, so silent videos get no PCM output
+        # (and an empty waveform). Without ffprobe, assume there is audio.
+        probe = _probe_media(video_path)
+        has_audio = probe is None or probe.get('audio_codec') is not None
+        tile = f'tile={SPRITE_COLUMNS}x{SPRITE_ROWS}'
+        cmd = ['ffmpeg', '-hide_banner', '-nostats', '-i', video_path,
+               '-filter_complex', f'[0:v:0]fps=1/{SPRITE_INTERVAL_SECONDS},scale={SPRITE_THUMB_WIDTH}:-2,{tile}[sprites]',
+               '-map', '[sprites]', '-q:v', '5', os.path.join(work_dir, 'sprite-%03d.jpg')]
+        if has_audio:
+            cmd += ['-map', '0:a:0?', '-ac', '1', '-ar', str(WAVEFORM_SAMPLE_RATE), '-f', 's16le', 'pipe:1']
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stderr_chunks = []
+        drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+        drain.start()
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+        step = max(1, WAVEFORM_SAMPLE_RATE // WAVEFORM_PEAKS_PER_SECOND)
+        bucket_bytes = 2 * step
+        peaks = []
+        pending = b''
+        for chunk in iter(lambda: proc.stdout.read(1 << 16), b''):
+            pending += chunk
+            usable = len(pending) - len(pending) % bucket_bytes
+            peaks.extend(_pcm_peaks(pending[:usable], step))
+            pending = pending[usable:]
+        proc.wait()
+        drain.join()
+        stderr = b''.join(stderr_chunks).decode('utf-8', 'replace')
+        if proc.returncode != 0:
+            raise RuntimeError(f'scrub pass failed: {stderr[-500:]}')
         
-        # Find downloaded file
-        files = os.listdir(download_dir)
-        video_file = None
-        for f in files:
-            if f.endswith(('.mp4', '.webm', '.mkv')):
-                video_file = os.path.join(download_dir, f)
-                break
+        sheets = sorted(f for f in os.listdir(work_dir) if f.startswith('sprite-'))
+        # Sheet size from the output stream header, e.g. "Video: mjpeg, ..., 1600x900"
+        output_info = stderr.split('Output #0', 1)[-1]
+        size = re.search(r'Video: .*?\b(\d{2,5})x(\d{2,5})\b', output_info)
+        thumb_w, thumb_h = (
+            (int(size.group(1)) // SPRITE_COLUMNS, int(size.group(2)) // SPRITE_ROWS) if size else (SPRITE_THUMB_WIDTH, None)
+        )
+        duration = None
+        hms = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', stderr)
+        if hms:
+            duration = int(hms.group(1)) * 3600 + int(hms.group(2)) * 60 + float(hms.group(3))
+        per_sheet = SPRITE_COLUMNS * SPRITE_ROWS
+        count = len(sheets) * per_sheet
+        if duration:
+            count = min(count, max(1, int(-(-duration // SPRITE_INTERVAL_SECONDS))))
         
-        if not video_file:
-            update_job_status(job_id, 'failed', 0, 'Failed to download video file', 'Video file not found')
+        manifest = {
+            'source_size': st.st_size,
+            'source_mtime_ns': st.st_mtime_ns,
+            'duration': duration,
+            'sprites': {
+                'interval': SPRITE_INTERVAL_SECONDS,
+                'thumb_width': thumb_w,
+                'thumb_height': thumb_h,
+                'columns': SPRITE_COLUMNS,
+                'rows': SPRITE_ROWS,
+                'count': count,
+                'sheets': sheets,
+            },
+            'waveform': {
+                'peaks_per_second': WAVEFORM_PEAKS_PER_SECOND,
+                'max': 100,
+                'count': len(peaks),
+            },
+        }
+        with open(os.path.join(work_dir, 'waveform.json'), 'w', encoding='utf-8') as f:
+            json.dump({**manifest['waveform'], 'peaks': peaks}, f, separators=(',', ':'))
+        with open(os.path.join(work_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        if os.path.isdir(final_dir):
+            shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(work_dir, final_dir)
+        return manifest
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+def _schedule_scrub_assets(video_path: str):
+    """Start (or join) the scrub pass for a video; returns its Future."""
+    global _scrub_pool
+    key = os.path.realpath(video_path)
+    with _scrub_lock:
+        future = _scrub_inflight.get(key) or _scrub_failures.pop(key, None)
+        if future is not None:
+            return future
+        if _scrub_pool is None:
+            _scrub_pool = concurrent.futures.ThreadPoolExecutor(max_workers=SCRUB_WORKERS, thread_name_prefix='scrub')
+        _acquire_artifact(key)
+        future = _scrub_pool.submit(_generate_scrub_assets, key)
+        _scrub_inflight[key] = future
+    
+    def _done(f):
+        _release_artifact(key)
+        with _scrub_lock:
+            _scrub_inflight.pop(key, None)
+            if f.exception() is not None:
+                print(f"Scrub assets failed for {key}: {f.exception()}", file=sys.stderr)
+                _scrub_failures[key] = f
+    future.add_done_callback(_done)
+    return future
+
+def _job_video_path(job_id):
+    """Path of a job's downloaded video, or None (also None for unknown jobs)."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+        video_path = (job.get('video') or {}).get('path') if job else None
+    if job is None:
+        # Run by another web process: its stored row and result checkpoint have the same paths
+        job = _stored_job(job_id)
+        if job is None:
+            return None
+        video_path = (job.get('video') or {}).get('path')
+    if not video_path and job.get('status') == 'completed':
+        video_path = _job_result(job_id, job).get('temp_video_path')
+    return video_path if video_path and os.path.exists(video_path) else None
+
+def _job_scrub_manifest(job_id):
+    """(manifest, video_path, error_response) for the scrub endpoints."""
+    if not _job_known(job_id):
+        return None, None, (jsonify({'error': 'Job not found'}), 404)
+    video_path = _job_video_path(job_id)
+    if video_path is None:
+        return None, None, (jsonify({'error': 'Video not available yet'}), 409)
+    manifest = _load_scrub_manifest(video_path)
+    if manifest is None:
+        future = _schedule_scrub_assets(video_path)
+        if not future.done():
+            return None, video_path, (jsonify({'status': 'running'}), 202)
+        if future.exception() is not None:
+            return None, video_path, (jsonify({'status': 'failed', 'error': str(future.exception())}), 500)
+        manifest = future.result()
+    return manifest, video_path, None
+
+@app.route('/jobs/<job_id>/sprites', methods=['GET'])
+def get_job_sprites(job_id):
+    """Sprite sheet layout for timeline scrubbing, with a URL per sheet."""
+    manifest, _, error = _job_scrub_manifest(job_id)
+    if error:
+        return error
+    sprites = dict(manifest['sprites'])
+    sprites['urls'] = [f'/jobs/{job_id}/sprites/{i}' for i in range(len(sprites['sheets']))]
+    return jsonify({'status': 'completed', 'duration': manifest['duration'], 'sprites': sprites})
+
+@app.route('/jobs/<job_id>/sprites/<int:index>', methods=['GET'])
+def get_job_sprite_sheet(job_id, index):
+    manifest, video_path, error = _job_scrub_manifest(job_id)
+    if error:
+        return error
+    sheets = manifest['sprites']['sheets']
+    if not 0 <= index < len(sheets):
+        return jsonify({'error': 'Sprite sheet not found'}), 404
+    return _send_media(os.path.join(_scrub_dir(video_path), sheets[index]), 'image/jpeg')
+
+@app.route('/jobs/<job_id>/waveform', methods=['GET'])
+def get_job_waveform(job_id):
+    """Audio peaks (0..100, WAVEFORM_PEAKS_PER_SECOND per second) for drawing a waveform."""
+    manifest, video_path, error = _job_scrub_manifest(job_id)
+    if error:
+        return error
+    return _send_media(os.path.join(_scrub_dir(video_path), 'waveform.json'), 'application/json')
+
+
+# Preview proxies.
+# Originals are kept at full quality for export, which makes them slow to seek in the browser
+# (high bitrate, sometimes moov at the end). After the video download a low-priority (nice 19,
+# thread-capped) ffmpeg pass writes a faststart, PREVIEW_PROXY_HEIGHT-line H.264/AAC proxy next
+# to it. The job's `video.proxy_path` and the result's `proxy_video_path` point at it once ready.
+PREVIEW_PROXIES = os.environ.get('PREVIEW_PROXIES', '1') == '1'
+PREVIEW_PROXY_HEIGHT = int(os.environ.get('PREVIEW_PROXY_HEIGHT', '480'))
+PREVIEW_PROXY_WORKERS = max(1, int(os.environ.get('PREVIEW_PROXY_WORKERS', '1')))
+PREVIEW_PROXY_THREADS = 2
+
+_proxy_pool = None
+_proxy_pool_lock = threading.Lock()
+
+def _proxy_path_for(video_path: str) -> str:
+    stem, _ = os.path.splitext(video_path)
+    return f'{stem}.proxy.mp4'
+
+def _generate_preview_proxy(video_path: str) -> str:
+    """Encode the preview proxy (to a .part file renamed into place); returns its path."""
+    out_path = _proxy_path_for(video_path)
+    if os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(video_path):
+        return out_path
+    part = f'{out_path}.part'
+    cmd = ['ffmpeg', '-v', 'error', '-y', '-i', video_path,
+           '-map', '0:v:0', '-map', '0:a:0?',
+           '-vf', f"scale=-2:'min({PREVIEW_PROXY_HEIGHT},ih)'",
+           '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28', '-maxrate', '1500k', '-bufsize', '3000k',
+           '-g', '48', '-pix_fmt', 'yuv420p', '-threads', str(PREVIEW_PROXY_THREADS),
+           '-c:a', 'aac', '-b:a', '96k', '-ac', '2',
+           '-movflags', '+faststart', '-f', 'mp4', part]
+    if shutil.which('nice'):
+        # Lowest CPU priority so proxies never starve transcription
+        cmd = ['nice', '-n', '19'] + cmd
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        if os.path.exists(part):
+            os.remove(part)
+        raise RuntimeError(proc.stderr.strip()[-500:] or f'ffmpeg exited with {proc.returncode}')
+    os.replace(part, out_path)
+    return out_path
+
+def _set_job_proxy(job_id, proxy_path: str):
+    """Record a finished proxy on the job (and on its result, if it has been built already)."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None:
             return
-        
-        file_size = os.path.getsize(video_file)
-        video_id = f'youtube-{os.urandom(8).hex()}'
+        job['video'] = dict(job.get('video') or {}, proxy_path=proxy_path)
+        result = job.get('result')
+        if result is not None:
+            result['proxy_video_path'] = proxy_path
+        _touch_job(job_id, job)
+    _persist_job(job_id)
+    if result is not None:
+        _checkpoint_job(job_id, 'result', result)
+
+def _schedule_preview_proxy(job_id, video_path: str):
+    global _proxy_pool
+    with _proxy_pool_lock:
+        if _proxy_pool is None:
+            _proxy_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=PREVIEW_PROXY_WORKERS, thread_name_prefix='preview-proxy'
+            )
+        pool = _proxy_pool
+    
+    def _run():
+        try:
+            with _pin_artifact(video_path):
+                _set_job_proxy(job_id, _generate_preview_proxy(video_path))
+        except Exception as e:
+            # The original still works for preview; just log
+            print(f"Preview proxy failed for {video_path}: {e}", file=sys.stderr)
+    pool.submit(_run)
+
+
+# Storage manager.
+# Everything under downloads/ is grouped into artifacts: a job or download dir, a shared download
+# cache entry (or its .partial staging dir), a crop track or probe, an upload. Artifacts are
+# refcounted from live state (unfinished jobs and exports, in-flight downloads, uploads still
+# receiving chunks, explicit _pin_artifact holders) and the rest are evicted least-recently-used
+# first whenever the tree exceeds STORAGE_QUOTA_MB or the disk's free space drops below
+# STORAGE_MIN_FREE_MB. Hardlinked files (job videos linked from the cache) are counted once and only
+# free space when every link goes.
+# The transcription cache and the job store manage themselves and are only reported.
+STORAGE_QUOTA_BYTES = int(float(os.environ.get('STORAGE_QUOTA_MB', '0')) * 1024 * 1024)
+STORAGE_MIN_FREE_BYTES = int(float(os.environ.get('STORAGE_MIN_FREE_MB', '0')) * 1024 * 1024)
+# Unreferenced artifacts idle for longer than this are evicted even under quota (0 = never)
+STORAGE_MAX_AGE_SECONDS = float(os.environ.get('STORAGE_MAX_AGE_HOURS', '0')) * 3600
+STORAGE_CHECK_INTERVAL_SECONDS = max(5.0, float(os.environ.get('STORAGE_CHECK_INTERVAL_SECONDS', '300')))
+# Artifacts written or read this recently are never evicted (covers synchronous routes mid-request)
+STORAGE_GRACE_SECONDS = float(os.environ.get('STORAGE_GRACE_SECONDS', '600'))
+# Once eviction starts it continues down to this fraction of the quota, so it doesn't run per file
+STORAGE_LOW_WATERMARK = 0.9
+STORAGE_EVICTABLE_KINDS = ('job', 'download', 'youtube_cache', 'partial', 'crops', 'probes', 'upload')
+
+_artifact_pins = collections.Counter()  # artifact root -> holders
+_artifact_access = {}  # artifact root -> last read ts (reads don't bump mtime)
+_artifact_lock = threading.Lock()
+_storage_pass_lock = threading.Lock()
+_storage_wakeup = threading.Event()
+_storage_stats = {
+    'passes': 0,
+    'evicted_artifacts': 0,
+    'evicted_bytes': 0,
+    'last_pass_ts': None,
+    'last_pass_seconds': None,
+    'last_error': None,
+}
+
+def _artifact_root(path: str) -> str | None:
+    """The artifact (eviction unit) a path under downloads/ belongs to; None outside it."""
+    root = _downloads_root()
+    path = os.path.realpath(path)
+    if not path.startswith(root + os.sep):
+        return None
+    parts = os.path.relpath(path, root).split(os.sep)
+    if parts[0] == '.cache':
+        # Crop tracks and probes are sharded by key prefix: .cache/crops/<xx>/<key>.json
+        depth = 4 if parts[1:2] in (['crops'], ['probes']) else 3
+        if len(parts) < depth:
+            return None
+        if depth == 3 and parts[2].startswith('.partial-') and parts[2].endswith('.lock'):
+            # A staging dir's lock file belongs to (and is referenced with) the staging dir
+            parts[2] = parts[2][:-len('.lock')]
+        return os.path.join(root, *parts[:depth])
+    if parts[0] == 'uploads':
+        return os.path.join(root, *parts[:2]) if len(parts) >= 2 else None
+    return os.path.join(root, parts[0])
+
+def _artifact_kind(artifact: str) -> str:
+    parts = os.path.relpath(artifact, _downloads_root()).split(os.sep)
+    name = parts[-1]
+    if parts[0] == '.cache':
+        if parts[1] == 'youtube':
+            return 'partial' if name.startswith('.partial-') else 'youtube_cache'
+        return {'crops': 'crops', 'probes': 'probes', 'transcriptions': 'transcriptions'}.get(parts[1], 'other')
+    if parts[0] == 'uploads':
+        return 'upload'
+    if name.startswith('yt-process-'):
+        return 'job'
+    if name.startswith('yt-download-'):
+        return 'download'
+    if os.path.basename(JOB_STORE_PATH or '') and name.startswith(os.path.basename(JOB_STORE_PATH)):
+        return 'job_store'
+    return 'other'
+
+def _file_category(path: str, kind: str) -> str:
+    """Finer-grained usage bucket of one file inside an artifact."""
+    if path.endswith('.proxy.mp4'):
+        return 'proxies'
+    if '.scrub' + os.sep in path:
+        return 'scrub'
+    if kind == 'job' and os.sep + 'clips' + os.sep in path:
+        return 'exports'
+    return kind
+
+def _acquire_artifact(path: str):
+    root = _artifact_root(path)
+    if root:
+        with _artifact_lock:
+            _artifact_pins[root] += 1
+
+def _release_artifact(path: str):
+    root = _artifact_root(path)
+    if root:
+        with _artifact_lock:
+            _artifact_pins[root] -= 1
+            if _artifact_pins[root] <= 0:
+                del _artifact_pins[root]
+
+@contextlib.contextmanager
+def _pin_artifact(path: str):
+    """Keep the artifact holding `path` from being evicted while the block runs."""
+    _acquire_artifact(path)
+    try:
+        yield
+    finally:
+        _release_artifact(path)
+
+def _touch_artifact(path: str):
+    root = _artifact_root(path)
+    if root:
+        _artifact_access[root] = _now_ts()
+
+def _job_holds_artifacts(job: dict) -> bool:
+    """A job still reads its dirs while it runs or exports."""
+    return job.get('status') not in ('completed', 'failed') or (job.get('export') or {}).get('status') == 'running'
+
+def _referenced_artifacts() -> tuple[set, dict]:
+    """(artifacts live state still needs, artifact -> job_id for every job dir we know of)."""
+    refs = set()
+    owners = {}
+    with jobs_lock:
+        job_dirs = [
+            (job_id, path, _job_holds_artifacts(job))
+            for job_id, job in jobs.items()
+            for path in (job.get('download_dir'), (job.get('result') or {}).get('temp_dir'))
+            if path
+        ]
+        known = set(jobs)
+    # Web processes sharing the store also share downloads/: their jobs' dirs are in use too
+    job_dirs += [entry for entry in _stored_job_dirs() if entry[0] not in known]
+    for job_id, path, live in job_dirs:
+        root = _artifact_root(path)
+        if root:
+            owners[root] = job_id
+            if live:
+                refs.add(root)
+    cache_root = _youtube_cache_root()
+    with _inflight_downloads_lock:
+        for key in _inflight_downloads:
+            refs.add(os.path.join(cache_root, key))
+            refs.add(os.path.join(cache_root, f'.partial-{key}'))
+    with _artifact_lock:
+        refs.update(_artifact_pins)
+    uploads_root = _uploads_root()
+    try:
+        names = os.listdir(uploads_root)
+    except OSError:
+        names = []
+    for name in names:
+        meta = _read_upload_meta(name)
+        if meta and meta.get('status') == 'uploading':
+            refs.add(os.path.join(uploads_root, name))
+    return refs, owners
+
+def _artifact_claimed(artifact: str, owner: str | None) -> bool:
+    """
+    Whether an artifact got claimed since _referenced_artifacts ran: the state that can change under
+    an eviction pass is pins, in-flight downloads and its owning job (re)starting. Checked one
+    artifact at a time so each deletion doesn't rebuild the whole reference set.
+    """
+    with _artifact_lock:
+        if _artifact_pins.get(artifact):
+            return True
+    if os.path.dirname(artifact) == _youtube_cache_root():
+        name = os.path.basename(artifact)
+        key = name[len('.partial-'):] if name.startswith('.partial-') else name
+        with _inflight_downloads_lock:
+            if key in _inflight_downloads:
+                return True
+    if owner is not None:
+        with jobs_lock:
+            job = jobs.get(owner)
+            if job is not None:
+                return _job_holds_artifacts(job)
+        job = _stored_job(owner)
+        return job is not None and _job_holds_artifacts(job)
+    return False
+
+def _scan_storage() -> dict:
+    """Walk downloads/ once: per-artifact sizes, inodes and newest mtime, plus per-category totals."""
+    root = _downloads_root()
+    artifacts = {}
+    inodes = {}  # (dev, ino) -> [size, links seen under the root]
+    usage = collections.defaultdict(lambda: {'bytes': 0, 'files': 0})
+    for dirpath, _dirnames, filenames in os.walk(root):
+        artifact = _artifact_root(dirpath)
+        if artifact:
+            entry = artifacts.get(artifact)
+            if entry is None:
+                entry = artifacts[artifact] = {'kind': _artifact_kind(artifact), 'bytes': 0, 'files': 0, 'inodes': [], 'mtime': 0.0}
+            try:
+                entry['mtime'] = max(entry['mtime'], os.stat(dirpath).st_mtime)
+            except OSError:
+                pass
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            file_artifact = artifact or _artifact_root(path) or path
+            entry = artifacts.get(file_artifact)
+            if entry is None:
+                entry = artifacts[file_artifact] = {'kind': _artifact_kind(file_artifact), 'bytes': 0, 'files': 0, 'inodes': [], 'mtime': 0.0}
+            inode = (st.st_dev, st.st_ino)
+            entry['inodes'].append(inode)
+            entry['files'] += 1
+            entry['mtime'] = max(entry['mtime'], st.st_mtime)
+            seen = inodes.get(inode)
+            if seen is not None:
+                seen[1] += 1
+                continue
+            inodes[inode] = [st.st_size, 1]
+            entry['bytes'] += st.st_size
+            bucket = usage[_file_category(path, entry['kind'])]
+            bucket['bytes'] += st.st_size
+            bucket['files'] += 1
+    return {
+        'artifacts': artifacts,
+        'inodes': inodes,
+        'usage': dict(usage),
+        'total_bytes': sum(size for size, _ in inodes.values()),
+    }
+
+def _disk_free(path: str) -> int | None:
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+def _release_inodes(entry: dict, inodes: dict) -> int:
+    """Drop an artifact's links from the scan's inode table; returns the bytes no other link keeps."""
+    freed = 0
+    for inode in entry['inodes']:
+        seen = inodes.get(inode)
+        if seen is None:
+            continue
+        seen[1] -= 1
+        if seen[1] <= 0:
+            freed += seen[0]
+            del inodes[inode]
+    return freed
+
+def _evict_artifact(artifact: str, entry: dict, inodes: dict) -> int | None:
+    """
+    Delete an artifact; returns the bytes that actually came back (links elsewhere keep theirs), or
+    None if it turned out to be in use.
+    """
+    if entry['kind'] == 'partial':
+        # Another web process may be downloading into it: only evict if its staging lock is free
+        with open(f'{artifact}.lock', 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return None
+            # The lock file stays (it's empty and reused); _remove_stale_partials cleans up old ones
+            shutil.rmtree(artifact, ignore_errors=True)
+        _artifact_access.pop(artifact, None)
+        return _release_inodes(entry, inodes)
+    if entry['kind'] == 'youtube_cache':
+        # Drop meta.json first so a concurrent _cached_download_path misses instead of half-hitting
+        with contextlib.suppress(OSError):
+            os.remove(os.path.join(artifact, 'meta.json'))
+    if os.path.isdir(artifact):
+        shutil.rmtree(artifact, ignore_errors=True)
+    else:
+        with contextlib.suppress(OSError):
+            os.remove(artifact)
+    _artifact_access.pop(artifact, None)
+    return _release_inodes(entry, inodes)
+
+def _enforce_storage() -> dict:
+    """One eviction pass; returns what it evicted."""
+    with _storage_pass_lock:
+        started = time.perf_counter()
+        now = _now_ts()
+        root = _downloads_root()
+        scan = _scan_storage()
+        refs, owners = _referenced_artifacts()
+        total = scan['total_bytes']
+        free = _disk_free(root)
+        quota_target = total
+        if STORAGE_QUOTA_BYTES and total > STORAGE_QUOTA_BYTES:
+            quota_target = int(STORAGE_QUOTA_BYTES * STORAGE_LOW_WATERMARK)
+        free_target = 0
+        if STORAGE_MIN_FREE_BYTES and free is not None and free < STORAGE_MIN_FREE_BYTES:
+            free_target = int(STORAGE_MIN_FREE_BYTES / STORAGE_LOW_WATERMARK)
+
+        candidates = []
+        for artifact, entry in scan['artifacts'].items():
+            if entry['kind'] not in STORAGE_EVICTABLE_KINDS or artifact in refs:
+                continue
+            last_used = max(entry['mtime'], _artifact_access.get(artifact, 0.0))
+            if now - last_used < STORAGE_GRACE_SECONDS:
+                continue
+            candidates.append((last_used, artifact))
+        candidates.sort()
+
+        evicted = []
+        for last_used, artifact in candidates:
+            expired = STORAGE_MAX_AGE_SECONDS and now - last_used > STORAGE_MAX_AGE_SECONDS
+            if not (expired or total > quota_target or (free is not None and free < free_target)):
+                break
+            # Re-check right before deleting: a job or download may have claimed it since the scan
+            if _artifact_claimed(artifact, owners.get(artifact)):
+                continue
+            entry = scan['artifacts'][artifact]
+            freed = _evict_artifact(artifact, entry, scan['inodes'])
+            if freed is None:
+                continue
+            total -= freed
+            if free is not None:
+                free = _disk_free(root)
+            evicted.append({'artifact': os.path.relpath(artifact, root), 'kind': entry['kind'], 'freed_bytes': freed})
+            job_id = owners.get(artifact)
+            if job_id is not None:
+                update_job_fields(job_id, {'storage_evicted_at': datetime.now().isoformat()})
+
+        elapsed = time.perf_counter() - started
+        _storage_stats['passes'] += 1
+        _storage_stats['evicted_artifacts'] += len(evicted)
+        _storage_stats['evicted_bytes'] += sum(e['freed_bytes'] for e in evicted)
+        _storage_stats['last_pass_ts'] = now
+        _storage_stats['last_pass_seconds'] = round(elapsed, 3)
+        if evicted:
+            print(f"Storage: evicted {len(evicted)} artifact(s), "
+                  f"{sum(e['freed_bytes'] for e in evicted) / 1024 / 1024:.1f} MB in {elapsed:.2f}s", file=sys.stderr)
+        return {'evicted': evicted, 'total_bytes': total, 'free_bytes': free}
+
+def _storage_limits_enabled() -> bool:
+    return bool(STORAGE_QUOTA_BYTES or STORAGE_MIN_FREE_BYTES or STORAGE_MAX_AGE_SECONDS)
+
+def _wake_storage_manager():
+    """Ask for an eviction pass soon (after something was written)."""
+    _storage_wakeup.set()
+
+def _storage_loop():
+    while True:
+        _storage_wakeup.wait(STORAGE_CHECK_INTERVAL_SECONDS)
+        _storage_wakeup.clear()
+        try:
+            _enforce_storage()
+            _storage_stats['last_error'] = None
+        except Exception as e:
+            _storage_stats['last_error'] = str(e)
+            print(f"Storage pass failed: {e}", file=sys.stderr)
+
+def _storage_snapshot(detail: bool = False) -> dict:
+    root = _downloads_root()
+    scan = _scan_storage()
+    refs, _owners = _referenced_artifacts()
+    kinds = collections.defaultdict(lambda: {'artifacts': 0, 'bytes': 0, 'referenced': 0})
+    for artifact, entry in scan['artifacts'].items():
+        bucket = kinds[entry['kind']]
+        bucket['artifacts'] += 1
+        bucket['bytes'] += entry['bytes']
+        bucket['referenced'] += artifact in refs
+    payload = {
+        'root': root,
+        'total_bytes': scan['total_bytes'],
+        'usage': scan['usage'],
+        'artifacts': dict(kinds),
+        'quota_bytes': STORAGE_QUOTA_BYTES or None,
+        'min_free_bytes': STORAGE_MIN_FREE_BYTES or None,
+        'max_age_hours': STORAGE_MAX_AGE_SECONDS / 3600 or None,
+        'free_bytes': _disk_free(root) if os.path.isdir(root) else None,
+        'enforced': _storage_limits_enabled(),
+        'stats': dict(_storage_stats),
+    }
+    if detail:
+        items = []
+        for artifact, entry in scan['artifacts'].items():
+            items.append({
+                'artifact': os.path.relpath(artifact, root),
+                'kind': entry['kind'],
+                'bytes': entry['bytes'],
+                'files': entry['files'],
+                'last_used_ts': max(entry['mtime'], _artifact_access.get(artifact, 0.0)),
+                'referenced': artifact in refs,
+                'evictable': entry['kind'] in STORAGE_EVICTABLE_KINDS,
+            })
+        # Eviction order: least recently used first
+        payload['items'] = sorted(items, key=lambda item: item['last_used_ts'])
+    return payload
+
+@app.route('/storage', methods=['GET'])
+def get_storage():
+    """Disk usage under downloads/ by kind, limits and eviction stats (?detail=1 lists artifacts)."""
+    return jsonify(_storage_snapshot(detail=request.args.get('detail') in ('1', 'true')))
+
+@app.route('/storage/gc', methods=['POST'])
+def run_storage_gc():
+    """Run an eviction pass now."""
+    if not _storage_limits_enabled():
+        return jsonify({'error': 'No storage limits configured', 'evicted': []}), 400
+    return jsonify(_enforce_storage())
+
+
+# Media serving.
+# /video/<path> keeps a bounded LRU of open file descriptors plus their stat/ETag info (revalidated at
+# most every MEDIA_STAT_TTL seconds), answers conditional requests with 304/412, and supports single
+# and multi-range (multipart/byteranges) 206 responses. Full and single-range bodies go through
+# wsgi.file_wrapper so servers that implement it with sendfile(2) (e.g. gunicorn) serve them
+# zero-copy; everything else streams with os.pread from the shared descriptor.
+MEDIA_HANDLE_CACHE_SIZE = max(1, int(os.environ.get('MEDIA_HANDLE_CACHE_SIZE', '64')))
+MEDIA_STAT_TTL = float(os.environ.get('MEDIA_STAT_TTL', '1.0'))
+MEDIA_MAX_RANGES = 16
+MEDIA_READ_CHUNK = 256 * 1024
+
+MEDIA_TYPES = {
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+    '.mov': 'video/quicktime',
+    '.avi': 'video/x-msvideo',
+    '.m4a': 'audio/mp4',
+    '.mp3': 'audio/mpeg',
+    '.opus': 'audio/ogg',
+    '.ogg': 'audio/ogg',
+}
+
+_media_handles = collections.OrderedDict()  # realpath -> entry
+_media_handles_lock = threading.Lock()
+_media_stats = {
+    'handle_hits': 0,
+    'handle_misses': 0,
+    'handle_evictions': 0,
+    'not_modified': 0,
+    'partial': 0,
+    'multipart': 0,
+    'file_wrapper': 0,
+}
+
+def _close_media_entry(entry: dict):
+    """Close an entry's fd once nothing is streaming from it. Caller holds _media_handles_lock."""
+    if entry['refs'] == 0 and entry['fd'] is not None:
+        try:
+            os.close(entry['fd'])
+        except OSError:
+            pass
+        entry['fd'] = None
+
+def _acquire_media(path: str) -> dict:
+    """Get (and pin) a cached fd + stat entry for path, reopening it if the file changed."""
+    now = _now_ts()
+    with _media_handles_lock:
+        entry = _media_handles.get(path)
+        if entry is not None and now - entry['checked_at'] < MEDIA_STAT_TTL:
+            _media_handles.move_to_end(path)
+            entry['refs'] += 1
+            _media_stats['handle_hits'] += 1
+            return entry
+
+    st = os.stat(path)
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    with _media_handles_lock:
+        entry = _media_handles.get(path)
+        if entry is not None and entry['signature'] == signature:
+            entry['checked_at'] = now
+            _media_handles.move_to_end(path)
+            entry['refs'] += 1
+            _media_stats['handle_hits'] += 1
+            return entry
+        if entry is not None:
+            # File was replaced or modified: retire the old descriptor
+            _media_handles.pop(path)
+            entry['evicted'] = True
+            _close_media_entry(entry)
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fst = os.fstat(fd)
+    except OSError:
+        os.close(fd)
+        raise
+    entry = {
+        'path': path,
+        'fd': fd,
+        'signature': (fst.st_ino, fst.st_size, fst.st_mtime_ns),
+        'size': fst.st_size,
+        'mtime': fst.st_mtime,
+        'etag': f'"{fst.st_ino:x}-{fst.st_size:x}-{fst.st_mtime_ns:x}"',
+        'last_modified': http_date(fst.st_mtime),
+        'checked_at': now,
+        'refs': 1,
+        'evicted': False,
+    }
+    with _media_handles_lock:
+        _media_stats['handle_misses'] += 1
+        previous = _media_handles.pop(path, None)
+        if previous is not None:
+            previous['evicted'] = True
+            _close_media_entry(previous)
+        _media_handles[path] = entry
+        while len(_media_handles) > MEDIA_HANDLE_CACHE_SIZE:
+            _, old = _media_handles.popitem(last=False)
+            old['evicted'] = True
+            _close_media_entry(old)
+            _media_stats['handle_evictions'] += 1
+    return entry
+
+def _release_media(entry: dict):
+    with _media_handles_lock:
+        entry['refs'] -= 1
+        if entry['evicted']:
+            _close_media_entry(entry)
+
+def _iter_media_ranges(entry: dict, parts: list):
+    """Stream (prefix_bytes, start, end_inclusive) parts via pread from the shared fd."""
+    for prefix, start, end in parts:
+        if prefix:
+            yield prefix
+        offset = start
+        while offset <= end:
+            chunk = os.pread(entry['fd'], min(MEDIA_READ_CHUNK, end - offset + 1), offset)
+            if not chunk:
+                return
+            yield chunk
+            offset += len(chunk)
+
+def _streamed_media_response(entry: dict, parts: list, **kwargs) -> Response:
+    """pread-backed response; the fd stays pinned until the server closes the response (HEAD included)."""
+    response = Response(_iter_media_ranges(entry, parts), **kwargs)
+    response.call_on_close(lambda: _release_media(entry))
+    return response
+
+class _RangeFile:
+    """File-like view of [start, start+length) that keeps a real fileno() for sendfile."""
+
+    def __init__(self, path: str, start: int, length: int):
+        self._f = open(path, 'rb')
+        self._f.seek(start)
+        self._remaining = length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def close(self):
+        self._f.close()
+
+def _parse_byte_ranges(header: str, size: int) -> list | None:
+    """
+    Parse a Range header into sorted, coalesced [(start, end_inclusive), ...].
+    Returns None when the header should be ignored, [] when nothing is satisfiable.
+    """
+    if not header or not header.strip().lower().startswith('bytes='):
+        return None
+    ranges = []
+    for spec in header.split('=', 1)[1].split(','):
+        spec = spec.strip()
+        if not spec or '-' not in spec:
+            return None
+        first, last = spec.split('-', 1)
+        try:
+            if first == '':
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(0, size - suffix), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and start > end:
+                    # Syntactically invalid spec: ignore the whole header
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MEDIA_MAX_RANGES:
+        return None
+    return merged
+
+# Per-request dirs get a fresh mkdtemp name every time, so the media files directly inside one are never
+# rewritten under the same URL. Everything else under downloads/ can come back with different bytes at the
+# same path (cache entries after an eviction, proxies, scrub sprites, re-exported clips, reused upload ids).
+_IMMUTABLE_MEDIA_DIR_PREFIXES = ('yt-process-', 'yt-download-')
+
+def _is_immutable_media(path: str) -> bool:
+    """Whether `path` may be cached without revalidation; other files are served no-cache with their ETag."""
+    root = _downloads_root()
+    if not path.startswith(root + os.sep):
+        return False
+    parts = os.path.relpath(path, root).split(os.sep)
+    return (
+        len(parts) == 2
+        and parts[0].startswith(_IMMUTABLE_MEDIA_DIR_PREFIXES)
+        and not path.endswith(('.part', '.proxy.mp4'))
+    )
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if weak and candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def _send_media(path: str, content_type: str):
+    """Serve a media file with conditional requests, (multi-)ranges and sendfile when available."""
+    path = os.path.realpath(path)
+    entry = _acquire_media(path)
+    _touch_artifact(path)
+    released = False
+    try:
+        size = entry['size']
+        headers = {
+            'ETag': entry['etag'],
+            'Last-Modified': entry['last_modified'],
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'public, max-age=31536000, immutable' if _is_immutable_media(path) else 'no-cache',
+        }
+
+        if_match = request.headers.get('If-Match')
+        if if_match and not _etag_matches(if_match, entry['etag'], weak=False):
+            return Response(status=412, headers=headers)
+
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = parse_date(request.headers.get('If-Modified-Since'))
+        if (if_none_match and _etag_matches(if_none_match, entry['etag'], weak=True)) or (
+            not if_none_match and if_modified_since and int(entry['mtime']) <= if_modified_since.timestamp()
+        ):
+            with _media_handles_lock:
+                _media_stats['not_modified'] += 1
+            return Response(status=304, headers=headers)
+
+        ranges = _parse_byte_ranges(request.headers.get('Range'), size)
+        if_range = request.headers.get('If-Range')
+        if ranges is not None and if_range:
+            if_range_date = parse_date(if_range)
+            still_valid = (
+                if_range.strip() == entry['etag'] if if_range_date is None
+                else int(entry['mtime']) <= if_range_date.timestamp()
+            )
+            if not still_valid:
+                ranges = None
+
+        if ranges is not None and not ranges:
+            headers['Content-Range'] = f'bytes */{size}'
+            return Response(status=416, headers=headers)
+
+        if ranges and len(ranges) > 1:
+            boundary = uuid.uuid4().hex
+            parts = []
+            length = 0
+            for start, end in ranges:
+                prefix = (
+                    f'--{boundary}\r\nContent-Type: {content_type}\r\n'
+                    f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+                ).encode()
+                if parts:
+                    prefix = b'\r\n' + prefix
+                parts.append((prefix, start, end))
+                length += len(prefix) + (end - start + 1)
+            closing = f'\r\n--{boundary}--\r\n'.encode()
+            parts.append((closing, 0, -1))
+            length += len(closing)
+            headers['Content-Length'] = str(length)
+            with _media_handles_lock:
+                _media_stats['multipart'] += 1
+            released = True
+            return _streamed_media_response(
+                entry,
+                parts,
+                status=206,
+                headers=headers,
+                mimetype=f'multipart/byteranges; boundary={boundary}',
+            )
 
-        update_job_fields(job_id, {
-            'video': {
-                'title': video_title,
-                'duration': duration,
-                'thumbnail': thumbnail,
-                'path': video_file,
-            }
-        })
-        
-        # Step 2: Generate clips
-        update_job_status(job_id, 'processing', 40, 'Transcribing video with ClipsAI...')
-        transcriber = Transcriber()
-        transcription = transcriber.transcribe(audio_file_path=video_file)
-        
-        update_job_status(job_id, 'processing', 70, 'Finding clips with ClipsAI...')
-        clipfinder = ClipFinder()
-        clips = clipfinder.find_clips(transcription=transcription)
-        
-        # Convert clips to JSON format and filter by duration
-        clips_data = []
-        transcription_text = _extract_transcription_text(transcription)
-        # Get max_duration from job settings (default 30 seconds)
-        with jobs_lock:
-            max_clip_duration = jobs.get(job_id, {}).get('max_duration', max_duration)
-        
-        clip_index = 0
-        for clip in clips:
-            clip_duration = float(clip.end_time) - float(clip.start_time)
-            
-            # Only include clips that are less than 30 seconds
-            if clip_duration <= max_clip_duration:
-                start_char = getattr(clip, 'start_char', 0)
-                end_char = getattr(clip, 'end_char', len(transcription_text))
-                
-                clip_text = transcription_text[start_char:end_char] if transcription_text else f"Clip {clip_index + 1}"
-                clip_title = clip_text.strip()[:100] if clip_text.strip() else f"Clip {clip_index + 1}"
-                
-                clips_data.append({
-                    'id': f'{video_id}-clip-{clip_index}',
-                    'object': 'clip',
-                    'created': int(os.path.getmtime(video_file)),
-                    'start_time': float(clip.start_time),
-                    'end_time': float(clip.end_time),
-                    'start_char': int(start_char),
-                    'end_char': int(end_char),
-                    'video_id': video_id,
-                    'favorited': False,
-                    'deleted': False,
-                    'scores': {'embedding_norm': 0},
-                    'title': clip_title,
-                })
-                clip_index += 1
-        
-        # Get transcription data
-        words_data = []
-        if hasattr(transcription, 'words'):
-            for word in transcription.words:
-                words_data.append({
-                    'start_char': int(getattr(word, 'start_char', 0)),
-                    'end_char': int(getattr(word, 'end_char', 0)),
-                    'start_time': float(getattr(word, 'start_time', 0)),
-                    'end_time': float(getattr(word, 'end_time', 0)),
-                    'text': _get_word_text(word),
-                })
-        
-        update_job_status(job_id, 'processing', 95, 'Finalizing...')
-        
-        result = {
-            'video': {
-                'id': video_id,
-                'object': 'video',
-                'clips': clips_data,
-                'created': int(os.path.getmtime(video_file)),
-                'metadata': {
-                    'duration': duration or 0,
-                    'file_size': file_size,
-                    'mime_type': f'video/{os.path.splitext(video_file)[1][1:]}',
-                },
-                'source': video_file,
-                'status': 'complete',
-                'title': video_title,
-            },
-            'transcript': {
-                'id': f'{video_id}-transcript',
-                'object': 'transcript',
-                'created': int(os.path.getmtime(video_file)),
-                'words': words_data,
-                'transcription': transcription_text
-            },
-            'temp_video_path': video_file,
-            'temp_dir': download_dir,
+        start, end = ranges[0] if ranges else (0, size - 1)
+        status = 206 if ranges else 200
+        if ranges:
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+            with _media_handles_lock:
+                _media_stats['partial'] += 1
+        headers['Content-Length'] = str(max(0, end - start + 1))
+
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None and not getattr(file_wrapper, '__module__', '').startswith('werkzeug'):
+            # The server's own file_wrapper can use sendfile(2); it needs a private file position,
+            # so this path opens its own handle (stat/ETag still come from the cache)
+            with _media_handles_lock:
+                _media_stats['file_wrapper'] += 1
+            body = file_wrapper(_RangeFile(path, start, end - start + 1), MEDIA_READ_CHUNK)
+            return Response(body, status=status, headers=headers, mimetype=content_type, direct_passthrough=True)
+        released = True
+        return _streamed_media_response(entry, [(b'', start, end)], status=status, headers=headers, mimetype=content_type)
+    finally:
+        if not released:
+            _release_media(entry)
+
+def _media_snapshot() -> dict:
+    with _media_handles_lock:
+        return {
+            **_media_stats,
+            'open_handles': sum(1 for e in _media_handles.values() if e['fd'] is not None),
         }
-        
-        with jobs_lock:
-            jobs[job_id]['result'] = result
-        update_job_status(job_id, 'completed', 100, 'Processing complete!')
-        
-    except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"Error processing YouTube video: {error_trace}", file=sys.stderr)
-        
-        # Cleanup on error
-        if os.path.exists(download_dir):
-            shutil.rmtree(download_dir, ignore_errors=True)
-        
-        update_job_status(job_id, 'failed', 0, f'Error: {str(e)}', str(e))
 
 
 @app.route('/video/<path:filepath>', methods=['GET'])
@@ -571,16 +4680,9 @@ def serve_video(filepath):
     
     # Determine MIME type
     ext = os.path.splitext(filepath)[1].lower()
-    mime_types = {
-        '.mp4': 'video/mp4',
-        '.webm': 'video/webm',
-        '.mkv': 'video/x-matroska',
-        '.mov': 'video/quicktime',
-        '.avi': 'video/x-msvideo',
-    }
-    content_type = mime_types.get(ext, 'video/mp4')
+    content_type = MEDIA_TYPES.get(ext, 'video/mp4')
     
-    return send_file(filepath, mimetype=content_type)
+    return _send_media(filepath, content_type)
 
 
 @app.route('/youtube/download', methods=['POST'])
@@ -599,44 +4701,27 @@ def download_youtube():
     if 'youtube.com' not in url and 'youtu.be' not in url:
         return jsonify({'error': 'Invalid YouTube URL'}), 400
     
-    temp_dir = tempfile.mkdtemp(prefix='yt-download-')
+    downloads_root = _downloads_root()
+    os.makedirs(downloads_root, exist_ok=True)
+    # Same filesystem as the download cache, so the result can be a hardlink instead of a copy
+    temp_dir = tempfile.mkdtemp(prefix='yt-download-', dir=downloads_root)
     
     try:
         # Get video info first
         ydl_opts_info = {
             'quiet': True,
             'no_warnings': True,
+            'format': YOUTUBE_FORMAT,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts_info) as ydl:
+        with _yt_dlp().YoutubeDL(ydl_opts_info) as ydl:
             info = ydl.extract_info(url, download=False)
             video_title = info.get('title', 'Downloaded Video')
             duration = info.get('duration', 0)
         
-        # Download video
-        safe_title = "".join(c for c in video_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title[:100]  # Limit length
-        
-        ydl_opts = {
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-            'outtmpl': os.path.join(temp_dir, f'{safe_title}.%(ext)s'),
-            'quiet': False,
-            'no_warnings': False,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        
-        # Find downloaded file
-        files = os.listdir(temp_dir)
-        video_file = None
-        for f in files:
-            if f.endswith(('.mp4', '.webm', '.mkv')):
-                video_file = os.path.join(temp_dir, f)
-                break
-        
-        if not video_file:
-            return jsonify({'error': 'Failed to download video file'}), 500
+        # Download video (or reuse a cached/in-flight download of the same video)
+        cached_file = _download_youtube_cached(url, info)
+        video_file = _materialize_download(cached_file, temp_dir)
         
         file_size = os.path.getsize(video_file)
         
@@ -658,6 +4743,271 @@ def download_youtube():
         return jsonify({'error': str(e)}), 500
 
 
+# Resumable uploads.
+# POST /uploads creates an upload, PATCH /uploads/<id> appends a chunk at Upload-Offset (streamed
+# straight to disk and hashed as it's written), GET reports the current offset so clients can resume,
+# and POST /uploads/<id>/finalize seals it. /clips/generate accepts the resulting upload_id.
+UPLOAD_MAX_BYTES = int(float(os.environ.get('UPLOAD_MAX_MB', '20480')) * 1024 * 1024)
+UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024  # suggested client chunk size
+# Finalized uploads are stored as data<ext>; the client's filename is only kept (sanitized) in meta.json
+UPLOAD_EXTENSIONS = MEDIA_EXTENSIONS + ('.mov', '.m4v', '.avi', '.wav')
+# Unfinished uploads nobody has written to for this long are removed (0 = keep forever)
+UPLOAD_EXPIRE_SECONDS = float(os.environ.get('UPLOAD_EXPIRE_HOURS', '24')) * 3600
+
+# upload_id -> {'lock', 'hasher', 'hashed_bytes'}; hashers are rebuilt from disk after a restart
+_upload_states = {}
+_upload_states_lock = threading.Lock()
+
+def _uploads_root() -> str:
+    return os.path.join(_downloads_root(), 'uploads')
+
+def _upload_dir(upload_id: str) -> str | None:
+    try:
+        upload_id = uuid.UUID(upload_id).hex
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return os.path.join(_uploads_root(), upload_id)
+
+def _read_upload_meta(upload_id: str) -> dict | None:
+    upload_dir = _upload_dir(upload_id)
+    if not upload_dir:
+        return None
+    try:
+        with open(os.path.join(upload_dir, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_upload_meta(meta: dict):
+    upload_dir = _upload_dir(meta['upload_id'])
+    tmp = os.path.join(upload_dir, f'meta.json.{uuid.uuid4().hex}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(upload_dir, 'meta.json'))
+
+def _upload_state(upload_id: str) -> dict:
+    with _upload_states_lock:
+        return _upload_states.setdefault(upload_id, {
+            'lock': threading.Lock(),
+            'hasher': None,
+            'hashed_bytes': 0,
+        })
+
+def _upload_response(meta: dict, status: int = 200):
+    payload = {k: v for k, v in meta.items() if k != 'part_path'}
+    payload['chunk_size'] = UPLOAD_CHUNK_BYTES
+    return jsonify(payload), status, {'Upload-Offset': str(meta['offset'])}
+
+def _expire_abandoned_uploads():
+    """Remove unfinished uploads (and their in-memory hash state) idle for longer than UPLOAD_EXPIRE_SECONDS."""
+    if UPLOAD_EXPIRE_SECONDS <= 0:
+        return
+    try:
+        names = os.listdir(_uploads_root())
+    except OSError:
+        return
+    for name in names:
+        meta = _read_upload_meta(name)
+        if not meta or meta.get('status') != 'uploading':
+            continue
+        upload_dir = _upload_dir(meta['upload_id'])
+        state = _upload_state(meta['upload_id'])
+        if not state['lock'].acquire(blocking=False):
+            continue  # a chunk is being written right now
+        try:
+            # Every chunk rewrites meta.json, so its mtime is the last activity
+            try:
+                idle = _now_ts() - os.path.getmtime(os.path.join(upload_dir, 'meta.json'))
+            except OSError:
+                continue
+            if idle < UPLOAD_EXPIRE_SECONDS:
+                continue
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            with _upload_states_lock:
+                _upload_states.pop(meta['upload_id'], None)
+        finally:
+            state['lock'].release()
+
+def _resolve_upload(upload_id: str) -> dict | None:
+    """Metadata of a finalized upload (None if unknown or not finalized)."""
+    meta = _read_upload_meta(upload_id)
+    if not meta or meta.get('status') != 'complete' or not os.path.isfile(meta.get('path') or ''):
+        return None
+    return meta
+
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable upload"""
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(str(data.get('filename') or '')) or 'video.mp4'
+    size = data.get('size')
+    if size is not None:
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'size must be an integer'}), 400
+        if size < 0 or size > UPLOAD_MAX_BYTES:
+            return jsonify({'error': f'size must be between 0 and {UPLOAD_MAX_BYTES} bytes'}), 413
+
+    _expire_abandoned_uploads()
+    upload_id = uuid.uuid4().hex
+    upload_dir = _upload_dir(upload_id)
+    os.makedirs(upload_dir, exist_ok=True)
+    part_path = os.path.join(upload_dir, 'data.part')
+    open(part_path, 'wb').close()
+    meta = {
+        'upload_id': upload_id,
+        'filename': filename,
+        'size': size,
+        'offset': 0,
+        'status': 'uploading',
+        'sha256': None,
+        'path': None,
+        'part_path': part_path,
+        'created_at': datetime.now().isoformat(),
+        'updated_at': datetime.now().isoformat(),
+    }
+    _write_upload_meta(meta)
+    return _upload_response(meta, 201)
+
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Upload status; clients resume from the returned offset"""
+    meta = _read_upload_meta(upload_id)
+    if not meta:
+        return jsonify({'error': 'Upload not found'}), 404
+    return _upload_response(meta)
+
+
+@app.route('/uploads/<upload_id>', methods=['PATCH'])
+def append_upload(upload_id):
+    """Append the request body at Upload-Offset"""
+    meta = _read_upload_meta(upload_id)
+    if not meta:
+        return jsonify({'error': 'Upload not found'}), 404
+    if meta['status'] != 'uploading':
+        return jsonify({'error': 'Upload already finalized'}), 409
+    offset_raw = request.headers.get('Upload-Offset', request.args.get('offset'))
+    try:
+        offset = int(offset_raw)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+
+    state = _upload_state(meta['upload_id'])
+    if not state['lock'].acquire(blocking=False):
+        return jsonify({'error': 'Another chunk is being written to this upload'}), 409
+    try:
+        # Re-read under the lock: a finalize or expiry may have run since the check above
+        meta = _read_upload_meta(upload_id)
+        if not meta:
+            return jsonify({'error': 'Upload not found'}), 404
+        if meta['status'] != 'uploading':
+            return jsonify({'error': 'Upload already finalized'}), 409
+        part_path = meta['part_path']
+        current = os.path.getsize(part_path)
+        if offset != current:
+            # Client is out of sync (e.g. a chunk was lost); tell it where to resume
+            meta['offset'] = current
+            return _upload_response(meta, 409)
+
+        if state['hasher'] is None or state['hashed_bytes'] != current:
+            # First chunk after a restart: rebuild the running hash from what's on disk
+            state['hasher'] = hashlib.sha256()
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    state['hasher'].update(chunk)
+            state['hashed_bytes'] = current
+
+        limit = meta['size'] if meta.get('size') is not None else UPLOAD_MAX_BYTES
+        written = 0
+        with open(part_path, 'ab') as f:
+            while True:
+                chunk = request.stream.read(1 << 20)
+                if not chunk:
+                    break
+                if current + written + len(chunk) > limit:
+                    f.truncate(current + written)
+                    state['hashed_bytes'] = current + written
+                    meta['offset'] = current + written
+                    meta['updated_at'] = datetime.now().isoformat()
+                    _write_upload_meta(meta)
+                    return jsonify({'error': f'Upload exceeds {limit} bytes', 'offset': meta['offset']}), 413
+                f.write(chunk)
+                state['hasher'].update(chunk)
+                written += len(chunk)
+        state['hashed_bytes'] = current + written
+        meta['offset'] = current + written
+        meta['updated_at'] = datetime.now().isoformat()
+        _write_upload_meta(meta)
+        return _upload_response(meta)
+    finally:
+        state['lock'].release()
+
+
+@app.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Seal an upload and return its path and sha256"""
+    meta = _read_upload_meta(upload_id)
+    if not meta:
+        return jsonify({'error': 'Upload not found'}), 404
+    if meta['status'] == 'complete':
+        return _upload_response(meta)
+
+    data = request.get_json(silent=True) or {}
+    state = _upload_state(meta['upload_id'])
+    with state['lock']:
+        # Re-read under the lock: a concurrent finalize may have sealed it (and moved data.part) meanwhile
+        meta = _read_upload_meta(upload_id)
+        if not meta:
+            return jsonify({'error': 'Upload not found'}), 404
+        if meta['status'] == 'complete':
+            return _upload_response(meta)
+        part_path = meta['part_path']
+        current = os.path.getsize(part_path)
+        if meta.get('size') is not None and current != meta['size']:
+            meta['offset'] = current
+            return jsonify({'error': f"Upload incomplete: {current}/{meta['size']} bytes", 'offset': current}), 409
+        if state['hasher'] is None or state['hashed_bytes'] != current:
+            state['hasher'] = hashlib.sha256()
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    state['hasher'].update(chunk)
+        digest = state['hasher'].hexdigest()
+        expected = data.get('sha256')
+        if expected and expected.lower() != digest:
+            return jsonify({'error': 'sha256 mismatch', 'sha256': digest}), 422
+
+        ext = os.path.splitext(meta['filename'])[1].lower()
+        final_path = os.path.join(_upload_dir(meta['upload_id']), 'data' + (ext if ext in UPLOAD_EXTENSIONS else '.mp4'))
+        os.replace(part_path, final_path)
+        meta.update({
+            'status': 'complete',
+            'size': current,
+            'offset': current,
+            'sha256': digest,
+            'path': final_path,
+            'updated_at': datetime.now().isoformat(),
+        })
+        _write_upload_meta(meta)
+    with _upload_states_lock:
+        _upload_states.pop(meta['upload_id'], None)
+    return _upload_response(meta)
+
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Abort an upload (or drop a finalized one)"""
+    upload_dir = _upload_dir(upload_id)
+    if not upload_dir or not os.path.isdir(upload_dir):
+        return jsonify({'error': 'Upload not found'}), 404
+    shutil.rmtree(upload_dir, ignore_errors=True)
+    with _upload_states_lock:
+        _upload_states.pop(uuid.UUID(upload_id).hex, None)
+    return jsonify({'upload_id': upload_id, 'deleted': True})
+
+
 @app.route('/clips/generate', methods=['POST'])
 def generate_clips():
     """Generate clips from video file using ClipsAI"""
@@ -667,39 +5017,45 @@ def generate_clips():
             'suggestion': 'Install with: pip install clipsai'
         }), 500
     
-    if 'video' not in request.files:
-        return jsonify({'error': 'Video file is required'}), 400
+    # Either a multipart 'video' file or the upload_id of a finalized resumable upload
+    params = request.form if request.form else (request.get_json(silent=True) or {})
+    upload_id = params.get('upload_id')
+    if 'video' not in request.files and not upload_id:
+        return jsonify({'error': 'Video file or upload_id is required'}), 400
     
-    video_file = request.files['video']
-    video_id = request.form.get('videoId', f'video-{os.urandom(8).hex()}')
-    video_title = request.form.get('title', 'Uploaded Video')
+    video_id = params.get('videoId', f'video-{os.urandom(8).hex()}')
+    video_title = params.get('title', 'Uploaded Video')
     
-    temp_dir = tempfile.mkdtemp(prefix='clips-generate-')
-    video_path = os.path.join(temp_dir, video_file.filename or 'video.mp4')
+    temp_dir = None
+    if 'video' in request.files:
+        video_file = request.files['video']
+        temp_dir = tempfile.mkdtemp(prefix='clips-generate-')
+        video_path = os.path.join(temp_dir, video_file.filename or 'video.mp4')
+    else:
+        upload = _resolve_upload(upload_id)
+        if not upload:
+            return jsonify({'error': 'Upload not found or not finalized'}), 404
+        video_path = upload['path']
+        _acquire_artifact(video_path)
     
     try:
-        # Save uploaded video
-        video_file.save(video_path)
+        # Save uploaded video (resumable uploads are already on disk)
+        if temp_dir:
+            video_file.save(video_path)
         
-        # Transcribe the video
+        # Transcribe the video and find clips
         print(f"Starting transcription for {video_path}...", file=sys.stderr)
-        transcriber = Transcriber()
-        transcription = transcriber.transcribe(audio_file_path=video_path)
-        print("Transcription complete", file=sys.stderr)
-        
-        # Find clips
-        print("Finding clips...", file=sys.stderr)
-        clipfinder = ClipFinder()
-        clips = clipfinder.find_clips(transcription=transcription)
+        words_data, transcription_text, clips = _analyze_media(
+            video_path, on_stage=lambda _stage: print("Transcription complete, finding clips...", file=sys.stderr)
+        )
         print(f"Found {len(clips)} clips", file=sys.stderr)
         
         # Convert clips to JSON format
         clips_data = []
-        transcription_text = _extract_transcription_text(transcription)
         
         for i, clip in enumerate(clips):
-            start_char = getattr(clip, 'start_char', 0)
-            end_char = getattr(clip, 'end_char', len(transcription_text))
+            start_char = clip['start_char']
+            end_char = clip['end_char']
             
             # Generate title from transcription snippet
             clip_text = transcription_text[start_char:end_char] if transcription_text else f"Clip {i + 1}"
@@ -709,8 +5065,8 @@ def generate_clips():
                 'id': f'{video_id}-clip-{i}',
                 'object': 'clip',
                 'created': int(os.path.getmtime(video_path)),
-                'start_time': float(clip.start_time),
-                'end_time': float(clip.end_time),
+                'start_time': clip['start_time'],
+                'end_time': clip['end_time'],
                 'start_char': int(start_char),
                 'end_char': int(end_char),
                 'video_id': video_id,
@@ -720,35 +5076,14 @@ def generate_clips():
                 'title': clip_title,
             })
         
-        # Get transcription data
-        words_data = []
-        if hasattr(transcription, 'words'):
-            for word in transcription.words:
-                words_data.append({
-                    'start_char': int(getattr(word, 'start_char', 0)),
-                    'end_char': int(getattr(word, 'end_char', 0)),
-                    'start_time': float(getattr(word, 'start_time', 0)),
-                    'end_time': float(getattr(word, 'end_time', 0)),
-                    'text': _get_word_text(word),
-                })
-        
-        # Get video duration
+        # Get video duration (the probe is cached, and export reuses its keyframe index)
         try:
-            import subprocess
-            result = subprocess.run(
-                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', video_path],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                probe_data = json.loads(result.stdout)
-                duration = float(probe_data.get('format', {}).get('duration', 0))
-            else:
-                duration = 0
-        except:
+            probe = _probe_media(video_path)
+            duration = float(probe['duration']) if probe else 0
+        except Exception:
             duration = 0
         
-        return jsonify({
+        return _result_response({
             'clips': clips_data,
             'transcript': {
                 'id': f'{video_id}-transcript',
@@ -775,9 +5110,59 @@ def generate_clips():
     
     finally:
         # Cleanup temp directory
-        if os.path.exists(temp_dir):
+        if temp_dir and os.path.exists(temp_dir):
             shutil.rmtree(temp_dir, ignore_errors=True)
+        elif not temp_dir:
+            _release_artifact(video_path)
+
+
+def _youtube_job_options(data: dict, default_priority: int = 0) -> dict:
+    """Per-job options of a /youtube/process (or batch) request body."""
+    try:
+        # Higher runs first; clamp so clients can't starve everyone else
+        priority = max(-10, min(10, int(data.get('priority', default_priority))))
+    except Exception:
+        priority = default_priority
+    try:
+        # Bytes/s; can only lower DOWNLOAD_RATE_LIMIT
+        rate_limit = max(0, int(float(data.get('rate_limit') or 0))) or None
+    except (TypeError, ValueError):
+        rate_limit = None
+    return {
+        'rate_limit': rate_limit,
+        'max_duration': data.get('max_duration', 30.0),  # Default 30 seconds
+        'audio_first': bool(data.get('audio_first', AUDIO_FIRST_PIPELINE)),
+        'preview_proxy': bool(data.get('preview_proxy', PREVIEW_PROXIES)),
+        'priority': priority,
+    }
 
+def _create_youtube_job(url: str, options: dict, job_id: str | None = None, batch_id: str | None = None) -> str:
+    """Create a queued /youtube/process job and hand it to the download stage."""
+    job_id = job_id or str(uuid.uuid4())
+    with jobs_lock:
+        jobs[job_id] = {
+            'status': 'queued',
+            'progress': 0,
+            'message': 'Job queued, waiting for a download worker...',
+            'created_at': datetime.now().isoformat(),
+            'created_at_ts': _now_ts(),
+            'updated_at': datetime.now().isoformat(),
+            'max_duration': options['max_duration'],  # Store max_duration for this job
+            'url': url,
+            'priority': options['priority'],
+            'audio_first': options['audio_first'],
+            'preview_proxy': options['preview_proxy'],
+            'rate_limit': options.get('rate_limit'),
+            'queue_wait_seconds': 0.0,
+            'pending_branches': ['analysis', 'video'] if options['audio_first'] else ['analysis'],
+        }
+        if batch_id:
+            jobs[job_id]['batch_id'] = batch_id
+        _touch_job(job_id, jobs[job_id])
+    _persist_job(job_id)
+    
+    _enqueue_stage('download', job_id, options['priority'])
+    return job_id
 
 @app.route('/youtube/process', methods=['POST'])
 def process_youtube():
@@ -793,7 +5178,7 @@ def process_youtube():
     
     data = request.get_json()
     url = data.get('url')
-    max_duration = data.get('max_duration', 30.0)  # Default 30 seconds
+    options = _youtube_job_options(data)
     
     if not url:
         return jsonify({'error': 'YouTube URL is required'}), 400
@@ -802,29 +5187,383 @@ def process_youtube():
     if 'youtube.com' not in url and 'youtu.be' not in url:
         return jsonify({'error': 'Invalid YouTube URL'}), 400
     
-    # Create job
-    job_id = str(uuid.uuid4())
+    with _admission_lock:
+        if _queued_job_count() >= MAX_QUEUE_DEPTH:
+            retry_after = _retry_after_seconds()
+            return jsonify({
+                'error': 'Too many queued jobs, try again later',
+                'retry_after': retry_after,
+            }), 429, {'Retry-After': str(retry_after)}
+        
+        job_id = _create_youtube_job(url, options)
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'queue_position': _queue_position(job_id, 'download'),
+        'message': 'Processing started. Use /jobs/{job_id}/status to check progress.'
+    })
+
+
+# Batch / playlist ingest.
+# POST /batches takes a list of URLs or a playlist/channel URL (expanded with yt-dlp's flat
+# extraction, no per-video requests) and runs each entry as a regular /youtube/process job tagged
+# with the batch id. At most `concurrency` children are in flight; each child reaching a terminal
+# status starts the next one (_write_job_status -> _fill_batch), so there is no feeder thread.
+# Children skip the MAX_QUEUE_DEPTH admission check: the batch concurrency is what bounds them.
+# GET /batches/<id> aggregates the children's progress and ETA; batches are kept in the job store.
+# 0: one child per download + transcribe worker, which keeps both pipeline stages busy
+BATCH_CONCURRENCY = max(0, int(os.environ.get('BATCH_CONCURRENCY', '0')))
+BATCH_MAX_ITEMS = max(1, int(os.environ.get('BATCH_MAX_ITEMS', '500')))
+# Batch children run below interactive jobs unless the request says otherwise
+BATCH_DEFAULT_PRIORITY = -1
+
+batches = {}
+_batches_lock = threading.Lock()
+
+def _default_batch_concurrency() -> int:
+    return BATCH_CONCURRENCY or DOWNLOAD_WORKERS + TRANSCRIBE_WORKERS
+
+def _child_url(entry: dict) -> str | None:
+    url = entry.get('webpage_url') or entry.get('url')
+    if url and url.startswith(('http://', 'https://')):
+        return url
+    if entry.get('id'):
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    return None
+
+def _expand_playlist(url: str, limit: int, depth: int = 0) -> tuple:
+    """(title, [{'url', 'title'}]) of a playlist or channel, without resolving each video."""
+    opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+        'skip_download': True,
+        'playlistend': limit,
+    }
+    with _yt_dlp().YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    if info.get('_type') not in ('playlist', 'multi_video'):
+        return info.get('title'), [{'url': _child_url(info) or url, 'title': info.get('title')}]
+    items = []
+    for entry in info.get('entries') or []:
+        if entry is None or len(items) >= limit:
+            continue
+        # A channel's flat entries are its tabs (Videos, Shorts, ...): expand those one level down
+        nested = entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab'
+        if nested and depth < 1:
+            nested_url = _child_url(entry)
+            if nested_url:
+                items.extend(_expand_playlist(nested_url, limit - len(items), depth + 1)[1])
+            continue
+        child_url = _child_url(entry)
+        if child_url:
+            items.append({'url': child_url, 'title': entry.get('title')})
+    return info.get('title'), items
+
+def _persist_batch(batch_id):
+    """Write the batch's current state to the store. Must not be called while holding _batches_lock."""
+    if not JOB_STORE_PATH:
+        return
+    with _job_store_lock:
+        with _batches_lock:
+            batch = batches.get(batch_id)
+            if batch is None:
+                return
+            data = json.dumps(batch)
+            created = batch['created_at_ts']
+        try:
+            _job_store_conn().execute(
+                'INSERT OR REPLACE INTO batches (batch_id, created_at_ts, data) VALUES (?, ?, ?)',
+                (batch_id, created, data),
+            )
+        except sqlite3.Error as e:
+            print(f"Failed to persist batch {batch_id}: {e}", file=sys.stderr)
+
+def _child_finished(job_id) -> bool:
+    snapshot = _job_snapshot(job_id)
+    # Not created yet (another _fill_batch call is creating it): counts as running
+    return snapshot is not None and snapshot['status'] in ('completed', 'failed')
+
+def _fill_batch(batch_id):
+    """Start the batch's next children while fewer than `concurrency` are running."""
+    with _batches_lock:
+        batch = batches.get(batch_id)
+        if batch is None or batch['status'] != 'running':
+            return
+        items = batch['items']
+        running = sum(1 for item in items[:batch['submitted']] if not _child_finished(item['job_id']))
+        to_start = []
+        while running < batch['concurrency'] and batch['submitted'] < len(items):
+            item = items[batch['submitted']]
+            item['job_id'] = str(uuid.uuid4())
+            batch['submitted'] += 1
+            to_start.append(item)
+            running += 1
+        if running == 0 and batch['submitted'] == len(items):
+            batch['status'] = 'completed'
+            batch['finished_at_ts'] = _now_ts()
+        options = batch['options']
+    for item in to_start:
+        _create_youtube_job(item['url'], options, job_id=item['job_id'], batch_id=batch_id)
+    _persist_batch(batch_id)
+
+def _start_batch(batch_id, items: list):
+    with _batches_lock:
+        batch = batches[batch_id]
+        batch['items'] = [{'url': item['url'], 'title': item.get('title'), 'job_id': None} for item in items]
+        batch['status'] = 'running'
+        batch['started_at_ts'] = _now_ts()
+    _fill_batch(batch_id)
+
+def _expand_batch(batch_id, url: str, limit: int):
+    """Background: flat-extract the playlist, then start the batch."""
+    try:
+        title, items = _expand_playlist(url, limit)
+    except Exception as e:
+        print(f"Batch {batch_id}: failed to expand {url}: {e}", file=sys.stderr)
+        with _batches_lock:
+            batches[batch_id].update(status='failed', error=str(e), finished_at_ts=_now_ts())
+        _persist_batch(batch_id)
+        return
+    # Playlists can list the same video twice
+    seen = set()
+    items = [item for item in items if not (item['url'] in seen or seen.add(item['url']))]
+    with _batches_lock:
+        batches[batch_id]['title'] = title
+    if not items:
+        with _batches_lock:
+            batches[batch_id].update(status='failed', error='Playlist has no videos', finished_at_ts=_now_ts())
+        _persist_batch(batch_id)
+        return
+    _start_batch(batch_id, items)
+
+def _batch_child_result_summary(result: dict | None) -> dict | None:
+    if not result:
+        return None
+    video = result.get('video') or {}
+    return {
+        'video_id': video.get('id'),
+        'title': video.get('title'),
+        'duration': video.get('duration'),
+        'clip_count': len(video.get('clips') or []),
+        'temp_video_path': result.get('temp_video_path'),
+        'proxy_video_path': result.get('proxy_video_path'),
+    }
+
+def _batch_copy(batch_id):
+    """Copy of a batch to build payloads from outside _batches_lock (None if unknown)."""
+    with _batches_lock:
+        batch = batches.get(batch_id)
+        if batch is None:
+            return None
+        return dict(batch, items=[dict(item) for item in batch['items']])
+
+def _batch_payload(batch_id, batch: dict, include_children: bool = True) -> dict:
+    """Aggregated progress/ETA of a batch (and each child's status and result summary)."""
+    items = batch['items']
+    counts = collections.Counter()
+    progress_total = 0.0
+    children = []
     with jobs_lock:
-        jobs[job_id] = {
-            'status': 'queued',
-            'progress': 0,
-            'message': 'Job queued, starting processing...',
+        results = {
+            item['job_id']: (jobs.get(item['job_id']) or {}).get('result')
+            for item in items
+            if include_children and item.get('job_id')
+        }
+    snapshots = {item['job_id']: _job_snapshot(item['job_id']) for item in items if item.get('job_id')}
+    # Children run by another web process: one store query for all of them
+    snapshots.update(_stored_jobs(job_id for job_id, snapshot in snapshots.items() if snapshot is None))
+    for item in items:
+        job_id = item.get('job_id')
+        snapshot = snapshots.get(job_id) if job_id else None
+        if snapshot is None:
+            status, progress = ('pending' if job_id is None else 'queued'), 0
+        else:
+            status = snapshot['status']
+            progress = 100 if status in ('completed', 'failed') else snapshot.get('progress') or 0
+        counts[status] += 1
+        progress_total += progress
+        if include_children:
+            children.append({
+                'url': item['url'],
+                'title': item.get('title'),
+                'job_id': job_id,
+                'status': status,
+                'progress': progress,
+                'message': snapshot.get('message') if snapshot else None,
+                'error': snapshot.get('error') if snapshot else None,
+                'result': _batch_child_result_summary(results.get(job_id)) if status == 'completed' else None,
+            })
+    progress = progress_total / len(items) if items else 0.0
+    eta = None
+    started = batch.get('started_at_ts')
+    if started and 0 < progress < 100:
+        elapsed = (batch.get('finished_at_ts') or _now_ts()) - started
+        # Same linear estimate as _job_eta_seconds, over the whole batch
+        eta = max(0.0, elapsed / progress * (100.0 - progress))
+    payload = {
+        'batch_id': batch_id,
+        'status': batch['status'],
+        'error': batch.get('error'),
+        'source': batch.get('source'),
+        'title': batch.get('title'),
+        'created_at': batch['created_at'],
+        'concurrency': batch['concurrency'],
+        'total': len(items),
+        'counts': dict(counts),
+        'progress': round(progress, 1),
+        'eta_seconds': eta,
+        'elapsed_seconds': ((batch.get('finished_at_ts') or _now_ts()) - started) if started else None,
+    }
+    if include_children:
+        payload['children'] = children
+    return payload
+
+def _restore_batches():
+    """Reload batches from the store; unfinished ones carry on submitting children."""
+    with _job_store_lock:
+        try:
+            rows = _job_store_conn().execute('SELECT batch_id, data FROM batches ORDER BY created_at_ts').fetchall()
+        except sqlite3.Error as e:
+            print(f"Failed to load batches from {JOB_STORE_PATH}: {e}", file=sys.stderr)
+            return
+    for batch_id, data in rows:
+        batch = json.loads(data)
+        with _batches_lock:
+            batches[batch_id] = batch
+        if batch['status'] == 'expanding':
+            threading.Thread(target=_expand_batch, args=(batch_id, batch['source'], batch['max_items']), daemon=True).start()
+        elif batch['status'] == 'running':
+            # Children handed out right before the restart but never created: create them now
+            with jobs_lock:
+                lost = [item for item in batch['items'][:batch['submitted']] if item['job_id'] not in jobs]
+            for item in lost:
+                _create_youtube_job(item['url'], batch['options'], job_id=item['job_id'], batch_id=batch_id)
+            _fill_batch(batch_id)
+
+
+@app.route('/batches', methods=['POST'])
+def create_batch():
+    """
+    Process many videos as one batch: {"urls": [...]} or {"url": "<playlist or channel>"}, plus the
+    /youtube/process options and "concurrency". Returns the batch id immediately (202).
+    """
+    if not YT_DLP_AVAILABLE:
+        return jsonify({'error': 'yt-dlp not installed'}), 500
+    
+    if not CLIPSAI_AVAILABLE:
+        return jsonify({
+            'error': 'ClipsAI not installed',
+            'suggestion': 'Install with: pip install clipsai'
+        }), 500
+    
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls')
+    source = data.get('url')
+    if bool(urls) == bool(source):
+        return jsonify({'error': 'Send either "urls" (a list) or "url" (a playlist or channel)'}), 400
+    if urls is not None and (not isinstance(urls, list) or not all(isinstance(u, str) for u in urls)):
+        return jsonify({'error': '"urls" must be a list of URLs'}), 400
+    for u in urls or [source]:
+        if 'youtube.com' not in u and 'youtu.be' not in u:
+            return jsonify({'error': f'Invalid YouTube URL: {u}'}), 400
+    try:
+        max_items = max(1, min(BATCH_MAX_ITEMS, int(data.get('max_items', BATCH_MAX_ITEMS))))
+        concurrency = max(1, int(data.get('concurrency') or _default_batch_concurrency()))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_items and concurrency must be integers'}), 400
+    if urls and len(urls) > max_items:
+        return jsonify({'error': f'At most {max_items} URLs per batch'}), 400
+    
+    batch_id = str(uuid.uuid4())
+    with _batches_lock:
+        batches[batch_id] = {
+            'status': 'expanding' if source else 'running',
+            'source': source,
+            'title': None,
+            'error': None,
             'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
-            'max_duration': max_duration,  # Store max_duration for this job
+            'created_at_ts': _now_ts(),
+            'started_at_ts': None,
+            'finished_at_ts': None,
+            'options': _youtube_job_options(data, default_priority=BATCH_DEFAULT_PRIORITY),
+            'concurrency': concurrency,
+            'max_items': max_items,
+            'items': [],
+            'submitted': 0,
         }
+    _persist_batch(batch_id)
+    if source:
+        threading.Thread(target=_expand_batch, args=(batch_id, source, max_items), daemon=True).start()
+    else:
+        seen = set()
+        _start_batch(batch_id, [{'url': u} for u in urls if not (u in seen or seen.add(u))])
     
-    # Start processing in background thread
-    thread = threading.Thread(target=process_youtube_async, args=(job_id, url, max_duration))
-    thread.daemon = True
-    thread.start()
+    return jsonify(_batch_payload(batch_id, _batch_copy(batch_id), include_children=False)), 202
+
+@app.route('/batches', methods=['GET'])
+def list_batches():
+    """Batches, newest first, with aggregated progress only."""
+    try:
+        limit = max(1, min(100, int(request.args.get('limit', 20))))
+    except ValueError:
+        limit = 20
+    with _batches_lock:
+        newest = sorted(batches, key=lambda batch_id: batches[batch_id]['created_at_ts'], reverse=True)[:limit]
+    return jsonify({'batches': [_batch_payload(batch_id, _batch_copy(batch_id), include_children=False) for batch_id in newest]})
+
+@app.route('/batches/<batch_id>', methods=['GET'])
+def get_batch(batch_id):
+    """Aggregated progress/ETA of a batch plus each child's status and result summary."""
+    batch = _batch_copy(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(_batch_payload(batch_id, batch))
+
+@app.route('/batches/<batch_id>/results', methods=['GET'])
+def get_batch_results(batch_id):
+    """Full results of the batch's completed children, paged with limit/cursor."""
+    try:
+        limit = max(1, min(50, int(request.args.get('limit', 10))))
+        cursor = max(0, int(request.args.get('cursor', 0)))
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
+    with _batches_lock:
+        batch = batches.get(batch_id)
+        if batch is None:
+            return jsonify({'error': 'Batch not found'}), 404
+        job_ids = [item['job_id'] for item in batch['items'] if item.get('job_id')]
     
+    results = []
+    index = cursor
+    while index < len(job_ids) and len(results) < limit:
+        job_id = job_ids[index]
+        index += 1
+        with jobs_lock:
+            job = jobs.get(job_id)
+        job = job or _stored_job(job_id)
+        if job and job.get('status') == 'completed':
+            results.append({'job_id': job_id, 'url': job.get('url'), 'result': _job_result(job_id, job)})
     return jsonify({
-        'job_id': job_id,
-        'status': 'queued',
-        'message': 'Processing started. Use /jobs/{job_id}/status to check progress.'
+        'batch_id': batch_id,
+        'results': results,
+        'next_cursor': index if index < len(job_ids) else None,
     })
 
+@app.route('/batches/<batch_id>/cancel', methods=['POST'])
+def cancel_batch(batch_id):
+    """Stop starting new children (the ones already running finish normally)."""
+    with _batches_lock:
+        batch = batches.get(batch_id)
+        if batch is None:
+            return jsonify({'error': 'Batch not found'}), 404
+        if batch['status'] in ('expanding', 'running'):
+            batch['status'] = 'cancelled'
+            batch['finished_at_ts'] = _now_ts()
+    _persist_batch(batch_id)
+    return jsonify(_batch_payload(batch_id, _batch_copy(batch_id), include_children=False))
+
 
 def process_youtube_sync():
     """Old synchronous version - kept for backward compatibility if needed"""
@@ -847,7 +5586,9 @@ def process_youtube_sync():
     if 'youtube.com' not in url and 'youtu.be' not in url:
         return jsonify({'error': 'Invalid YouTube URL'}), 400
     
-    download_temp_dir = tempfile.mkdtemp(prefix='yt-process-')
+    downloads_root = _downloads_root()
+    os.makedirs(downloads_root, exist_ok=True)
+    download_temp_dir = tempfile.mkdtemp(prefix='yt-process-', dir=downloads_root)
     
     try:
         # Step 1: Download video
@@ -855,54 +5596,30 @@ def process_youtube_sync():
         ydl_opts_info = {
             'quiet': True,
             'no_warnings': True,
+            'format': YOUTUBE_FORMAT,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts_info) as ydl:
+        with _yt_dlp().YoutubeDL(ydl_opts_info) as ydl:
             info = ydl.extract_info(url, download=False)
             video_title = info.get('title', 'Downloaded Video')
             duration = info.get('duration', 0)
         
-        safe_title = "".join(c for c in video_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title[:100]
-        
-        ydl_opts = {
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-            'outtmpl': os.path.join(download_temp_dir, f'{safe_title}.%(ext)s'),
-            'quiet': False,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        
-        # Find downloaded file
-        files = os.listdir(download_temp_dir)
-        video_file = None
-        for f in files:
-            if f.endswith(('.mp4', '.webm', '.mkv')):
-                video_file = os.path.join(download_temp_dir, f)
-                break
-        
-        if not video_file:
-            return jsonify({'error': 'Failed to download video file'}), 500
+        cached_file = _download_youtube_cached(url, info)
+        video_file = _materialize_download(cached_file, download_temp_dir)
         
         file_size = os.path.getsize(video_file)
         video_id = f'youtube-{os.urandom(8).hex()}'
         
         # Step 2: Generate clips
         print("Generating clips with ClipsAI...", file=sys.stderr)
-        transcriber = Transcriber()
-        transcription = transcriber.transcribe(audio_file_path=video_file)
-        
-        clipfinder = ClipFinder()
-        clips = clipfinder.find_clips(transcription=transcription)
+        words_data, transcription_text, clips = _analyze_media(video_file)
         
         # Convert clips to JSON format
         clips_data = []
-        transcription_text = _extract_transcription_text(transcription)
         
         for i, clip in enumerate(clips):
-            start_char = getattr(clip, 'start_char', 0)
-            end_char = getattr(clip, 'end_char', len(transcription_text))
+            start_char = clip['start_char']
+            end_char = clip['end_char']
             
             clip_text = transcription_text[start_char:end_char] if transcription_text else f"Clip {i + 1}"
             clip_title = clip_text.strip()[:100] if clip_text.strip() else f"Clip {i + 1}"
@@ -911,8 +5628,8 @@ def process_youtube_sync():
                 'id': f'{video_id}-clip-{i}',
                 'object': 'clip',
                 'created': int(os.path.getmtime(video_file)),
-                'start_time': float(clip.start_time),
-                'end_time': float(clip.end_time),
+                'start_time': clip['start_time'],
+                'end_time': clip['end_time'],
                 'start_char': int(start_char),
                 'end_char': int(end_char),
                 'video_id': video_id,
@@ -922,18 +5639,6 @@ def process_youtube_sync():
                 'title': clip_title,
             })
         
-        # Get transcription data
-        words_data = []
-        if hasattr(transcription, 'words'):
-            for word in transcription.words:
-                words_data.append({
-                    'start_char': int(getattr(word, 'start_char', 0)),
-                    'end_char': int(getattr(word, 'end_char', 0)),
-                    'start_time': float(getattr(word, 'start_time', 0)),
-                    'end_time': float(getattr(word, 'end_time', 0)),
-                    'text': _get_word_text(word),
-                })
-        
         # Read video file and return as base64 (for small files) or save to persistent storage
         # For now, we'll return the path and let Next.js handle storage
         # In production, you'd want to save to a persistent location
@@ -979,6 +5684,102 @@ def process_youtube_sync():
         }), 500
 
 
+def _restore_jobs():
+    """Reload jobs from the store and resume unfinished ones from their last completed stage."""
+    global _restore_lock_file
+    if not JOB_STORE_PATH:
+        return
+    # With several web processes on one store only the first resumes jobs (the lock is held for the
+    # life of the process); the others serve those jobs' status/result from the store.
+    os.makedirs(os.path.dirname(os.path.abspath(JOB_STORE_PATH)), exist_ok=True)
+    _restore_lock_file = open(JOB_STORE_PATH + '.lock', 'a')
+    try:
+        fcntl.flock(_restore_lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print(f"Another process is resuming the jobs in {JOB_STORE_PATH}", file=sys.stderr)
+        return
+    with _job_store_lock:
+        try:
+            rows = _job_store_conn().execute('SELECT job_id, data FROM jobs ORDER BY created_at_ts').fetchall()
+        except sqlite3.Error as e:
+            print(f"Failed to load job store {JOB_STORE_PATH}: {e}", file=sys.stderr)
+            return
+    resumed = 0
+    for job_id, data in rows:
+        job = json.loads(data)
+        interrupted = (job.get('export') or {}).get('status') == 'running'
+        if interrupted:
+            job['export'] = _interrupted_export(job['export'])
+        with jobs_lock:
+            jobs[job_id] = job
+            _index_job(job_id, job)
+        if interrupted:
+            _write_stored_export(job_id, lambda _: job['export'])
+        if job.get('status') in ('completed', 'failed'):
+            continue
+        
+        checkpoints = _load_checkpoints(job_id, ('audio', 'video', 'analysis'))
+        video_file = (checkpoints.get('video') or {}).get('path')
+        if video_file and not os.path.exists(video_file):
+            video_file = None
+        audio_file = (checkpoints.get('audio') or {}).get('path')
+        if audio_file and not os.path.exists(audio_file):
+            audio_file = None
+        analysis_done = 'analysis' in checkpoints
+        audio_first = job.get('audio_first', AUDIO_FIRST_PIPELINE)
+        
+        pending = []
+        if not analysis_done:
+            pending.append('analysis')
+        if video_file is None and (audio_first or analysis_done):
+            pending.append('video')
+        with jobs_lock:
+            job['pending_branches'] = pending
+            job['audio_path'] = audio_file
+            job.setdefault('video', {})['path'] = video_file
+            job.pop('finalizing', None)
+            job['queued_at_ts'] = None
+        update_job_status(job_id, 'queued', job.get('progress', 0), 'Resuming after restart...')
+        resumed += 1
+        if video_file and job.get('preview_proxy', PREVIEW_PROXIES) and not job['video'].get('proxy_path'):
+            _schedule_preview_proxy(job_id, video_file)
+        
+        priority = job.get('priority', 0)
+        if not pending:
+            threading.Thread(target=_finish_branch, args=(job_id, 'video'), daemon=True).start()
+        elif 'analysis' in pending and 'video' not in pending and (video_file or audio_file):
+            _enqueue_stage('transcribe', job_id, priority)
+        else:
+            _enqueue_stage('download', job_id, priority)
+    if rows:
+        print(f"Restored {len(rows)} job(s) from {JOB_STORE_PATH}, resuming {resumed}", file=sys.stderr)
+    _restore_batches()
+
+
+# multiprocessing.parent_process(): chunk transcription workers import this module too
+# Inference workers (INFERENCE_ROLE=worker) only serve the socket: no jobs, no warm-up thread
+_web_process = multiprocessing.parent_process() is None and INFERENCE_ROLE == 'web'
+
+if _web_process:
+    try:
+        _restore_jobs()
+    except Exception as e:
+        # A broken store must not keep the API from starting; new jobs still work (and persist if they can)
+        print(f"Restoring jobs from {JOB_STORE_PATH} failed: {e}", file=sys.stderr)
+
+if _web_process:
+    _import_times['app'] = time.perf_counter() - _import_started
+    print("Startup imports: " + ', '.join(f'{name} {seconds:.2f}s' for name, seconds in _import_times.items())
+          + (' (torch/clipsai/yt_dlp deferred to warm-up)' if WARMUP else ' (torch/clipsai/yt_dlp deferred to first use)'),
+          file=sys.stderr)
+    if WARMUP:
+        # Import and warm in the background so /health/live answers immediately
+        threading.Thread(target=_warm_up, name='warm-up', daemon=True).start()
+    if _storage_limits_enabled():
+        threading.Thread(target=_storage_loop, name='storage-manager', daemon=True).start()
+        _wake_storage_manager()
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     # IMPORTANT: disable the auto-reloader.
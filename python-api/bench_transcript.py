@@ -0,0 +1,123 @@
+"""
+Micro-benchmark for transcript text reconstruction.
+
+Builds synthetic transcripts (100k words by default) in the shapes the API sees, ClipsAI word
+objects and the API's dict-per-word payload, and times _reconstruct_transcription_from_words
+against the previous char-buffer implementation, checking that both produce the same text.
+
+    python bench_transcript.py [--words 100000] [--repeat 5]
+"""
+import os
+import sys
+import random
+import string
+import argparse
+import timeit
+
+# Importing app must not open the job store or warm models
+os.environ.setdefault('JOB_STORE_PATH', '')
+os.environ.setdefault('PRELOAD_MODELS', '0')
+os.environ.setdefault('WARMUP', '0')
+
+from app import _get_word_text, _reconstruct_transcription_from_words
+
+
+class Word:
+    """Shape of a ClipsAI transcription word."""
+    __slots__ = ('text', 'start_char', 'end_char', 'start_time', 'end_time')
+
+    def __init__(self, text, start_char, end_char, start_time, end_time):
+        self.text = text
+        self.start_char = start_char
+        self.end_char = end_char
+        self.start_time = start_time
+        self.end_time = end_time
+
+
+def legacy_reconstruct(words) -> str:
+    """The char-buffer implementation this benchmark replaces, kept as the baseline."""
+    if not words:
+        return ''
+
+    spans = []
+    for w in words:
+        try:
+            start = int(getattr(w, 'start_char', 0) if not isinstance(w, dict) else w.get('start_char', 0))
+            end = int(getattr(w, 'end_char', 0) if not isinstance(w, dict) else w.get('end_char', 0))
+        except Exception:
+            start, end = 0, 0
+        token = _get_word_text(w)
+        if end > start and token:
+            spans.append((start, end, token))
+
+    if spans:
+        max_end = max(e for _, e, _ in spans)
+        buf = [' '] * max_end
+        for start, end, token in spans:
+            width = max(0, end - start)
+            if width == 0:
+                continue
+            token_slice = token[:width]
+            for i, ch in enumerate(token_slice):
+                idx = start + i
+                if 0 <= idx < len(buf):
+                    buf[idx] = ch
+        return ''.join(buf).rstrip()
+
+    tokens = [_get_word_text(w) for w in words]
+    tokens = [t for t in tokens if t]
+    return ' '.join(tokens).strip()
+
+
+def synthetic_words(count: int, seed: int = 0) -> list:
+    """`count` words separated by single spaces, with the odd wider gap (dropped punctuation)."""
+    rng = random.Random(seed)
+    words = []
+    char = 0
+    t = 0.0
+    for _ in range(count):
+        text = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 10)))
+        duration = 0.05 * len(text)
+        words.append(Word(text, char, char + len(text), t, t + duration))
+        char += len(text) + (2 if rng.random() < 0.05 else 1)
+        t += duration + 0.05
+    return words
+
+
+def as_dicts(words: list) -> list:
+    return [
+        {
+            'start_char': w.start_char,
+            'end_char': w.end_char,
+            'start_time': w.start_time,
+            'end_time': w.end_time,
+            'text': w.text,
+        }
+        for w in words
+    ]
+
+
+def bench(label: str, words: list, repeat: int):
+    legacy = min(timeit.repeat(lambda: legacy_reconstruct(words), number=1, repeat=repeat))
+    current = min(timeit.repeat(lambda: _reconstruct_transcription_from_words(words), number=1, repeat=repeat))
+    same = legacy_reconstruct(words) == _reconstruct_transcription_from_words(words)
+    print(f'{label:<8} legacy {legacy * 1000:8.1f} ms   current {current * 1000:8.1f} ms   '
+          f'x{legacy / current:5.1f}   same text: {same}')
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--words', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    words = synthetic_words(args.words)
+    print(f'{args.words} words, {words[-1].end_char} chars, best of {args.repeat}')
+    ok = bench('objects', words, args.repeat)
+    ok = bench('dicts', as_dicts(words), args.repeat) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Inference worker processes.
+
+Own the ClipsAI models and serve transcription and clip finding to the web tier (app.py started
+with the same INFERENCE_SOCKET) over a Unix socket. Scale the two tiers independently:
+
+    INFERENCE_SOCKET=/tmp/clipsai-inference.sock python inference_worker.py [--workers 2]
+    INFERENCE_SOCKET=/tmp/clipsai-inference.sock python app.py
+"""
+import os
+import sys
+import argparse
+
+# Importing app as a worker must not resume jobs or start the web warm-up
+os.environ['INFERENCE_ROLE'] = 'worker'
+
+from app import INFERENCE_SOCKET, INFERENCE_WORKERS, serve_inference
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=INFERENCE_WORKERS,
+                        help='worker processes, each with its own models (default: INFERENCE_WORKERS or 1)')
+    args = parser.parse_args()
+    if not INFERENCE_SOCKET:
+        parser.error('set INFERENCE_SOCKET to the Unix socket path shared with app.py')
+    serve_inference(max(1, args.workers))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
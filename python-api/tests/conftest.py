@@ -0,0 +1,57 @@
+"""
+Shared fixtures. app.py is a single module with process-wide state, so it is imported once with the
+job store, warm-up and background managers disabled; tests that need a downloads dir get a private
+one through the `downloads_root` fixture.
+"""
+import os
+import sys
+
+import pytest
+
+os.environ['JOB_STORE_PATH'] = ''
+os.environ['WARMUP'] = '0'
+os.environ['PRELOAD_MODELS'] = '0'
+os.environ['DOWNLOAD_BACKOFF_SECONDS'] = '0.05'
+os.environ['DOWNLOAD_BACKOFF_MAX_SECONDS'] = '0.2'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    return app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def downloads_root(tmp_path, monkeypatch):
+    """Point everything that lives under downloads/ at a temp dir."""
+    root = tmp_path / 'downloads'
+    root.mkdir()
+    monkeypatch.setattr(app_module, '_downloads_root', lambda: str(root))
+    return root
+
+
+@pytest.fixture
+def add_job():
+    """Insert jobs straight into the registry; removes them again afterwards."""
+    added = []
+
+    def _add(job_id, **fields):
+        job = {'status': 'queued', 'progress': 0, 'created_at_ts': app_module._now_ts(), **fields}
+        with app_module.jobs_lock:
+            app_module.jobs[job_id] = job
+            app_module._touch_job(job_id, job)
+        added.append(job_id)
+        return job
+
+    yield _add
+    with app_module.jobs_lock:
+        for job_id in added:
+            app_module.jobs.pop(job_id, None)
@@ -0,0 +1,89 @@
+"""Batches: at most `concurrency` children in flight, each finished child starts the next one."""
+import pytest
+
+
+@pytest.fixture
+def batch(app, client, monkeypatch):
+    """POST /batches with no stage workers: children stay queued until the test finishes them."""
+    monkeypatch.setattr(app, '_enqueue_stage', lambda stage, job_id, priority=0: None)
+    monkeypatch.setattr(app, 'YT_DLP_AVAILABLE', True)
+    monkeypatch.setattr(app, 'CLIPSAI_AVAILABLE', True)
+    created = []
+
+    def _create(n, **body):
+        urls = [f'https://youtube.com/watch?v={i}' for i in range(n)]
+        response = client.post('/batches', json={'urls': urls, **body})
+        assert response.status_code == 202
+        created.append(response.get_json()['batch_id'])
+        return created[-1]
+
+    yield _create
+    with app._batches_lock:
+        batch_ids = [app.batches.pop(batch_id) for batch_id in created]
+    with app.jobs_lock:
+        for b in batch_ids:
+            for item in b['items']:
+                app.jobs.pop(item['job_id'], None)
+
+
+def _children(client, batch_id):
+    return client.get(f'/batches/{batch_id}').get_json()['children']
+
+
+def _started(children):
+    return [child['job_id'] for child in children if child['job_id']]
+
+
+def test_finished_children_start_the_next_ones(app, client, batch):
+    batch_id = batch(5, concurrency=2)
+    first = _started(_children(client, batch_id))
+    assert len(first) == 2
+
+    app.update_job_status(first[0], 'completed', 100, 'Done')
+    started = _started(_children(client, batch_id))
+    assert len(started) == 3 and started[:2] == first
+
+    # A failed child frees its slot too; progress of other children doesn't
+    app.update_job_status(first[1], 'processing', 50, 'Working')
+    assert len(_started(_children(client, batch_id))) == 3
+    app.update_job_status(first[1], 'failed', 0, 'Error', 'boom')
+    assert len(_started(_children(client, batch_id))) == 4
+
+
+def test_batch_completes_when_the_last_child_finishes(app, client, batch):
+    batch_id = batch(3, concurrency=3)
+    job_ids = _started(_children(client, batch_id))
+    for job_id in job_ids:
+        assert client.get(f'/batches/{batch_id}').get_json()['status'] == 'running'
+        app.update_job_status(job_id, 'completed', 100, 'Done')
+
+    payload = client.get(f'/batches/{batch_id}').get_json()
+
+    assert payload['status'] == 'completed'
+    assert payload['counts'] == {'completed': 3}
+    assert payload['progress'] == 100
+
+
+def test_children_of_another_process_are_read_in_one_query(app, client, batch, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'JOB_STORE_PATH', str(tmp_path / 'store' / 'jobs.sqlite3'))
+    monkeypatch.setattr(app, '_job_store', None)
+    batch_id = batch(3, concurrency=3)
+    job_ids = _started(_children(client, batch_id))
+    app.update_job_status(job_ids[0], 'completed', 100, 'Done')
+    # This process never saw the children: they only exist as rows in the store
+    monkeypatch.setattr(app, '_job_snapshot', lambda job_id: None)
+    queries = []
+    stored_jobs = app._stored_jobs
+
+    def spy(job_ids):
+        queries.append(list(job_ids))
+        return stored_jobs(queries[-1])
+
+    monkeypatch.setattr(app, '_stored_jobs', spy)
+    monkeypatch.setattr(app, '_stored_job', lambda job_id: pytest.fail('one query per child'))
+
+    payload = client.get(f'/batches/{batch_id}').get_json()
+
+    assert queries == [job_ids]
+    assert [child['status'] for child in payload['children']] == ['completed', 'queued', 'queued']
+    app._job_store.close()
@@ -0,0 +1,74 @@
+"""Crop tracks: computed once per video and aspect, cached, corrupt cache files recomputed."""
+import concurrent.futures
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+TRACK = {'original_width': 1920, 'original_height': 1080, 'crop_width': 606, 'crop_height': 1080,
+         'segments': [{'start_time': 0.0, 'end_time': 4.0, 'x': 600, 'y': 0}]}
+
+
+@pytest.fixture
+def crops(app, tmp_path, downloads_root, monkeypatch):
+    """Crop runs on a thread pool with a fake analysis that counts its calls."""
+    calls = []
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(app, 'CROP_CACHE_DIR', str(tmp_path / 'crops'))
+    monkeypatch.setattr(app, '_get_crop_pool', lambda: pool)
+    monkeypatch.setattr(app, '_compute_crop_track', lambda path, aspect: calls.append(aspect) or TRACK)
+    video = downloads_root / 'yt-process-crops' / 'video.mp4'
+    video.parent.mkdir()
+    video.write_bytes(b'video' * 1000)
+    yield str(video), calls
+    pool.shutdown()
+
+
+def _poll(app, path, aspect='9:16', timeout=5.0):
+    deadline = time.monotonic() + timeout
+    with app.app.test_request_context():
+        while True:
+            response = app._crop_track_response(path, aspect)
+            status = response[1] if isinstance(response, tuple) else 200
+            if status != 202 or time.monotonic() > deadline:
+                body = (response[0] if isinstance(response, tuple) else response).get_json()
+                return status, body
+            time.sleep(0.02)
+
+
+def test_computed_once_then_cached(app, crops):
+    path, calls = crops
+
+    assert _poll(app, path) == (200, {'status': 'completed', 'cached': True, 'crops': TRACK})
+    assert _poll(app, path)[0] == 200
+    assert calls == [(9, 16)]
+    # Another aspect ratio is its own track
+    _poll(app, path, '1:1')
+    assert calls == [(9, 16), (1, 1)]
+
+
+def test_corrupt_cache_file_is_recomputed(app, crops):
+    path, calls = crops
+    _poll(app, path)
+    cache_path = app._crop_cache_path(path, (9, 16))
+    with open(cache_path, 'w') as f:
+        f.write('{"original_width": 19')
+
+    status, body = _poll(app, path)
+
+    assert status == 200 and body['crops'] == TRACK
+    assert len(calls) == 2
+
+
+def test_failure_is_reported_once_then_retried(app, crops, monkeypatch):
+    path, calls = crops
+
+    def boom(path, aspect):
+        raise RuntimeError('decode failed')
+
+    monkeypatch.setattr(app, '_compute_crop_track', boom)
+    assert _poll(app, path) == (500, {'status': 'failed', 'error': 'decode failed'})
+
+    monkeypatch.setattr(app, '_compute_crop_track', lambda path, aspect: TRACK)
+    assert _poll(app, path)[0] == 200
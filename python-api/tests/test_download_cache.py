@@ -0,0 +1,101 @@
+"""Download cache: concurrent requests for one video coalesce onto a single download, later ones hit the cache."""
+import threading
+import time
+import types
+
+import pytest
+
+
+class _CountingYoutubeDL:
+    downloads = []
+    fail = False
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def download(self, urls):
+        type(self).downloads.append(self.opts['format'])
+        time.sleep(0.3)
+        if type(self).fail:
+            raise RuntimeError('Private video')
+        with open(self.opts['outtmpl'].replace('%(ext)s', 'mp4'), 'wb') as f:
+            f.write(b'v' * 100)
+
+
+@pytest.fixture
+def ydl(app, downloads_root, monkeypatch):
+    monkeypatch.setattr(_CountingYoutubeDL, 'downloads', [])
+    monkeypatch.setattr(_CountingYoutubeDL, 'fail', False)
+    monkeypatch.setattr(app, 'DOWNLOAD_ATTEMPTS', 1)
+    monkeypatch.setattr(app, '_yt_dlp', lambda: types.SimpleNamespace(YoutubeDL=_CountingYoutubeDL))
+    return _CountingYoutubeDL
+
+
+INFO = {'id': 'abc123', 'title': 'Shared', 'extractor_key': 'Youtube', 'format_id': '137+140'}
+
+
+def _concurrently(fn, n):
+    results = [None] * n
+
+    def _run(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_requests_share_one_download(app, ydl):
+    before = dict(app._download_cache_stats)
+    progress = []
+
+    paths = _concurrently(lambda: app._download_youtube_cached('https://youtube.com/watch?v=abc123', INFO, progress.append), 5)
+
+    assert len(ydl.downloads) == 1
+    assert len(set(paths)) == 1 and paths[0].endswith('.mp4')
+    assert app._download_cache_stats['misses'] - before['misses'] == 1
+    assert app._download_cache_stats['coalesced'] - before['coalesced'] == 4
+    assert not app._inflight_downloads
+
+
+def test_completed_download_is_reused(app, ydl):
+    first = app._download_youtube_cached('https://youtube.com/watch?v=abc123', INFO)
+    hits = app._download_cache_stats['hits']
+
+    assert app._download_youtube_cached('https://youtu.be/abc123', INFO) == first
+    assert len(ydl.downloads) == 1
+    assert app._download_cache_stats['hits'] == hits + 1
+
+
+def test_formats_are_cached_separately(app, ydl):
+    video = app._download_youtube_cached('https://youtube.com/watch?v=abc123', INFO)
+    audio = app._download_youtube_cached('https://youtube.com/watch?v=abc123', INFO, fmt='bestaudio')
+
+    assert video != audio
+    assert ydl.downloads == [app.YOUTUBE_FORMAT, 'bestaudio']
+
+
+def test_followers_see_the_leaders_failure(app, ydl):
+    ydl.fail = True
+
+    results = _concurrently(lambda: app._download_youtube_cached('https://youtube.com/watch?v=abc123', INFO), 3)
+
+    assert len(ydl.downloads) == 1
+    assert all(isinstance(r, Exception) and 'Private video' in str(r) for r in results)
+    assert not app._inflight_downloads
+    # A failed download isn't cached: the next request tries again
+    ydl.fail = False
+    assert app._download_youtube_cached('https://youtube.com/watch?v=abc123', INFO).endswith('.mp4')
+    assert len(ydl.downloads) == 2
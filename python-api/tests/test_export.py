@@ -0,0 +1,105 @@
+"""Clip export: one export at a time per job, stream copy on keyframes and re-encode elsewhere."""
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+CLIPS = [
+    {'id': 'on-keyframe', 'start_time': 2.0, 'end_time': 3.0, 'title': 'Aligned'},
+    {'id': 'between', 'start_time': 1.0, 'end_time': 2.5, 'title': 'Unaligned'},
+]
+
+
+class _HeldPool:
+    """Export pool that only records submissions, so the export stays running."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+class _InlinePool:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def exportable(app, add_job, downloads_root, monkeypatch):
+    job_dir = downloads_root / 'yt-process-export'
+    job_dir.mkdir()
+    video = job_dir / 'video.mp4'
+    video.write_bytes(b'video')
+    result = {'video': {'clips': [dict(c) for c in CLIPS]}, 'temp_video_path': str(video), 'temp_dir': str(job_dir)}
+    add_job('exportable', status='completed', progress=100, result=result)
+    monkeypatch.setattr(app, '_video_keyframes', lambda path: [0.0, 2.0, 4.0])
+    return video
+
+
+def test_second_export_while_running_is_409(app, client, exportable, monkeypatch):
+    pool = _HeldPool()
+    monkeypatch.setattr(app, '_get_export_pool', lambda: pool)
+
+    first = client.post('/jobs/exportable/export', json={})
+    second = client.post('/jobs/exportable/export', json={'clip_ids': ['between']})
+
+    assert first.status_code == 202
+    assert second.status_code == 409
+    assert second.get_json()['export']['total'] == 2
+    assert len(pool.submitted) == 2
+
+
+def test_concurrent_posts_claim_the_export_once(app, exportable, monkeypatch):
+    pool = _HeldPool()
+    monkeypatch.setattr(app, '_get_export_pool', lambda: pool)
+    barrier = threading.Barrier(4)
+    statuses = []
+
+    def post():
+        client = app.app.test_client()
+        barrier.wait()
+        statuses.append(client.post('/jobs/exportable/export', json={}).status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(statuses) == [202, 409, 409, 409]
+    assert len(pool.submitted) == 2
+
+
+def test_export_is_allowed_again_once_finished(app, client, exportable, monkeypatch):
+    pool = _HeldPool()
+    monkeypatch.setattr(app, '_get_export_pool', lambda: pool)
+    assert client.post('/jobs/exportable/export', json={}).status_code == 202
+    for clip in CLIPS:
+        app._update_export('exportable', clip['id'], status='failed', error='boom')
+    assert app._job_snapshot('exportable')['export']['status'] == 'failed'
+
+    assert client.post('/jobs/exportable/export', json={}).status_code == 202
+
+
+@pytest.mark.parametrize('body, status', [({'mode': 'fast'}, 400), ({'clip_ids': ['missing']}, 400)])
+def test_invalid_requests(client, exportable, body, status):
+    assert client.post('/jobs/exportable/export', json=body).status_code == status
+
+
+@pytest.mark.skipif(not shutil.which('ffmpeg'), reason='needs ffmpeg')
+def test_keyframe_aligned_clips_are_stream_copied(app, client, exportable, monkeypatch):
+    # Keyframes every 2s, matching the _video_keyframes stub
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc=size=160x90:rate=10:duration=5',
+                    '-c:v', 'libx264', '-g', '20', '-keyint_min', '20', '-sc_threshold', '0', '-pix_fmt', 'yuv420p',
+                    str(exportable)], check=True)
+    monkeypatch.setattr(app, '_get_export_pool', lambda: _InlinePool())
+
+    assert client.post('/jobs/exportable/export', json={}).status_code == 202
+
+    export = app._job_snapshot('exportable')['export']
+    assert (export['status'], export['done']) == ('completed', 2)
+    assert export['clips']['on-keyframe']['method'] == 'copy'
+    assert export['clips']['between']['method'] == 'reencode'
+    assert sorted(p.name for p in (exportable.parent / 'clips').iterdir()) == ['000-Aligned.mp4', '001-Unaligned.mp4']
@@ -0,0 +1,58 @@
+"""Health probes: liveness answers right away, readiness is 503 until the warm-up has finished."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def warmup(app, monkeypatch):
+    """A warm-up that hasn't run yet, with no heavy steps of its own."""
+    monkeypatch.setattr(app, '_warmup', dict(app._warmup, state='pending', step=None, error=None))
+    monkeypatch.setattr(app, 'YT_DLP_AVAILABLE', False)
+    monkeypatch.setattr(app, 'CLIPSAI_AVAILABLE', False)
+    monkeypatch.setattr(app, '_remote_inference', False)
+    return app._warmup
+
+
+def test_ready_only_after_warm_up(app, client, warmup):
+    assert client.get('/health/live').status_code == 200
+    response = client.get('/health/ready')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'warming_up'
+
+    app._warm_up()
+
+    response = client.get('/health/ready')
+    assert response.status_code == 200
+    assert response.get_json()['warmup']['state'] == 'ready'
+
+
+def test_failed_warm_up_is_not_ready(app, client, warmup, monkeypatch):
+    def broken():
+        raise ImportError('no yt_dlp')
+
+    monkeypatch.setattr(app, 'YT_DLP_AVAILABLE', True)
+    monkeypatch.setattr(app, '_yt_dlp', broken)
+
+    app._warm_up()
+
+    response = client.get('/health/ready')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'failed'
+    assert response.get_json()['warmup']['error'] == 'yt_dlp: no yt_dlp'
+    assert client.get('/health/live').status_code == 200
+
+
+def test_import_defers_heavy_modules():
+    code = (
+        'import sys, app; '
+        "print(sorted(m for m in ('torch', 'clipsai', 'yt_dlp', 'whisperx') if m in sys.modules))"
+    )
+    env = dict(os.environ, JOB_STORE_PATH='', WARMUP='0', PRELOAD_MODELS='0')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    out = subprocess.run([sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == '[]'
@@ -0,0 +1,73 @@
+"""Push-based progress: ?since= long-polls and SSE wake only on changes to their own job."""
+import threading
+import time
+
+import pytest
+
+
+class _CountingCondition(threading.Condition):
+    def __init__(self, lock):
+        super().__init__(lock)
+        self.notified = 0
+
+    def notify_all(self):
+        self.notified += 1
+        super().notify_all()
+
+
+def _later(delay, fn, *args):
+    timer = threading.Timer(delay, fn, args)
+    timer.start()
+    return timer
+
+
+def test_long_poll_returns_on_the_next_change(app, client, add_job):
+    add_job('poll-a', status='processing')
+    version = app._job_snapshot('poll-a')['version']
+    _later(0.1, app.update_job_status, 'poll-a', 'processing', 50, 'Halfway')
+
+    started = time.monotonic()
+    body = client.get('/jobs/poll-a/status', query_string={'since': version, 'timeout': 5}).get_json()
+
+    assert time.monotonic() - started < 4
+    assert body['version'] > version and body['progress'] == 50
+
+
+def test_long_poll_times_out_without_changes(app, client, add_job):
+    add_job('poll-idle', status='processing')
+    version = app._job_snapshot('poll-idle')['version']
+
+    body = client.get('/jobs/poll-idle/status', query_string={'since': version, 'timeout': 0.2}).get_json()
+
+    assert body['version'] == version
+
+
+def test_changes_only_wake_their_own_job(app, add_job, monkeypatch):
+    add_job('watched', status='processing')
+    add_job('busy', status='processing')
+    watched = app._job_states['watched']
+    monkeypatch.setattr(watched, 'changed', _CountingCondition(app.jobs_lock))
+
+    for progress in range(10):
+        app.update_job_status('busy', 'processing', progress, 'Working')
+    assert watched.changed.notified == 0
+
+    app.update_job_status('watched', 'processing', 10, 'Working')
+    assert watched.changed.notified == 1
+
+
+def test_events_stream_until_done(app, client, add_job):
+    add_job('stream', status='processing')
+    _later(0.1, app.update_job_status, 'stream', 'processing', 60, 'Working')
+    _later(0.3, app.update_job_status, 'stream', 'failed', 100, 'Failed')
+
+    body = client.get('/jobs/stream/events').get_data(as_text=True)
+
+    events = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+    assert events[-1] == 'done'
+    assert 'status' in events
+
+
+@pytest.mark.parametrize('path', ['/jobs/missing/status', '/jobs/missing/events'])
+def test_unknown_job(client, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,95 @@
+"""/jobs: newest first, cursor pagination, status/since filters and the summary projection."""
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def listing(app, add_job):
+    """Jobs created by this test only: the index is process-wide, so every query is scoped with since=."""
+    since = app._now_ts()
+
+    def _create(n, **fields):
+        job_ids = [f'list-{uuid.uuid4().hex[:8]}' for _ in range(n)]
+        for job_id in job_ids:
+            add_job(job_id, **fields)
+        return job_ids
+
+    def _get(client, **params):
+        response = client.get('/jobs', query_string={'since': since, **params})
+        assert response.status_code == 200
+        return response.get_json()
+
+    return _create, _get
+
+
+def _walk(client, get, **params):
+    ids, cursor = [], None
+    while True:
+        page = get(client, **params, **({'cursor': cursor} if cursor else {}))
+        ids.extend(job['job_id'] for job in page['jobs'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids
+
+
+def test_pages_newest_first_without_gaps(client, listing):
+    create, get = listing
+    created = create(7)
+
+    first = get(client, limit=3)
+    assert [job['job_id'] for job in first['jobs']] == created[::-1][:3]
+    assert first['next_cursor']
+    assert _walk(client, get, limit=3) == created[::-1]
+
+
+def test_cursor_is_stable_while_jobs_are_added(client, listing):
+    create, get = listing
+    created = create(4)
+    first = get(client, limit=2)
+
+    create(3)
+    second = get(client, limit=2, cursor=first['next_cursor'])
+
+    assert [job['job_id'] for job in second['jobs']] == created[::-1][2:]
+
+
+def test_status_filter(app, client, listing):
+    create, get = listing
+    done = create(3, status='completed')
+    failed = create(2, status='failed')
+    queued = create(2)
+
+    assert _walk(client, get, status='completed', limit=2) == done[::-1]
+    assert _walk(client, get, status='failed,queued', limit=1) == (failed + queued)[::-1]
+
+    # Status changes move a job between the per-status lists
+    app.update_job_status(queued[0], 'completed', 100, 'Done')
+    assert _walk(client, get, status='completed') == [queued[0]] + done[::-1]
+    assert queued[0] not in _walk(client, get, status='queued')
+
+
+def test_since_filter(app, client, listing):
+    create, get = listing
+    create(2)
+    cutoff = app._now_ts()
+    later = create(2)
+
+    response = client.get('/jobs', query_string={'since': cutoff})
+
+    assert [job['job_id'] for job in response.get_json()['jobs']] == later[::-1]
+
+
+def test_summary_view(client, listing):
+    create, get = listing
+    create(1)
+
+    job = get(client, view='summary')['jobs'][0]
+
+    assert set(job) == {'job_id', 'status', 'progress', 'message', 'updated_at'}
+    full = get(client)['jobs'][0]
+    assert 'elapsed_seconds' in full and 'url' in full
+
+
+def test_invalid_cursor(client):
+    assert client.get('/jobs', query_string={'cursor': 'abc'}).status_code == 400
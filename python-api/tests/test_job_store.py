@@ -0,0 +1,108 @@
+"""Durable job store: rows and checkpoints survive a restart, unfinished jobs resume from their last stage."""
+import fcntl
+
+import pytest
+
+
+@pytest.fixture
+def store(app, tmp_path, downloads_root, monkeypatch):
+    """A private SQLite store plus a record of what _restore_jobs hands back to the scheduler."""
+    monkeypatch.setattr(app, 'JOB_STORE_PATH', str(tmp_path / 'store' / 'jobs.sqlite3'))
+    monkeypatch.setattr(app, '_job_store', None)
+    monkeypatch.setattr(app, '_restore_lock_file', None)
+    resumed = []
+    monkeypatch.setattr(app, '_enqueue_stage', lambda stage, job_id, priority=0: resumed.append((stage, job_id)))
+    monkeypatch.setattr(app, '_finish_branch', lambda job_id, branch: resumed.append(('finish', job_id)))
+    yield resumed
+    if app._job_store is not None:
+        app._job_store.close()
+    if app._restore_lock_file is not None:
+        app._restore_lock_file.close()
+
+
+def _restart(app, *job_ids):
+    """Forget the jobs in memory, as a new process would, then restore them from the store."""
+    with app.jobs_lock:
+        for job_id in job_ids:
+            app.jobs.pop(job_id, None)
+    app._restore_jobs()
+
+
+def test_rows_and_checkpoints_round_trip(app, store, add_job):
+    add_job('stored', status='completed', progress=100, result={'clips': [1, 2]})
+    app._persist_job('stored')
+    app._checkpoint_job('stored', 'result', {'clips': [1, 2]})
+
+    row = app._stored_job('stored')
+    assert row['status'] == 'completed'
+    # Large outputs live in the checkpoint table, not in the row that every progress write rewrites
+    assert 'result' not in row
+    assert app._job_result('stored', row) == {'clips': [1, 2]}
+    assert app._stored_job('missing') is None
+
+
+def test_restart_resumes_from_the_last_completed_stage(app, store, add_job, downloads_root):
+    video = downloads_root / 'yt-process-a' / 'video.mp4'
+    video.parent.mkdir()
+    video.write_bytes(b'v')
+    jobs = {
+        'finished': dict(status='completed', progress=100),
+        'fresh': dict(status='downloading', progress=5, audio_first=True, preview_proxy=False),
+        'downloaded': dict(status='processing', progress=40, audio_first=False, preview_proxy=False),
+        'analyzed': dict(status='processing', progress=90, audio_first=True, preview_proxy=False),
+    }
+    for job_id, fields in jobs.items():
+        add_job(job_id, **fields)
+        app._persist_job(job_id)
+    app._checkpoint_job('downloaded', 'video', {'path': str(video)})
+    app._checkpoint_job('analyzed', 'video', {'path': str(video)})
+    app._checkpoint_job('analyzed', 'analysis', {'clips': []})
+
+    _restart(app, *jobs)
+
+    assert app.jobs['finished']['status'] == 'completed'
+    assert app.jobs['fresh']['pending_branches'] == ['analysis', 'video']
+    assert app.jobs['downloaded']['pending_branches'] == ['analysis']
+    assert app.jobs['analyzed']['pending_branches'] == []
+    for job_id in ('fresh', 'downloaded', 'analyzed'):
+        assert app._job_snapshot(job_id)['status'] == 'queued'
+    assert sorted(store) == [('download', 'fresh'), ('finish', 'analyzed'), ('transcribe', 'downloaded')]
+
+
+def test_missing_checkpointed_file_is_downloaded_again(app, store, add_job, downloads_root):
+    add_job('gone', status='processing', audio_first=False, preview_proxy=False)
+    app._persist_job('gone')
+    app._checkpoint_job('gone', 'video', {'path': str(downloads_root / 'evicted.mp4')})
+
+    _restart(app, 'gone')
+
+    assert store == [('download', 'gone')]
+
+
+def test_running_export_is_marked_interrupted(app, store, add_job):
+    export = {
+        'status': 'running',
+        'clips': {'a': {'status': 'done'}, 'b': {'status': 'running'}, 'c': {'status': 'queued'}},
+    }
+    add_job('exporting', status='completed', progress=100, export=export)
+    app._persist_job('exporting')
+
+    _restart(app, 'exporting')
+
+    restored = app.jobs['exporting']['export']
+    assert restored['status'] == 'interrupted'
+    assert (restored['done'], restored['failed']) == (1, 2)
+    assert restored['clips']['b']['error'] == 'interrupted'
+    # The fix is persisted, so the next restart doesn't see a running export either
+    assert app._stored_job('exporting')['export']['status'] == 'interrupted'
+
+
+def test_only_one_process_resumes(app, store, add_job):
+    add_job('owned', status='downloading', preview_proxy=False)
+    app._persist_job('owned')
+    with open(app.JOB_STORE_PATH + '.lock', 'a') as other_process:
+        fcntl.flock(other_process, fcntl.LOCK_EX)
+        _restart(app, 'owned')
+
+    assert 'owned' not in app.jobs
+    assert store == []
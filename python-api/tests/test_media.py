@@ -0,0 +1,144 @@
+"""/video/<path>: byte ranges (single and multipart), validators and conditional requests."""
+import os
+import re
+
+import pytest
+
+DATA = bytes(range(256)) * 400
+
+
+@pytest.fixture
+def media(downloads_root):
+    job_dir = downloads_root / 'yt-process-media'
+    job_dir.mkdir()
+    path = job_dir / 'video.mp4'
+    path.write_bytes(DATA)
+    return '/video' + str(path)
+
+
+def test_full_response_is_cacheable(client, media):
+    response = client.get(media)
+
+    assert response.status_code == 200
+    assert response.data == DATA
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['ETag'].startswith('"')
+    assert response.headers['Last-Modified']
+    # The media file of a per-request dir is written once
+    assert 'immutable' in response.headers['Cache-Control']
+
+
+@pytest.mark.parametrize('relpath, immutable', [
+    ('yt-download-abc/video.mp4', True),
+    ('yt-process-abc/video.proxy.mp4', False),
+    ('yt-process-abc/clips/001-intro.mp4', False),
+    ('yt-process-abc/video.mp4.scrub/sprite-000.jpg', False),
+    ('.cache/youtube/youtube-abc-123/video.mp4', False),
+    ('uploads/0123456789abcdef0123456789abcdef/data.mp4', False),
+])
+def test_only_per_request_media_is_immutable(client, downloads_root, relpath, immutable):
+    path = downloads_root / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(DATA)
+
+    response = client.get('/video' + str(path))
+
+    assert response.status_code == 200
+    assert ('immutable' in response.headers['Cache-Control']) is immutable
+    if not immutable:
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert client.get('/video' + str(path), headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_single_range(client, media):
+    response = client.get(media, headers={'Range': 'bytes=100-199'})
+
+    assert response.status_code == 206
+    assert response.data == DATA[100:200]
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(DATA)}'
+    assert response.headers['Content-Length'] == '100'
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=-10', slice(len(DATA) - 10, None)),
+    ('bytes=102000-', slice(102000, None)),
+    ('bytes=0-999999', slice(0, None)),
+])
+def test_open_and_suffix_ranges(client, media, header, expected):
+    response = client.get(media, headers={'Range': header})
+
+    assert response.status_code == 206
+    assert response.data == DATA[expected]
+
+
+def test_multiple_ranges_are_multipart(client, media):
+    response = client.get(media, headers={'Range': 'bytes=0-9, 50-59, 55-69'})
+
+    assert response.status_code == 206
+    boundary = re.search(r'boundary=(\w+)', response.headers['Content-Type']).group(1)
+    assert response.headers['Content-Length'] == str(len(response.data))
+    parts = [p for p in response.data.split(b'--' + boundary.encode()) if p.strip() not in (b'', b'--')]
+    # Overlapping ranges are coalesced
+    assert len(parts) == 2
+    for part, (start, end) in zip(parts, [(0, 9), (50, 69)]):
+        head, body = part.split(b'\r\n\r\n', 1)
+        assert f'Content-Range: bytes {start}-{end}/{len(DATA)}'.encode() in head
+        # Each body is followed by the CRLF that precedes the next boundary
+        assert body == DATA[start:end + 1] + b'\r\n'
+
+
+def test_unsatisfiable_range(client, media):
+    response = client.get(media, headers={'Range': f'bytes={len(DATA) + 10}-'})
+
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(DATA)}'
+
+
+def test_malformed_range_is_ignored(client, media):
+    response = client.get(media, headers={'Range': 'bytes=20-10'})
+
+    assert response.status_code == 200
+    assert response.data == DATA
+
+
+def test_if_none_match_and_if_modified_since(client, media):
+    first = client.get(media)
+    etag = first.headers['ETag']
+
+    assert client.get(media, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(media, headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert client.get(media, headers={'If-None-Match': '"other"'}).status_code == 200
+    assert client.get(media, headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+
+
+def test_if_range_falls_back_to_full_body_when_stale(client, media):
+    etag = client.get(media).headers['ETag']
+
+    assert client.get(media, headers={'Range': 'bytes=0-9', 'If-Range': etag}).status_code == 206
+    response = client.get(media, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert response.status_code == 200
+    assert response.data == DATA
+
+
+def test_if_match_mismatch(client, media):
+    assert client.get(media, headers={'If-Match': '"stale"'}).status_code == 412
+
+
+def test_replaced_file_gets_a_new_etag(app, client, media, monkeypatch):
+    etag = client.get(media).headers['ETag']
+    path = media[len('/video'):]
+    with open(path + '.tmp', 'wb') as f:
+        f.write(DATA[::-1])
+    os.replace(path + '.tmp', path)
+    # Past the stat cache's TTL the new inode is noticed
+    monkeypatch.setattr(app, 'MEDIA_STAT_TTL', 0)
+
+    response = client.get(media, headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.data == DATA[::-1]
+
+
+def test_paths_outside_allowed_roots(client):
+    assert client.get('/video/etc/passwd').status_code == 403
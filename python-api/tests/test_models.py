@@ -0,0 +1,115 @@
+"""Model registry: one warm instance per model handed out as leases, idle models evicted under memory pressure."""
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def registry(app, monkeypatch):
+    """Fake models with a fresh registry; returns the list of factory calls."""
+    loads = []
+
+    def factory(name):
+        def _build():
+            loads.append(name)
+            return object()
+        return _build
+
+    monkeypatch.setattr(app, '_model_factories', {'transcriber': factory('transcriber'), 'clipfinder': factory('clipfinder')})
+    monkeypatch.setattr(app, '_models', {
+        name: {
+            'instance': None, 'state': 'unloaded', 'error': None, 'loaded_at_ts': None, 'last_used_ts': None,
+            'load_seconds': None, 'rss_delta_bytes': None, 'leases': 0, 'load_count': 0,
+            'load_lock': threading.Lock(), 'lease_slots': threading.BoundedSemaphore(1),
+        }
+        for name in ('transcriber', 'clipfinder')
+    })
+    monkeypatch.setattr(app, 'MODEL_MEMORY_LIMIT_MB', 0)
+    monkeypatch.setattr(app, '_start_model_eviction_timer', lambda: None)
+    return loads
+
+
+@pytest.fixture
+def over_limit(app, monkeypatch):
+    """The process is above its memory limit, and every model has been idle long enough."""
+    monkeypatch.setattr(app, 'MODEL_MEMORY_LIMIT_MB', 1)
+    monkeypatch.setattr(app, 'MODEL_IDLE_SECONDS', 0)
+    monkeypatch.setattr(app, '_process_rss_bytes', lambda: 10 * 1024 * 1024)
+
+
+def test_leases_share_one_warm_instance(app, registry):
+    with app._lease_model('transcriber') as first:
+        assert app._models_snapshot()['transcriber']['leases'] == 1
+    with app._lease_model('transcriber') as second:
+        pass
+
+    assert first is second
+    assert registry == ['transcriber']
+    snapshot = app._models_snapshot()
+    assert snapshot['transcriber']['state'] == 'ready'
+    assert snapshot['transcriber']['leases'] == 0
+    assert snapshot['clipfinder']['state'] == 'unloaded'
+
+
+def test_leases_are_bounded(app, registry):
+    leased, second_in = threading.Event(), threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with app._lease_model('transcriber'):
+            leased.set()
+            release.wait(5)
+
+    def wait_for_slot():
+        with app._lease_model('transcriber'):
+            second_in.set()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    leased.wait(5)
+    waiter = threading.Thread(target=wait_for_slot)
+    waiter.start()
+
+    # MODEL_MAX_LEASES=1: the second lease waits for the first one to end
+    assert not second_in.wait(0.2)
+    release.set()
+    assert second_in.wait(5)
+    holder.join()
+    waiter.join()
+
+
+def test_idle_models_are_evicted_when_over_the_limit(app, registry, over_limit):
+    with app._lease_model('clipfinder'):
+        # Leased models are never evicted
+        assert app._evict_idle_models() == []
+
+    # The lease ending was the last use: it's dropped right away, and the next lease reloads it
+    assert app._models_snapshot()['clipfinder']['state'] == 'unloaded'
+    with app._lease_model('clipfinder'):
+        pass
+    assert registry == ['clipfinder', 'clipfinder']
+
+
+def test_recently_used_models_survive_memory_pressure(app, registry, over_limit, monkeypatch):
+    monkeypatch.setattr(app, 'MODEL_IDLE_SECONDS', 300)
+    with app._lease_model('transcriber'):
+        pass
+
+    assert app._evict_idle_models() == []
+    assert app._evict_idle_models(force=True) == ['transcriber']
+
+
+def test_failed_load_is_reported_and_retried(app, registry, monkeypatch):
+    def broken():
+        raise RuntimeError('no weights')
+
+    monkeypatch.setitem(app._model_factories, 'transcriber', broken)
+    with pytest.raises(RuntimeError):
+        with app._lease_model('transcriber'):
+            pass
+    snapshot = app._models_snapshot()['transcriber']
+    assert (snapshot['state'], snapshot['error'], snapshot['leases']) == ('failed', 'no weights', 0)
+
+    monkeypatch.setitem(app._model_factories, 'transcriber', lambda: 'model')
+    with app._lease_model('transcriber') as model:
+        assert model == 'model'
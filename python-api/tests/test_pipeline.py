@@ -0,0 +1,86 @@
+"""Audio-first pipeline: a failing branch ends the job even while the other branch is still running."""
+import time
+import types
+
+import pytest
+
+
+class _FakeYoutubeDL:
+    """Audio downloads succeed; video downloads fail after a short delay."""
+    video_error = 'video boom'
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def extract_info(self, url, download=False):
+        return {'id': 'race', 'title': 'Race', 'duration': 5, 'format_id': '1'}
+
+    def download(self, urls):
+        if not self.opts['format'].startswith('bestaudio'):
+            time.sleep(0.2)
+            raise RuntimeError(self.video_error)
+        with open(self.opts['outtmpl'].replace('%(ext)s', 'm4a'), 'wb') as f:
+            f.write(b'a' * 10)
+
+
+@pytest.fixture
+def pipeline(app, downloads_root, monkeypatch):
+    monkeypatch.setattr(app, 'AUDIO_FIRST_PIPELINE', True)
+    monkeypatch.setattr(app, 'DOWNLOAD_ATTEMPTS', 1)
+    monkeypatch.setattr(app, '_yt_dlp', lambda: types.SimpleNamespace(YoutubeDL=_FakeYoutubeDL))
+    return app
+
+
+def _wait_for(app, job_id, statuses, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        snapshot = app._job_snapshot(job_id)
+        if snapshot['status'] in statuses:
+            return snapshot
+        time.sleep(0.05)
+    return app._job_snapshot(job_id)
+
+
+def test_video_failure_during_transcription_fails_the_job(pipeline, monkeypatch):
+    app = pipeline
+
+    def slow_analysis(path, progress=None, on_stage=None):
+        # Still transcribing when the video branch fails; keeps reporting progress afterwards
+        for _ in range(10):
+            time.sleep(0.1)
+            if progress:
+                progress(0.5, 'Transcribing')
+        if on_stage:
+            on_stage('clips')
+        return [], '', []
+
+    monkeypatch.setattr(app, '_analyze_media', slow_analysis)
+    job_id = app._create_youtube_job('https://youtube.com/watch?v=race', app._youtube_job_options({}))
+
+    snapshot = _wait_for(app, job_id, ('failed', 'completed'))
+    assert snapshot['status'] == 'failed'
+    assert 'video boom' in snapshot['error']
+
+    # The transcription branch finishing later must not revive it
+    time.sleep(1.5)
+    snapshot = app._job_snapshot(job_id)
+    assert snapshot['status'] == 'failed'
+    assert snapshot['progress'] == 0
+    assert app.jobs[job_id]['pending_branches'] == []
+
+
+def test_failed_job_ignores_late_status_writes(pipeline, add_job):
+    app = pipeline
+    add_job('late', status='failed', progress=0, message='Error: boom', error='boom')
+
+    app._update_live_job_status('late', 'processing', 90, 'Transcribing')
+    app._finish_branch('late', 'audio')
+
+    snapshot = app._job_snapshot('late')
+    assert (snapshot['status'], snapshot['progress']) == ('failed', 0)
@@ -0,0 +1,116 @@
+"""Media probe: one ffprobe per file (memory and disk cache), and keyframe snapping for fast cuts."""
+import collections
+import os
+import random
+import threading
+import time
+
+import pytest
+
+PROBE = {'duration': 30.0, 'format': {}, 'streams': [], 'video_codec': 'h264', 'audio_codec': 'aac',
+         'keyframes': [0.0, 5.0, 10.0, 20.0], 'probe_seconds': 0.1}
+
+
+@pytest.fixture
+def probes(app, tmp_path, monkeypatch):
+    """A private probe cache and a fake ffprobe; returns the paths it was run on."""
+    monkeypatch.setattr(app, 'PROBE_CACHE_DIR', str(tmp_path / 'probes'))
+    monkeypatch.setattr(app, '_probe_memo', collections.OrderedDict())
+    monkeypatch.setattr(app, '_probe_inflight', {})
+    monkeypatch.setattr(app, '_probe_stats', collections.Counter())
+    runs = []
+
+    def ffprobe(path):
+        runs.append(path)
+        time.sleep(0.05)
+        return dict(PROBE)
+
+    monkeypatch.setattr(app, '_run_ffprobe', ffprobe)
+    return runs
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'frames' * 1000)
+    return path
+
+
+def test_probed_once_then_cached(app, probes, media, monkeypatch):
+    assert app._probe_media(str(media)) == PROBE
+    assert app._probe_media(str(media)) == PROBE
+    # A restart keeps the disk cache
+    monkeypatch.setattr(app, '_probe_memo', collections.OrderedDict())
+    assert app._probe_media(str(media)) == PROBE
+
+    assert probes == [str(media)]
+    assert (app._probe_stats['misses'], app._probe_stats['hits'], app._probe_stats['disk_hits']) == (1, 1, 1)
+
+
+def test_hardlinks_share_a_probe_and_changes_probe_again(app, probes, media, tmp_path):
+    link = tmp_path / 'linked.mp4'
+    os.link(media, link)
+    app._probe_media(str(media))
+    app._probe_media(str(link))
+    assert len(probes) == 1
+
+    stamp = time.time() + 10
+    os.utime(media, (stamp, stamp))
+    app._probe_media(str(media))
+    assert len(probes) == 2
+
+
+def test_concurrent_probes_run_ffprobe_once(app, probes, media):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(app._probe_media(str(media)))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert probes == [str(media)]
+    assert results == [PROBE] * 4
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (4.0, 9.0, (5.0, 10.0)),
+    (12.5, 17.0, (12.5, 17.0)),  # nearest keyframes are 2.5s and 3s away: too far to snap
+    (5.9, 6.5, (5.0, 6.5)),  # the end would snap onto the start, so it stays
+    (18.5, 21.9, (20.0, 21.9)),  # past the last keyframe the end has nothing to snap to
+    (9.0, 9.5, (9.0, 10.0)),  # the start can't snap past the end, so only the end takes the keyframe
+])
+def test_snap_moves_boundaries_onto_close_keyframes(app, start, end, expected):
+    assert app._snap_to_keyframes(PROBE['keyframes'], start, end) == expected
+
+
+def test_snap_never_moves_a_boundary_further_than_the_limit(app):
+    rng = random.Random(7)
+    keyframes = sorted(rng.uniform(0, 600) for _ in range(100))
+    for _ in range(2000):
+        start = rng.uniform(0, 600)
+        end = start + rng.uniform(0.5, 60)
+        snapped_start, snapped_end = app._snap_to_keyframes(keyframes, start, end)
+
+        assert abs(snapped_start - start) <= app.EXPORT_SNAP_MAX_SECONDS
+        assert abs(snapped_end - end) <= app.EXPORT_SNAP_MAX_SECONDS
+        assert snapped_end > snapped_start
+
+
+def test_snapped_export_cuts_on_the_keyframe(app, add_job, tmp_path, monkeypatch):
+    export = {'status': 'running', 'total': 1, 'done': 0, 'failed': 0,
+              'clips': {'c': {'status': 'queued', 'start_time': 4.2, 'end_time': 9.4}}}
+    add_job('snapped', status='completed', export=export)
+    out = tmp_path / 'c.mp4'
+
+    def fake_ffmpeg(cmd, **kwargs):
+        out.write_bytes(b'clip')
+        return type('Proc', (), {'returncode': 0, 'stderr': ''})()
+
+    monkeypatch.setattr(app.subprocess, 'run', fake_ffmpeg)
+    clip = {'id': 'c', 'start_time': 4.2, 'end_time': 9.4}
+
+    app._export_clip('snapped', 'source.mp4', clip, str(out), 'auto', PROBE['keyframes'], snap=True)
+
+    state = app._job_snapshot('snapped')['export']['clips']['c']
+    assert (state['status'], state['method']) == ('done', 'copy')
+    assert (state['cut_start'], state['cut_end']) == (5.0, 10.0)
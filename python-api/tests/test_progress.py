@@ -0,0 +1,81 @@
+"""Progress publisher: unchanged values are dropped, writes are rate-limited per job and coalesced."""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def interval(app, monkeypatch):
+    monkeypatch.setattr(app, 'JOB_PROGRESS_MIN_INTERVAL', 0.2)
+    return 0.2
+
+
+def _version(app, job_id):
+    return app._job_snapshot(job_id)['version']
+
+
+def test_unchanged_values_are_dropped(app, add_job, interval):
+    add_job('same', status='downloading')
+    app._publish_job_status('same', 'downloading', 10, 'Downloading')
+    version = _version(app, 'same')
+    dropped = app._progress_stats['dropped_unchanged']
+
+    for _ in range(5):
+        app._publish_job_status('same', 'downloading', 10, 'Downloading')
+
+    assert _version(app, 'same') == version
+    assert app._progress_stats['dropped_unchanged'] == dropped + 5
+
+
+def test_writes_are_rate_limited_and_the_latest_value_wins(app, add_job, interval):
+    add_job('busy', status='downloading')
+    app._publish_job_status('busy', 'downloading', 1, 'Downloading')
+    version = _version(app, 'busy')
+
+    for progress in range(2, 30):
+        app._publish_job_status('busy', 'downloading', progress, 'Downloading')
+    # Everything inside the interval is held back...
+    assert _version(app, 'busy') == version
+    time.sleep(interval * 2)
+
+    # ...and flushed as one write of the latest value
+    snapshot = app._job_snapshot('busy')
+    assert snapshot['version'] == version + 1
+    assert snapshot['progress'] == 29
+
+
+def test_jobs_are_rate_limited_independently(app, add_job, interval):
+    add_job('one', status='downloading')
+    add_job('two', status='downloading')
+    app._publish_job_status('one', 'downloading', 1, 'Downloading')
+    version = _version(app, 'two')
+
+    app._publish_job_status('two', 'downloading', 1, 'Downloading')
+
+    assert _version(app, 'two') == version + 1
+
+
+def test_direct_writes_beat_pending_values(app, add_job, interval):
+    add_job('done', status='downloading')
+    app._publish_job_status('done', 'downloading', 1, 'Downloading')
+    app._publish_job_status('done', 'downloading', 2, 'Downloading')
+
+    app.update_job_status('done', 'completed', 100, 'Done')
+    time.sleep(interval * 2)
+
+    snapshot = app._job_snapshot('done')
+    assert (snapshot['status'], snapshot['progress']) == ('completed', 100)
+    # Late hooks never reopen a finished job
+    app._publish_job_status('done', 'downloading', 3, 'Downloading')
+    assert app._job_snapshot('done')['status'] == 'completed'
+
+
+def test_branches_are_coalesced_separately(app, add_job, interval):
+    add_job('branches', status='processing')
+    app._publish_job_status('branches', 'processing', 1, 'Working')
+    for percent in range(10):
+        app._publish_branch('branches', 'video', progress=percent)
+        app._publish_branch('branches', 'audio', progress=percent * 2)
+    time.sleep(interval * 2)
+
+    assert app._job_snapshot('branches')['branches'] == {'video': {'progress': 9}, 'audio': {'progress': 18}}
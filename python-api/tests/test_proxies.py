@@ -0,0 +1,62 @@
+"""Preview proxies: a faststart, downscaled H.264 copy written next to the original and recorded on the job."""
+import re
+import shutil
+import subprocess
+
+import pytest
+
+needs_ffmpeg = pytest.mark.skipif(not shutil.which('ffmpeg'), reason='needs ffmpeg')
+
+
+@pytest.fixture
+def original(app, downloads_root, monkeypatch):
+    monkeypatch.setattr(app, 'PREVIEW_PROXY_HEIGHT', 90)
+    job_dir = downloads_root / 'yt-process-proxy'
+    job_dir.mkdir()
+    return job_dir / 'video.mp4'
+
+
+@needs_ffmpeg
+def test_proxy_is_downscaled_and_faststart(app, original):
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc=size=320x180:rate=10:duration=2',
+                    '-f', 'lavfi', '-i', 'sine=duration=2', '-c:v', 'libx264', '-c:a', 'aac', '-pix_fmt', 'yuv420p',
+                    str(original)], check=True)
+
+    proxy = app._generate_preview_proxy(str(original))
+
+    assert proxy == str(original.parent / 'video.proxy.mp4')
+    assert sorted(p.name for p in original.parent.iterdir()) == ['video.mp4', 'video.proxy.mp4']
+    info = subprocess.run(['ffmpeg', '-hide_banner', '-i', proxy], capture_output=True, text=True).stderr
+    assert re.search(r'Video: h264.*\b160x90\b', info)
+    assert 'Audio: aac' in info
+    data = open(proxy, 'rb').read()
+    # faststart: the index comes before the media data
+    assert data.index(b'moov') < data.index(b'mdat')
+
+
+def test_fresh_proxy_is_reused(app, original, monkeypatch):
+    original.write_bytes(b'video')
+    proxy = original.parent / 'video.proxy.mp4'
+    proxy.write_bytes(b'proxy')
+    monkeypatch.setattr(app.subprocess, 'run', lambda *a, **k: pytest.fail('encoded again'))
+
+    assert app._generate_preview_proxy(str(original)) == str(proxy)
+
+
+@needs_ffmpeg
+def test_failed_encode_leaves_nothing_behind(app, original):
+    original.write_bytes(b'not a video')
+
+    with pytest.raises(RuntimeError):
+        app._generate_preview_proxy(str(original))
+
+    assert [p.name for p in original.parent.iterdir()] == ['video.mp4']
+
+
+def test_finished_proxy_is_recorded_on_the_job_and_its_result(app, add_job):
+    add_job('proxied', status='completed', video={'path': '/v.mp4'}, result={'temp_video_path': '/v.mp4', 'proxy_video_path': None})
+
+    app._set_job_proxy('proxied', '/v.proxy.mp4')
+
+    assert app.jobs['proxied']['result']['proxy_video_path'] == '/v.proxy.mp4'
+    assert app._job_snapshot('proxied')['video'] == {'path': '/v.mp4', 'proxy_path': '/v.proxy.mp4'}
@@ -0,0 +1,86 @@
+"""Job scheduler: priority order within a stage, queue positions, admission control."""
+import pytest
+
+
+@pytest.fixture
+def scheduler(app, monkeypatch):
+    """Fresh stage queues with no workers draining them, so the queue contents can be inspected."""
+    monkeypatch.setattr(app, '_stage_queues', {'download': app._StageQueue(), 'transcribe': app._StageQueue()})
+    monkeypatch.setattr(app, '_ensure_stage_workers', lambda: None)
+    monkeypatch.setattr(app, 'YT_DLP_AVAILABLE', True)
+    monkeypatch.setattr(app, 'CLIPSAI_AVAILABLE', True)
+    created = []
+    yield created
+    with app.jobs_lock:
+        for job_id in created:
+            app.jobs.pop(job_id, None)
+
+
+def _submit(client, scheduler, **body):
+    response = client.post('/youtube/process', json={'url': 'https://youtube.com/watch?v=x', **body})
+    if response.status_code == 200:
+        scheduler.append(response.get_json()['job_id'])
+    return response
+
+
+def _drain(q):
+    order = []
+    while not q.empty():
+        order.append(q.get_nowait()[2])
+    return order
+
+
+def test_higher_priority_runs_first_fifo_within_priority(app, client, scheduler):
+    low = _submit(client, scheduler, priority=-1).get_json()['job_id']
+    first = _submit(client, scheduler).get_json()['job_id']
+    second = _submit(client, scheduler).get_json()['job_id']
+    urgent = _submit(client, scheduler, priority=5).get_json()['job_id']
+
+    assert _drain(app._stage_queues['download']) == [urgent, first, second, low]
+
+
+def test_priority_is_clamped(app):
+    assert app._youtube_job_options({'priority': 1000})['priority'] == 10
+    assert app._youtube_job_options({'priority': 'high'})['priority'] == 0
+
+
+def test_status_reports_queue_position_and_wait(app, client, scheduler):
+    first = _submit(client, scheduler).get_json()
+    second = _submit(client, scheduler).get_json()
+    assert (first['queue_position'], second['queue_position']) == (1, 2)
+
+    status = client.get(f"/jobs/{second['job_id']}/status").get_json()
+
+    assert status['stage'] == 'download'
+    assert status['queue_position'] == 2
+    assert status['queue_wait_seconds'] >= 0
+    assert status['queue_eta_seconds'] is not None
+
+
+def test_queue_positions_follow_queue_changes(app):
+    q = app._StageQueue()
+    for seq, (priority, job_id) in enumerate([(0, 'a'), (0, 'b')]):
+        q.put((-priority, seq, job_id))
+    assert (q.position('a'), q.position('b'), q.position('other')) == (1, 2, None)
+    positions = q._positions
+    # Status requests between queue changes reuse the same positions
+    q.position('b')
+    assert q._positions is positions
+
+    q.put((-5, 2, 'urgent'))
+    assert [q.position(job_id) for job_id in ('urgent', 'a', 'b')] == [1, 2, 3]
+    q.get_nowait()
+    assert [q.position(job_id) for job_id in ('urgent', 'a', 'b')] == [None, 1, 2]
+
+
+def test_full_queue_answers_429_with_retry_after(app, client, scheduler, monkeypatch):
+    monkeypatch.setattr(app, 'MAX_QUEUE_DEPTH', 2)
+    assert _submit(client, scheduler).status_code == 200
+    assert _submit(client, scheduler).status_code == 200
+
+    response = _submit(client, scheduler)
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['retry_after'] == int(response.headers['Retry-After'])
+    assert len(scheduler) == 2
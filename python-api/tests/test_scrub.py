@@ -0,0 +1,59 @@
+"""Scrub assets: one ffmpeg pass gives sprite sheets and waveform peaks, also for videos without audio."""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason='needs ffmpeg and ffprobe')
+
+
+def _make_video(path, audio: bool, seconds=3):
+    cmd = ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f'testsrc=size=320x180:rate=10:duration={seconds}']
+    if audio:
+        cmd += ['-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}', '-c:a', 'aac']
+    cmd += ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', str(path)]
+    subprocess.run(cmd, check=True)
+    return str(path)
+
+
+@pytest.fixture
+def videos(downloads_root):
+    job_dir = downloads_root / 'yt-process-scrub'
+    job_dir.mkdir()
+    return job_dir
+
+
+def test_video_with_audio(app, videos):
+    path = _make_video(videos / 'talk.mp4', audio=True)
+
+    manifest = app._generate_scrub_assets(path)
+
+    assert manifest['sprites']['sheets'] == ['sprite-001.jpg']
+    assert manifest['sprites']['count'] == 2
+    with open(os.path.join(app._scrub_dir(path), 'waveform.json')) as f:
+        waveform = json.load(f)
+    assert waveform['count'] == len(waveform['peaks'])
+    assert abs(waveform['count'] - 3 * app.WAVEFORM_PEAKS_PER_SECOND) <= app.WAVEFORM_PEAKS_PER_SECOND
+    assert 0 < max(waveform['peaks']) <= 100
+
+
+def test_silent_video_still_gets_sprites(app, videos):
+    path = _make_video(videos / 'silent.mp4', audio=False)
+
+    manifest = app._generate_scrub_assets(path)
+
+    assert manifest['sprites']['sheets'] == ['sprite-001.jpg']
+    assert manifest['waveform']['count'] == 0
+    assert app._load_scrub_manifest(path) == manifest
+
+
+def test_numpy_peaks_match_the_reference(app, monkeypatch):
+    pytest.importorskip('numpy')
+    pcm = bytes(range(256)) * 40
+    expected = app._pcm_peaks(pcm, 160)
+    monkeypatch.setattr(app, 'NUMPY_AVAILABLE', False)
+
+    assert app._pcm_peaks(pcm, 160) == expected
+    assert len(expected) == len(pcm) // 320
@@ -0,0 +1,160 @@
+"""Storage eviction: least-recently-used first, live artifacts skipped, hardlinks counted once."""
+import fcntl
+import os
+import time
+import uuid
+
+import pytest
+
+KB = 1024
+
+
+@pytest.fixture
+def storage(app, downloads_root, monkeypatch):
+    monkeypatch.setattr(app, 'STORAGE_QUOTA_BYTES', 0)
+    monkeypatch.setattr(app, 'STORAGE_MIN_FREE_BYTES', 0)
+    monkeypatch.setattr(app, 'STORAGE_MAX_AGE_SECONDS', 0)
+    monkeypatch.setattr(app, 'STORAGE_GRACE_SECONDS', 0)
+    return downloads_root
+
+
+def _artifact(path, size=10 * KB, age=0.0, name='video.mp4'):
+    """A directory artifact holding one file, last modified `age` seconds ago."""
+    path.mkdir(parents=True, exist_ok=True)
+    media = path / name
+    media.write_bytes(b'x' * size)
+    stamp = time.time() - age
+    os.utime(media, (stamp, stamp))
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def _evicted(result):
+    return [e['artifact'] for e in result['evicted']]
+
+
+def test_evicts_least_recently_used_first(app, storage):
+    _artifact(storage / 'yt-download-old', age=300)
+    _artifact(storage / 'yt-download-mid', age=200)
+    _artifact(storage / 'yt-download-new', age=100)
+    # 30 KB on disk, quota 25 KB: evict down to the 90% watermark (22.5 KB), i.e. one artifact
+    app.STORAGE_QUOTA_BYTES = 25 * KB
+
+    result = app._enforce_storage()
+
+    assert _evicted(result) == ['yt-download-old']
+    assert sorted(os.listdir(storage)) == ['yt-download-mid', 'yt-download-new']
+
+
+def test_reads_count_as_use(app, storage):
+    _artifact(storage / 'yt-download-a', age=300)
+    _artifact(storage / 'yt-download-b', age=200)
+    app._touch_artifact(str(storage / 'yt-download-a' / 'video.mp4'))
+    app.STORAGE_QUOTA_BYTES = 15 * KB
+
+    assert _evicted(app._enforce_storage()) == ['yt-download-b']
+
+
+def test_under_quota_evicts_nothing(app, storage):
+    _artifact(storage / 'yt-download-a', age=300)
+    app.STORAGE_QUOTA_BYTES = 100 * KB
+
+    assert _evicted(app._enforce_storage()) == []
+
+
+def test_grace_period_protects_fresh_artifacts(app, storage):
+    _artifact(storage / 'yt-download-fresh', age=1)
+    app.STORAGE_QUOTA_BYTES = 1 * KB
+    app.STORAGE_GRACE_SECONDS = 60
+
+    assert _evicted(app._enforce_storage()) == []
+
+
+def test_skips_live_jobs_and_pins(app, storage, add_job):
+    running = _artifact(storage / 'yt-process-running', age=400)
+    _artifact(storage / 'yt-process-done', age=300)
+    pinned = _artifact(storage / 'yt-download-pinned', age=350)
+    add_job('running', status='processing', download_dir=str(running))
+    add_job('done', status='completed', download_dir=str(storage / 'yt-process-done'))
+    app.STORAGE_QUOTA_BYTES = 1 * KB
+
+    with app._pin_artifact(str(pinned / 'video.mp4')):
+        result = app._enforce_storage()
+
+    assert _evicted(result) == ['yt-process-done']
+    assert running.exists() and pinned.exists()
+    # The owner is told its files are gone
+    assert app.jobs['done'].get('storage_evicted_at')
+
+
+def test_skips_uploads_still_receiving_chunks(app, storage):
+    live, done = uuid.uuid4().hex, uuid.uuid4().hex
+    uploading = _artifact(storage / 'uploads' / live, age=300, name='data.part')
+    (uploading / 'meta.json').write_text('{"status": "uploading"}')
+    finished = _artifact(storage / 'uploads' / done, age=300, name='data.mp4')
+    (finished / 'meta.json').write_text('{"status": "completed"}')
+    app.STORAGE_QUOTA_BYTES = 1 * KB
+
+    assert _evicted(app._enforce_storage()) == [os.path.join('uploads', done)]
+
+
+def test_hardlinks_free_space_only_with_the_last_link(app, storage):
+    cache = _artifact(storage / '.cache' / 'youtube' / 'yt-abc', age=300)
+    job = storage / 'yt-download-linked'
+    job.mkdir()
+    os.link(cache / 'video.mp4', job / 'video.mp4')
+    os.utime(job, (time.time() - 200, time.time() - 200))
+
+    scan = app._scan_storage()
+    assert scan['total_bytes'] == 10 * KB
+
+    app.STORAGE_QUOTA_BYTES = 5 * KB
+    result = app._enforce_storage()
+
+    # The cache entry goes first but frees nothing while the job still links the file
+    assert [e['freed_bytes'] for e in result['evicted']] == [0, 10 * KB]
+    assert result['total_bytes'] == 0
+
+
+def test_partial_with_held_lock_is_skipped(app, storage):
+    root = storage / '.cache' / 'youtube'
+    for key in ('free', 'held'):
+        _artifact(root / f'.partial-{key}', age=300, name='video.mp4.part')
+        lock = root / f'.partial-{key}.lock'
+        lock.touch()
+        os.utime(lock, (time.time() - 300, time.time() - 300))
+    # The lock file is part of its staging dir, not an artifact of its own
+    assert str(root / '.partial-free.lock') not in app._scan_storage()['artifacts']
+
+    app.STORAGE_QUOTA_BYTES = 1 * KB
+    with open(root / '.partial-held.lock', 'a') as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        result = app._enforce_storage()
+
+    assert _evicted(result) == [os.path.join('.cache', 'youtube', '.partial-free')]
+    assert (root / '.partial-held').exists()
+    assert (root / '.partial-free.lock').exists()
+
+
+def test_references_are_built_once_and_claims_rechecked(app, storage, monkeypatch):
+    for name, age in (('a', 400), ('b', 300), ('c', 200)):
+        _artifact(storage / f'yt-download-{name}', age=age)
+    app.STORAGE_QUOTA_BYTES = 1 * KB
+    calls = []
+    referenced = app._referenced_artifacts
+
+    def once(*args):
+        calls.append(1)
+        refs = referenced(*args)
+        # A download pins b right after the reference set was built
+        app._acquire_artifact(str(storage / 'yt-download-b' / 'video.mp4'))
+        return refs
+
+    monkeypatch.setattr(app, '_referenced_artifacts', once)
+    try:
+        result = app._enforce_storage()
+    finally:
+        app._release_artifact(str(storage / 'yt-download-b' / 'video.mp4'))
+
+    assert calls == [1]
+    assert _evicted(result) == ['yt-download-a', 'yt-download-c']
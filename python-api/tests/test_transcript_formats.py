@@ -0,0 +1,83 @@
+"""Transcript encodings: dict-per-word by default, columnar and packed on request, JSON or msgpack bodies."""
+import array
+import base64
+
+import pytest
+
+WORDS = [
+    {'start_char': 0, 'end_char': 5, 'start_time': 0.25, 'end_time': 0.5, 'text': 'hello'},
+    {'start_char': 6, 'end_char': 11, 'start_time': 0.75, 'end_time': 1.125, 'text': 'world'},
+    {'start_char': 12, 'end_char': 15, 'start_time': 3600.5, 'end_time': 3601.0, 'text': 'bye'},
+]
+NUMERIC = (('start_char', 'i'), ('end_char', 'i'), ('start_time', 'f'), ('end_time', 'f'))
+
+
+def _unpack(raw, typecode):
+    values = array.array(typecode)
+    values.frombytes(raw)
+    return values.tolist()
+
+
+def _rows(columns, decode=lambda raw, typecode: raw):
+    """Columnar/packed arrays back to the dict-per-word shape."""
+    numeric = {key: decode(columns[key], typecode) for key, typecode in NUMERIC}
+    return [
+        {**{key: values[i] for key, values in numeric.items()}, 'text': columns['text'][i]}
+        for i in range(columns['count'])
+    ]
+
+
+@pytest.fixture
+def completed(add_job):
+    result = {'video': {'id': 'v'}, 'transcript': {'text': 'hello world bye', 'words': WORDS}}
+    add_job('formats', status='completed', progress=100, result=result)
+    return '/jobs/formats/status'
+
+
+def test_default_is_dict_per_word(client, completed):
+    response = client.get(completed)
+
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.get_json()['result']['transcript']['words'] == WORDS
+
+
+def test_columnar_round_trip(client, completed):
+    words = client.get(completed, query_string={'transcript_format': 'columnar'}).get_json()['result']['transcript']['words']
+
+    assert words['format'] == 'columnar'
+    assert _rows(words) == WORDS
+
+
+def test_packed_json_round_trip(client, completed):
+    words = client.get(completed, query_string={'transcript_format': 'packed'}).get_json()['result']['transcript']['words']
+
+    assert words['dtypes'] == {'start_char': 'int32', 'end_char': 'int32', 'start_time': 'float32', 'end_time': 'float32'}
+    # These times are exact in float32; others round to ~7 significant digits
+    assert _rows(words, lambda raw, typecode: _unpack(base64.b64decode(raw), typecode)) == WORDS
+
+
+@pytest.mark.parametrize('request_kwargs', [
+    {'query_string': {'transcript_format': 'packed', 'format': 'msgpack'}},
+    {'query_string': {'transcript_format': 'packed'}, 'headers': {'Accept': 'application/x-msgpack'}},
+])
+def test_packed_msgpack_round_trip(client, completed, request_kwargs):
+    msgpack = pytest.importorskip('msgpack')
+
+    response = client.get(completed, **request_kwargs)
+
+    assert response.headers['Content-Type'] == 'application/x-msgpack'
+    assert response.headers['Vary'] == 'Accept'
+    words = msgpack.unpackb(response.data, raw=False)['result']['transcript']['words']
+    assert isinstance(words['start_time'], bytes)
+    assert _rows(words, _unpack) == WORDS
+
+
+def test_browser_accept_header_gets_json(client, completed):
+    response = client.get(completed, headers={'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8'})
+
+    assert response.headers['Content-Type'] == 'application/json'
+
+
+@pytest.mark.parametrize('query', [{'transcript_format': 'csv'}, {'format': 'xml'}])
+def test_unknown_formats(client, completed, query):
+    assert client.get(completed, query_string=query).status_code == 400
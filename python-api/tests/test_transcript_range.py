@@ -0,0 +1,92 @@
+"""/jobs/<id>/transcript: time and char windows, pagination and index rebuilds when the transcript changes."""
+import pytest
+
+TEXT = 'zero one two three four'
+
+
+def _words(text, seconds_per_word=1.0):
+    words, start = [], 0
+    for i, token in enumerate(text.split()):
+        start = text.index(token, start)
+        words.append({'start_char': start, 'end_char': start + len(token),
+                      'start_time': i * seconds_per_word, 'end_time': (i + 1) * seconds_per_word, 'text': token})
+        start += len(token)
+    return words
+
+
+@pytest.fixture
+def transcript(client, add_job):
+    add_job('ranged', status='completed', progress=100, result={'transcript': {'words': _words(TEXT), 'transcription': TEXT}})
+
+    def _get(**query):
+        response = client.get('/jobs/ranged/transcript', query_string=query)
+        assert response.status_code == 200
+        return response.get_json()
+
+    return _get
+
+
+def _texts(payload):
+    return [w['text'] for w in payload['transcript']['words']]
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    # Words are [i, i+1): a word ending exactly at the window start, or starting at its end, is outside
+    (1.0, 2.0, ['one']),
+    (0.5, 1.5, ['zero', 'one']),
+    (1.0, 1.0001, ['one']),
+    (4.0, 10.0, ['four']),
+    (5.0, 10.0, []),
+])
+def test_time_window_edges(transcript, start, end, expected):
+    assert _texts(transcript(start_time=start, end_time=end)) == expected
+
+
+def test_open_ended_windows(transcript):
+    assert _texts(transcript(start_time=3)) == ['three', 'four']
+    assert _texts(transcript(end_time=1.5)) == ['zero', 'one']
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (5, 8, ['one']),  # 'one' is chars [5, 8)
+    (4, 9, ['one']),  # the spaces at 4 and 8 belong to no word, and 'two' starts at the exclusive end
+    (7, 10, ['one', 'two']),
+])
+def test_char_window_edges(transcript, start, end, expected):
+    payload = transcript(start_char=start, end_char=end)
+
+    assert _texts(payload) == expected
+    # The text spans exactly the returned words
+    assert payload['transcript']['transcription'] == TEXT[payload['transcript']['words'][0]['start_char']:
+                                                          payload['transcript']['words'][-1]['end_char']]
+
+
+def test_pages_through_a_window(transcript):
+    first = transcript(start_time=0.5, limit=2)
+    second = transcript(start_time=0.5, limit=2, cursor=first['next_cursor'])
+
+    assert (_texts(first), _texts(second)) == (['zero', 'one'], ['two', 'three'])
+    assert _texts(transcript(start_time=0.5, limit=2, cursor=second['next_cursor'])) == ['four']
+    assert first['total_words'] == 5
+
+
+def test_index_is_rebuilt_when_the_transcript_changes(app, transcript, add_job):
+    assert _texts(transcript(start_time=0, end_time=1)) == ['zero']
+    cached = app._job_transcript_index('ranged')
+    assert app._job_transcript_index('ranged') is cached
+
+    # The job was processed again: its result now holds another word list
+    text = 'alpha beta'
+    app.update_job_fields('ranged', {'result': {'transcript': {'words': _words(text, 0.5), 'transcription': text}}})
+
+    assert _texts(transcript(start_time=0, end_time=1)) == ['alpha', 'beta']
+    assert transcript()['total_words'] == 2
+
+
+def test_analysis_words_are_served_before_completion(app, client, add_job):
+    add_job('analyzing', status='processing')
+    assert client.get('/jobs/analyzing/transcript').status_code == 409
+
+    app.update_job_fields('analyzing', {'analysis': {'words': _words(TEXT), 'transcription': TEXT}})
+
+    assert _texts(client.get('/jobs/analyzing/transcript', query_string={'end_time': 1}).get_json()) == ['zero']
@@ -0,0 +1,119 @@
+"""Transcription cache: keyed by the audio's content plus the model settings, LRU-bounded on disk."""
+import collections
+import contextlib
+import json
+import shutil
+import types
+
+import pytest
+
+
+class FakeTranscription:
+    """The parts of a ClipsAI Transcription the pipeline and the cache touch."""
+
+    def __init__(self, text):
+        self.text = text
+        self.words = []
+        for token in text.split():
+            start = text.index(token, self.words[-1].end_char if self.words else 0)
+            self.words.append(types.SimpleNamespace(
+                text=token, start_char=start, end_char=start + len(token),
+                start_time=start / 10, end_time=(start + len(token)) / 10,
+            ))
+
+    def store_as_json_file(self, path):
+        with open(path, 'w') as f:
+            json.dump({'text': self.text}, f)
+
+
+@pytest.fixture
+def cache(app, tmp_path, monkeypatch):
+    """A private cache dir and a fake transcriber; returns the list of files it transcribed."""
+    monkeypatch.setattr(app, 'TRANSCRIPTION_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(app, 'TRANSCRIPTION_CACHE_MAX_MB', 10)
+    monkeypatch.setattr(app, '_transcription_cache_index', None)
+    monkeypatch.setattr(app, '_transcription_cache_stats', collections.Counter())
+    monkeypatch.setattr(app, '_audio_hash_memo', {})
+    monkeypatch.setattr(app, '_plan_transcription_chunks', lambda path: None)
+    monkeypatch.setattr(app, '_restore_transcription', lambda path: FakeTranscription(json.load(open(path))['text']))
+    transcribed = []
+
+    class Transcriber:
+        def transcribe(self, audio_file_path, **kwargs):
+            transcribed.append(audio_file_path)
+            return FakeTranscription('hello cached world')
+
+    @contextlib.contextmanager
+    def lease(name):
+        yield Transcriber()
+
+    monkeypatch.setattr(app, '_lease_model', lease)
+    return transcribed
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / 'a.mp4'
+    path.write_bytes(b'not really a video' * 100)
+    return str(path)
+
+
+def test_hit_skips_transcription_and_rebuilds_the_payload(app, cache, media):
+    _, words, text = app._transcribe_with_cache(media)
+    transcription, cached_words, cached_text = app._transcribe_with_cache(media)
+
+    assert cache == [media]
+    assert (cached_words, cached_text) == (words, text) == (app._words_payload(transcription), 'hello cached world')
+    stats = app._transcription_cache_snapshot()
+    assert (stats['hits'], stats['misses'], stats['stores'], stats['entries']) == (1, 1, 1, 1)
+
+
+def test_same_audio_under_another_name_hits(app, cache, media, tmp_path):
+    copy = str(tmp_path / 'b.mp4')
+    shutil.copy(media, copy)
+
+    app._transcribe_with_cache(media)
+    app._transcribe_with_cache(copy)
+
+    assert cache == [media]
+
+
+@pytest.mark.parametrize('setting, value', [('TRANSCRIBER_MODEL_SIZE', 'large-v3'), ('TRANSCRIBE_LANGUAGE', 'pt')])
+def test_model_settings_are_part_of_the_key(app, cache, media, monkeypatch, setting, value):
+    app._transcribe_with_cache(media)
+    monkeypatch.setattr(app, setting, value)
+
+    app._transcribe_with_cache(media)
+    app._transcribe_with_cache(media)
+
+    assert cache == [media, media]
+
+
+def test_least_recently_used_entries_are_evicted(app, cache, tmp_path):
+    paths = []
+    for name in ('a', 'b', 'c'):
+        path = tmp_path / f'{name}.wav'
+        path.write_bytes(name.encode() * 100)
+        paths.append(str(path))
+    app._transcribe_with_cache(paths[0])
+    entry_bytes = app._transcription_cache_snapshot()['size_bytes']
+    # Room for two entries
+    app.TRANSCRIPTION_CACHE_MAX_MB = 2.5 * entry_bytes / 1024 / 1024
+
+    app._transcribe_with_cache(paths[1])
+    app._transcribe_with_cache(paths[0])  # a is now the most recently used
+    app._transcribe_with_cache(paths[2])  # evicts b
+    app._transcribe_with_cache(paths[0])
+    app._transcribe_with_cache(paths[1])
+
+    assert cache == [paths[0], paths[1], paths[2], paths[1]]
+    assert app._transcription_cache_snapshot()['evictions'] == 2
+
+
+def test_disabled_cache(app, cache, media, monkeypatch):
+    monkeypatch.setattr(app, 'TRANSCRIPTION_CACHE_MAX_MB', 0)
+
+    app._transcribe_with_cache(media)
+    app._transcribe_with_cache(media)
+
+    assert cache == [media, media]
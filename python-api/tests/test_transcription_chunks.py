@@ -0,0 +1,103 @@
+"""Chunked transcription: silence-aligned split plan and stitching of per-chunk ClipsAI dumps."""
+import pytest
+
+
+def _dump(words, language='en', num_speakers=1):
+    """A ClipsAI JSON dump for [(text, start, end), ...] with times relative to the chunk's audio."""
+    char_info = []
+    for text, start, end in words:
+        if char_info:
+            char_info.append({'char': ' ', 'start_time': None, 'end_time': None, 'speaker': 0})
+        step = (end - start) / len(text)
+        for i, ch in enumerate(text):
+            char_info.append({'char': ch, 'start_time': start + i * step, 'end_time': start + (i + 1) * step, 'speaker': 0})
+    return {
+        'source_software': 'whisperx',
+        'time_created': '2024-01-01 00:00:00',
+        'language': language,
+        'num_speakers': num_speakers,
+        'char_info': char_info,
+    }
+
+
+def _words(char_info):
+    """(text, start_char, end_char, start_time) per word, the way ClipsAI derives words from char_info."""
+    words, start = [], None
+    for i, ch in enumerate(char_info + [{'char': ' '}]):
+        if ch['char'] != ' ' and start is None:
+            start = i
+        elif ch['char'] == ' ' and start is not None:
+            text = ''.join(c['char'] for c in char_info[start:i])
+            words.append((text, start, i, char_info[start]['start_time']))
+            start = None
+    return words
+
+
+@pytest.fixture
+def stitched(app):
+    # Nominal ranges [0, 300), [300, 600), [600, 900]; chunks after the first start 2s early
+    chunks = [
+        (0.0, 300.0, 0.0, _dump([('hello', 0.5, 1.0), ('before', 299.0, 299.5), ('cut', 300.0, 300.4)])),
+        (300.0, 600.0, 298.0, _dump([('before', 1.0, 1.5), ('cut', 2.0, 2.4), ('middle', 150.0, 150.6),
+                                     ('late', 303.5, 303.9)], language='pt', num_speakers=2)),
+        (600.0, 900.0, 598.0, _dump([('late', 3.5, 3.9), ('bye', 250.0, 250.3)])),
+    ]
+    return app._stitch_chunk_transcriptions(chunks)
+
+
+def test_each_word_is_kept_once_with_shifted_times(stitched):
+    words = _words(stitched['char_info'])
+
+    assert [(text, round(start, 3)) for text, _, _, start in words] == [
+        ('hello', 0.5), ('before', 299.0), ('cut', 300.0), ('middle', 448.0), ('late', 601.5), ('bye', 848.0),
+    ]
+    starts = [start for *_, start in words]
+    assert starts == sorted(starts)
+
+
+def test_char_offsets_line_up_with_the_text(app, stitched):
+    char_info = stitched['char_info']
+    text = ''.join(c['char'] for c in char_info)
+    words = [{'text': w, 'start_char': s, 'end_char': e} for w, s, e, _ in _words(char_info)]
+
+    assert text == 'hello before cut middle late bye'
+    assert app._extract_transcription_text({'words': words}) == text
+    for word in words:
+        assert text[word['start_char']:word['end_char']] == word['text']
+
+
+def test_top_level_fields(stitched):
+    assert set(stitched) == {'source_software', 'time_created', 'language', 'num_speakers', 'char_info'}
+    assert stitched['source_software'] == 'whisperx'
+    assert stitched['language'] == 'en'
+    assert stitched['num_speakers'] == 2
+
+
+@pytest.fixture
+def plan(app, monkeypatch):
+    monkeypatch.setattr(app, 'CHUNKED_TRANSCRIPTION', True)
+    monkeypatch.setattr(app, 'CHUNKED_TRANSCRIPTION_MIN_SECONDS', 1200.0)
+    monkeypatch.setattr(app, 'TRANSCRIBE_CHUNK_SECONDS', 300.0)
+
+    def _plan(duration, silences):
+        monkeypatch.setattr(app, '_detect_silences', lambda path: (duration, silences))
+        return app._plan_transcription_chunks('media.mp4')
+
+    return _plan
+
+
+def test_plan_cuts_at_the_nearest_silence(plan):
+    # 180s loses to the closer 295.5s; nothing is within +-20% of 911s, so that cut is a hard one
+    silences = [(180.0, 181.0), (295.0, 296.0), (420.0, 421.0), (610.0, 612.0)]
+
+    assert plan(1250.0, silences) == [(0.0, 295.5), (295.5, 611.0), (611.0, 911.0), (911.0, 1250.0)]
+
+
+def test_short_or_undetectable_media_is_not_chunked(app, plan, monkeypatch):
+    assert plan(1100.0, []) is None
+
+    def fail(path):
+        raise RuntimeError('no audio')
+
+    monkeypatch.setattr(app, '_detect_silences', fail)
+    assert app._plan_transcription_chunks('media.mp4') is None
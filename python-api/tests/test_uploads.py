@@ -0,0 +1,152 @@
+"""Resumable uploads: offset checks, resume after a restart, sha256 on finalize, on-disk naming."""
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+BODY = os.urandom(300 * 1024)
+
+
+@pytest.fixture
+def upload(client, downloads_root):
+    def _create(**fields):
+        response = client.post('/uploads', json={'filename': 'clip.mp4', 'size': len(BODY), **fields})
+        assert response.status_code == 201
+        return response.get_json()['upload_id']
+    return _create
+
+
+def _patch(client, upload_id, offset, chunk):
+    return client.patch(f'/uploads/{upload_id}', data=chunk, headers={'Upload-Offset': str(offset)})
+
+
+def test_chunks_then_finalize(client, upload):
+    upload_id = upload()
+    assert _patch(client, upload_id, 0, BODY[:100_000]).headers['Upload-Offset'] == '100000'
+    assert _patch(client, upload_id, 100_000, BODY[100_000:]).status_code == 200
+
+    response = client.post(f'/uploads/{upload_id}/finalize', json={'sha256': hashlib.sha256(BODY).hexdigest()})
+
+    assert response.status_code == 200
+    meta = response.get_json()
+    assert meta['status'] == 'complete'
+    assert meta['sha256'] == hashlib.sha256(BODY).hexdigest()
+    with open(meta['path'], 'rb') as f:
+        assert f.read() == BODY
+    # Finalizing twice is a no-op
+    assert client.post(f'/uploads/{upload_id}/finalize').get_json()['path'] == meta['path']
+
+
+def test_wrong_offset_reports_where_to_resume(client, upload):
+    upload_id = upload()
+    _patch(client, upload_id, 0, BODY[:1000])
+
+    response = _patch(client, upload_id, 5000, BODY[5000:6000])
+
+    assert response.status_code == 409
+    assert response.headers['Upload-Offset'] == '1000'
+    assert client.get(f'/uploads/{upload_id}').get_json()['offset'] == 1000
+
+
+def test_resume_rebuilds_hash_after_restart(app, client, upload):
+    upload_id = upload()
+    _patch(client, upload_id, 0, BODY[:1000])
+    # A restart loses the in-memory running hash
+    app._upload_states.clear()
+    _patch(client, upload_id, 1000, BODY[1000:])
+
+    response = client.post(f'/uploads/{upload_id}/finalize')
+
+    assert response.get_json()['sha256'] == hashlib.sha256(BODY).hexdigest()
+
+
+def test_finalize_rejects_incomplete_and_mismatched(client, upload):
+    upload_id = upload()
+    _patch(client, upload_id, 0, BODY[:1000])
+    assert client.post(f'/uploads/{upload_id}/finalize').status_code == 409
+
+    _patch(client, upload_id, 1000, BODY[1000:])
+    response = client.post(f'/uploads/{upload_id}/finalize', json={'sha256': '0' * 64})
+
+    assert response.status_code == 422
+    assert client.get(f'/uploads/{upload_id}').get_json()['status'] == 'uploading'
+
+
+def test_oversized_chunk_is_rejected(client, upload):
+    upload_id = upload(size=1000)
+
+    response = _patch(client, upload_id, 0, BODY[:2000])
+
+    assert response.status_code == 413
+    # Nothing past the declared size is kept; the client resumes from the reported offset
+    assert response.get_json()['offset'] == 0
+    assert client.get(f'/uploads/{upload_id}').get_json()['offset'] == 0
+    assert _patch(client, upload_id, 0, BODY[:1000]).status_code == 200
+
+
+@pytest.mark.parametrize('filename, stored', [
+    ('meta.json', 'data.mp4'),
+    ('../../etc/passwd', 'data.mp4'),
+    ('talk.MOV', 'data.mov'),
+    ('song.wav', 'data.wav'),
+])
+def test_client_filename_never_names_the_file(client, upload, filename, stored):
+    upload_id = upload(filename=filename, size=10)
+    _patch(client, upload_id, 0, BODY[:10])
+
+    meta = client.post(f'/uploads/{upload_id}/finalize').get_json()
+
+    assert os.path.basename(meta['path']) == stored
+    assert os.path.dirname(meta['path']).endswith(upload_id)
+    assert '/' not in meta['filename']
+    # meta.json is still the upload's metadata, not the uploaded bytes
+    assert client.get(f'/uploads/{upload_id}').get_json()['status'] == 'complete'
+
+
+def test_concurrent_finalize(app, client, upload):
+    upload_id = upload()
+    _patch(client, upload_id, 0, BODY)
+    responses = []
+
+    def _finalize():
+        responses.append(app.app.test_client().post(f'/uploads/{upload_id}/finalize'))
+
+    # Both calls read the (still uploading) meta and then queue up behind the upload's lock
+    state = app._upload_state(upload_id)
+    with state['lock']:
+        threads = [threading.Thread(target=_finalize) for _ in range(2)]
+        for t in threads:
+            t.start()
+        time.sleep(0.2)
+    for t in threads:
+        t.join()
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert len({r.get_json()['path'] for r in responses}) == 1
+
+
+def test_abandoned_uploads_expire(app, client, upload, monkeypatch):
+    monkeypatch.setattr(app, 'UPLOAD_EXPIRE_SECONDS', 3600)
+    stale, active, done = upload(), upload(), upload(size=10)
+    for upload_id in (stale, active):
+        _patch(client, upload_id, 0, BODY[:1000])
+    _patch(client, done, 0, BODY[:10])
+    client.post(f'/uploads/{done}/finalize')
+    old = time.time() - 7200
+    for upload_id in (stale, done):
+        os.utime(os.path.join(app._upload_dir(upload_id), 'meta.json'), (old, old))
+
+    upload()
+
+    assert client.get(f'/uploads/{stale}').status_code == 404
+    assert stale not in app._upload_states
+    assert client.get(f'/uploads/{active}').get_json()['offset'] == 1000
+    # Finalized uploads are left to the storage manager
+    assert client.get(f'/uploads/{done}').get_json()['status'] == 'complete'
+
+
+def test_unknown_upload(client, downloads_root):
+    assert client.get('/uploads/not-a-uuid').status_code == 404
+    assert client.patch('/uploads/' + 'a' * 32, data=b'x', headers={'Upload-Offset': '0'}).status_code == 404
@@ -0,0 +1,143 @@
+"""Several web processes on one store: every job route answers for jobs another process is running."""
+import json
+
+import pytest
+
+WORDS = [
+    {'start_char': 0, 'end_char': 5, 'start_time': 0.0, 'end_time': 1.0, 'text': 'hello'},
+    {'start_char': 6, 'end_char': 11, 'start_time': 1.0, 'end_time': 2.0, 'text': 'world'},
+]
+
+
+class _HeldPool:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'JOB_STORE_PATH', str(tmp_path / 'store' / 'jobs.sqlite3'))
+    monkeypatch.setattr(app, '_job_store', None)
+    monkeypatch.setattr(app, 'JOB_STORE_POLL_SECONDS', 0.05)
+    yield
+    if app._job_store is not None:
+        app._job_store.close()
+
+
+@pytest.fixture
+def elsewhere(app, store, add_job):
+    """Write a job the way another web process would: its row is in the store, the job isn't in this process."""
+    def _write(job_id, **fields):
+        add_job(job_id, **{**(app._stored_job(job_id) or {}), **fields})
+        app._persist_job(job_id)
+        with app.jobs_lock:
+            del app.jobs[job_id]
+            del app._job_states[job_id]
+
+    return _write
+
+
+@pytest.fixture
+def finished(app, elsewhere, downloads_root):
+    """A completed job run by another process, with its video and result checkpoint on the shared disk."""
+    video = downloads_root / 'yt-process-elsewhere' / 'video.mp4'
+    video.parent.mkdir()
+    video.write_bytes(b'video')
+    result = {'temp_video_path': str(video), 'temp_dir': str(video.parent),
+              'video': {'clips': [{'id': 'a', 'start_time': 0.0, 'end_time': 1.0}]},
+              'transcript': {'words': WORDS, 'transcription': 'hello world'}}
+    elsewhere('finished', status='completed', progress=100, video={'path': str(video)})
+    app._checkpoint_job('finished', 'result', result)
+    return video
+
+
+def _ids(response):
+    assert response.status_code == 200
+    return [job['job_id'] for job in response.get_json()['jobs']]
+
+
+def test_list_includes_jobs_of_other_processes(app, client, add_job, elsewhere):
+    elsewhere('other-1', status='completed')
+    add_job('mine', status='queued')
+    app._persist_job('mine')
+    elsewhere('other-2', status='queued')
+
+    assert _ids(client.get('/jobs')) == ['other-2', 'mine', 'other-1']
+    first = client.get('/jobs', query_string={'limit': 2}).get_json()
+    assert _ids(client.get('/jobs', query_string={'limit': 2, 'cursor': first['next_cursor']})) == ['other-1']
+    assert _ids(client.get('/jobs', query_string={'status': 'queued'})) == ['other-2', 'mine']
+
+
+def test_events_and_result_of_a_job_run_elsewhere(client, finished):
+    body = client.get('/jobs/finished/events').get_data(as_text=True)
+
+    done = [line for line in body.splitlines() if line.startswith('data: ')][-1]
+    assert 'event: done' in body
+    assert json.loads(done[len('data: '):])['result']['transcript']['transcription'] == 'hello world'
+    assert client.get('/jobs/finished/result').status_code == 200
+
+
+def test_transcript_follows_the_stored_checkpoints(app, client, elsewhere):
+    elsewhere('analyzing', status='processing')
+    assert client.get('/jobs/analyzing/transcript').status_code == 409
+
+    app._checkpoint_job('analyzing', 'analysis', {'words': WORDS, 'transcription': 'hello world'})
+    elsewhere('analyzing', progress=90)
+    words = client.get('/jobs/analyzing/transcript', query_string={'start_time': 1}).get_json()['transcript']['words']
+    assert [w['text'] for w in words] == ['world']
+
+    # The other process re-ran the analysis: a new stored version, so the index is rebuilt
+    app._checkpoint_job('analyzing', 'analysis', {'words': WORDS[:1], 'transcription': 'hello'})
+    elsewhere('analyzing', progress=95)
+    assert client.get('/jobs/analyzing/transcript').get_json()['total_words'] == 1
+
+
+def test_probe_uses_the_stored_video_path(app, client, finished, monkeypatch):
+    probed = []
+    monkeypatch.setattr(app, '_probe_media', lambda path: probed.append(path) or {'duration': 1.0, 'keyframes': [0.0]})
+
+    assert client.get('/jobs/finished/probe').status_code == 200
+    assert probed == [str(finished)]
+
+
+def test_export_is_claimed_once_across_processes(app, client, add_job, finished, monkeypatch):
+    pool = _HeldPool()
+    monkeypatch.setattr(app, '_get_export_pool', lambda: pool)
+    monkeypatch.setattr(app, '_video_keyframes', lambda path: [0.0])
+
+    assert client.post('/jobs/finished/export', json={}).status_code == 202
+    assert app._stored_job('finished')['export']['status'] == 'running'
+
+    # The process that ran the job still holds its copy, which never saw the export start
+    add_job('finished', **{**app._stored_job('finished'), 'export': None})
+    assert client.post('/jobs/finished/export', json={}).status_code == 409
+    # Its own writes keep the export another process is running
+    app.update_job_fields('finished', {'message': 'Done'})
+    assert app._stored_job('finished')['export']['status'] == 'running'
+
+    app._update_export('finished', 'a', status='done')
+    status = client.get('/jobs/finished/status').get_json()
+    assert (status['export']['status'], status['export']['done']) == ('completed', 1)
+    assert len(pool.submitted) == 1
+
+
+def test_storage_keeps_the_dirs_of_jobs_running_elsewhere(app, elsewhere, downloads_root):
+    running, done = downloads_root / 'yt-process-running', downloads_root / 'yt-process-done'
+    elsewhere('running', status='processing', download_dir=str(running))
+    elsewhere('done', status='completed', download_dir=str(done))
+
+    refs, owners = app._referenced_artifacts()
+
+    assert str(running) in refs and str(done) not in refs
+    assert owners[str(done)] == 'done'
+    assert app._artifact_claimed(str(running), 'running')
+    assert not app._artifact_claimed(str(done), 'done')
+
+
+@pytest.mark.parametrize('path', ['/jobs/missing/transcript', '/jobs/missing/probe', '/jobs/missing/crops',
+                                  '/jobs/missing/sprites', '/jobs/missing/waveform', '/jobs/missing/events'])
+def test_unknown_jobs_are_still_404(client, store, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,43 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { callPythonAPI } from '@/lib/python-api';
+
+// Aggregated progress/ETA of a batch plus each child's status and result summary
+export async function GET(
+    request: NextRequest,
+    { params }: { params: { batchId: string } }
+) {
+    try {
+        const batchId = params.batchId;
+
+        if (!batchId) {
+            return NextResponse.json(
+                { error: 'Batch ID is required' },
+                { status: 400 }
+            );
+        }
+
+        const batch = await callPythonAPI(`/batches/${batchId}`, {
+            method: 'GET',
+            cache: 'no-store',
+        });
+
+        return NextResponse.json(batch);
+    } catch (error: any) {
+        console.error('Error getting batch:', error);
+
+        if (error.message && error.message.includes('Python API não está rodando')) {
+            return NextResponse.json(
+                {
+                    error: error.message,
+                    suggestion: 'Inicie o servidor Python: cd python-api && source venv/bin/activate && python app.py'
+                },
+                { status: 503 }
+            );
+        }
+
+        return NextResponse.json(
+            { error: error.message || 'Failed to get batch' },
+            { status: 500 }
+        );
+    }
+}
@@ -0,0 +1,51 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { callPythonAPI } from '@/lib/python-api';
+
+// Start a batch ({ urls: [...] } or { url: '<playlist or channel>' }); children run as regular jobs
+export async function POST(request: NextRequest) {
+    try {
+        const body = await request.json();
+
+        const batch = await callPythonAPI('/batches', {
+            method: 'POST',
+            body: JSON.stringify(body),
+        });
+
+        return NextResponse.json(batch, { status: 202 });
+    } catch (error: any) {
+        console.error('Error starting batch:', error);
+
+        if (error.message && error.message.includes('Python API não está rodando')) {
+            return NextResponse.json(
+                {
+                    error: error.message,
+                    suggestion: 'Inicie o servidor Python: cd python-api && source venv/bin/activate && python app.py'
+                },
+                { status: 503 }
+            );
+        }
+
+        return NextResponse.json(
+            { error: error.message || 'Failed to start batch' },
+            { status: 500 }
+        );
+    }
+}
+
+export async function GET(request: NextRequest) {
+    try {
+        const limit = request.nextUrl.searchParams.get('limit');
+        const data = await callPythonAPI(`/batches${limit ? `?limit=${encodeURIComponent(limit)}` : ''}`, {
+            method: 'GET',
+            cache: 'no-store',
+        });
+
+        return NextResponse.json(data);
+    } catch (error: any) {
+        console.error('Error listing batches:', error);
+        return NextResponse.json(
+            { error: error.message || 'Failed to list batches' },
+            { status: 500 }
+        );
+    }
+}
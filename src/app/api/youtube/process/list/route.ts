@@ -4,14 +4,18 @@ import { callPythonAPI } from '@/lib/python-api';
 export async function GET(request: NextRequest) {
     try {
         const { searchParams } = new URL(request.url);
-        const limit = searchParams.get('limit') || '50';
+        const query = new URLSearchParams({ limit: searchParams.get('limit') || '50' });
+        for (const key of ['cursor', 'status', 'since', 'view']) {
+            const value = searchParams.get(key);
+            if (value) query.set(key, value);
+        }
 
-        const data = await callPythonAPI(`/jobs?limit=${encodeURIComponent(limit)}`, {
+        const data = await callPythonAPI(`/jobs?${query.toString()}`, {
             method: 'GET',
         });
 
         const jobs = (data?.jobs || []).map((job: any) => {
-            const videoPath = job?.video?.path;
+            const videoPath = job?.video?.proxy_path || job?.video?.path;
             return {
                 ...job,
                 preview_url: videoPath
@@ -20,7 +24,7 @@ export async function GET(request: NextRequest) {
             };
         });
 
-        return NextResponse.json({ jobs });
+        return NextResponse.json({ jobs, next_cursor: data?.next_cursor ?? null });
     } catch (error: any) {
         console.error('Error listing jobs:', error);
 
@@ -16,13 +16,17 @@ export async function GET(request: NextRequest) {
     const PYTHON_API_URL = process.env.PYTHON_API_URL || 'http://localhost:5000';
     const pythonUrl = `${PYTHON_API_URL}/video/${encodeURIComponent(filePath)}`;
 
+    // Forward range + conditional headers so Python can answer 206/304 directly
     const headers: HeadersInit = {};
-    const range = request.headers.get('range');
-    if (range) headers['range'] = range;
+    const forward = ['range', 'if-range', 'if-none-match', 'if-modified-since'];
+    for (const h of forward) {
+        const v = request.headers.get(h);
+        if (v) headers[h] = v;
+    }
 
-    const upstream = await fetch(pythonUrl, { headers });
+    const upstream = await fetch(pythonUrl, { headers, cache: 'no-store' });
 
-    // Pass through key headers for video playback/seek
+    // Pass through key headers for video playback/seek and browser caching
     const outHeaders = new Headers();
     const passthrough = [
         'content-type',
@@ -30,14 +34,16 @@ export async function GET(request: NextRequest) {
         'accept-ranges',
         'content-range',
         'last-modified',
+        'etag',
+        'cache-control',
     ];
     for (const h of passthrough) {
         const v = upstream.headers.get(h);
         if (v) outHeaders.set(h, v);
     }
-    outHeaders.set('cache-control', 'no-store');
+    if (!outHeaders.has('cache-control')) outHeaders.set('cache-control', 'no-store');
 
-    return new Response(upstream.body, {
+    return new Response(upstream.status === 304 ? null : upstream.body, {
         status: upstream.status,
         headers: outHeaders,
     });
@@ -15,13 +15,20 @@ export async function GET(
             );
         }
 
-        // Get job status from Python API
-        const status = await callPythonAPI(`/jobs/${jobId}/status`, {
+        // Get job status from Python API (forwarding ?since=/&timeout= for long-polling)
+        const query = new URLSearchParams();
+        for (const key of ['since', 'timeout']) {
+            const value = request.nextUrl.searchParams.get(key);
+            if (value !== null) query.set(key, value);
+        }
+        const qs = query.toString();
+        const status = await callPythonAPI(`/jobs/${jobId}/status${qs ? `?${qs}` : ''}`, {
             method: 'GET',
+            cache: 'no-store',
         });
 
-        // If Python already downloaded a video file, expose a same-origin preview URL
-        const videoPath = status?.video?.path;
+        // If Python already downloaded a video file, expose a same-origin preview URL (the light proxy once it is ready)
+        const videoPath = status?.video?.proxy_path || status?.video?.path;
         const enriched = {
             ...status,
             preview_url: videoPath
@@ -0,0 +1,49 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { callPythonAPI } from '@/lib/python-api';
+
+// Window of a job's transcript (by time or char range), so long transcripts can be loaded in pages
+export async function GET(
+    request: NextRequest,
+    { params }: { params: { jobId: string } }
+) {
+    try {
+        const jobId = params.jobId;
+
+        if (!jobId) {
+            return NextResponse.json(
+                { error: 'Job ID is required' },
+                { status: 400 }
+            );
+        }
+
+        const query = new URLSearchParams();
+        for (const key of ['start_time', 'end_time', 'start_char', 'end_char', 'limit', 'cursor', 'transcript_format']) {
+            const value = request.nextUrl.searchParams.get(key);
+            if (value !== null) query.set(key, value);
+        }
+        const qs = query.toString();
+
+        const data = await callPythonAPI(`/jobs/${jobId}/transcript${qs ? `?${qs}` : ''}`, {
+            method: 'GET',
+        });
+
+        return NextResponse.json(data);
+    } catch (error: any) {
+        console.error('Error getting job transcript:', error);
+
+        if (error.message && error.message.includes('Python API não está rodando')) {
+            return NextResponse.json(
+                {
+                    error: error.message,
+                    suggestion: 'Inicie o servidor Python: cd python-api && source venv/bin/activate && python app.py'
+                },
+                { status: 503 }
+            );
+        }
+
+        return NextResponse.json(
+            { error: error.message || 'Failed to get job transcript' },
+            { status: 500 }
+        );
+    }
+}
@@ -138,26 +138,29 @@ export function Header({ setInterval }: { setInterval: SetState<Interval> }) {
             const { job_id } = await startResponse.json();
             await loadJobs();
             
-            // Step 2: Poll for status
+            // Step 2: Long-poll for status (the API answers as soon as the job's version changes)
             const pollStatus = async (): Promise<void> => {
-                const maxAttempts = 600; // 10 minutes max (1 second intervals)
-                let attempts = 0;
+                const deadline = Date.now() + 10 * 60 * 1000; // 10 minutes max
+                let version: number | null = null;
                 
                 const poll = async (): Promise<void> => {
-                    if (attempts >= maxAttempts) {
+                    if (Date.now() >= deadline) {
                         throw new Error('Processamento demorou muito tempo. Tente novamente.');
                     }
                     
-                    attempts++;
-                    
                     try {
-                        const statusResponse = await fetch(`/api/youtube/process/status/${job_id}`);
+                        const since = version !== null ? `?since=${version}` : '';
+                        const statusResponse = await fetch(`/api/youtube/process/status/${job_id}${since}`);
                         
                         if (!statusResponse.ok) {
                             throw new Error('Failed to get job status');
                         }
                         
                         const status = await statusResponse.json();
+                        const previousVersion = version;
+                        if (typeof status.version === 'number') version = status.version;
+                        // No new version means the API answered without long-polling; back off instead of spinning
+                        const advanced = version !== null && version !== previousVersion;
                         
                         // Update status message
                         if (status.message) {
@@ -206,8 +209,8 @@ export function Header({ setInterval }: { setInterval: SetState<Interval> }) {
                         } else if (status.status === 'failed') {
                             throw new Error(status.error || status.message || 'Processing failed');
                         } else {
-                            // Continue polling
-                            setTimeout(poll, 1000); // Poll every 1 second
+                            // Continue polling (immediately while the long-poll keeps returning new versions)
+                            setTimeout(poll, advanced ? 0 : 1000);
                         }
                     } catch (error: any) {
                         if (error.message && !error.message.includes('Failed to get')) {
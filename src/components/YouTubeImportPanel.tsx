@@ -143,16 +143,24 @@ export function YouTubeImportPanel() {
             activeJobIdRef.current = job_id;
             await loadJobs();
 
+            // Long-poll: the API holds each request until the job's version moves past the last one seen
+            let version: number | null = null;
+
             const poll = async () => {
                 const jobId = activeJobIdRef.current;
                 if (!jobId) return;
 
                 try {
-                    const statusResponse = await fetch(`/api/youtube/process/status/${jobId}`);
+                    const since = version !== null ? `?since=${version}` : '';
+                    const statusResponse = await fetch(`/api/youtube/process/status/${jobId}${since}`);
                     if (!statusResponse.ok) {
                         throw new Error('Failed to get job status');
                     }
                     const status = await statusResponse.json();
+                    const previousVersion = version;
+                    if (typeof status.version === 'number') version = status.version;
+                    // No new version means the API answered without long-polling; back off instead of spinning
+                    const advanced = version !== null && version !== previousVersion;
 
                     const eta = formatEta(status.eta_seconds);
                     setStatusText(`${status.message || status.status} (${status.progress || 0}%)${eta ? ` • ETA ${eta}` : ''}`);
@@ -183,7 +191,7 @@ export function YouTubeImportPanel() {
                         throw new Error(status.error || status.message || 'Processing failed');
                     }
 
-                    pollTimerRef.current = window.setTimeout(poll, 1500);
+                    pollTimerRef.current = window.setTimeout(poll, advanced ? 0 : 1500);
                 } catch (e: any) {
                     setBusy(false);
                     activeJobIdRef.current = null;
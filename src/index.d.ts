@@ -80,7 +80,8 @@ type Crops = {
 }
 
 type Segment = {
-    speakers: number[],
+    // Not set on crop tracks computed by the Python API (no speaker detection)
+    speakers?: number[],
     start_time: number,
     end_time: number,
     x: number,